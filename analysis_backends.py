@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+MR Analysis Backends
+Pluggable interface for producing the analysis part of MR documentation.
+The Gemini web integration is one backend; the local extractive summariser
+builds meaningful sections from commit messages, the MR description,
+structural diff facts and ranked hunks in milliseconds, without a network
+"""
+
+import re
+import logging
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Callable, Any
+
+logger = logging.getLogger(__name__)
+
+# Structural facts extracted from changed lines
+DECLARATION_PATTERN = re.compile(r'\b(class|interface|enum|record)\s+([A-Z]\w*)')
+METHOD_PATTERNS = [
+    re.compile(r'^\s*(?:public|protected|private)[\w\s<>\[\],?]*?\s(\w+)\s*\([^;]*$'),
+    re.compile(r'^\s*(?:export\s+)?(?:async\s+)?function\s+(\w+)\s*\('),
+    re.compile(r'^\s*(?:export\s+)?const\s+(\w+)\s*=\s*(?:async\s*)?\([^)]*\)\s*=>'),
+    re.compile(r'^\s*(?:async\s+)?def\s+(\w+)\s*\('),
+]
+ENDPOINT_PATTERN = re.compile(r'@(Get|Post|Put|Delete|Patch|Request)Mapping\s*\(\s*(?:value\s*=\s*|path\s*=\s*)?"([^"]*)"')
+ANNOTATION_PATTERN = re.compile(r'@(RestController|Controller|Service|Repository|Entity|Configuration|Component|Transactional|Scheduled|KafkaListener)\b')
+CONFIG_KEY_PATTERN = re.compile(r'^\s*([A-Za-z][\w.\-]*)\s*[:=]')
+
+CONFIG_EXTENSIONS = ('.properties', '.yml', '.yaml', '.env', '.conf')
+DEPENDENCY_FILES = ('pom.xml', 'build.gradle', 'build.gradle.kts', 'package.json', 'requirements.txt', 'pyproject.toml')
+MIGRATION_HINTS = ('migration', 'db/changelog', 'flyway', 'liquibase', '.sql')
+TEST_HINTS = ('test', 'spec', '__tests__')
+NOISE_COMMIT_PREFIXES = ('merge branch', 'merge remote-tracking', 'wip', 'fixup!', 'squash!')
+
+MAX_SUMMARY_SENTENCES = 3
+MAX_RANKED_HUNKS = 5
+MAX_LIST_ITEMS = 10
+
+
+@dataclass
+class AnalysisRequest:
+    """Everything a backend may use to analyse an MR"""
+    title: str
+    description: str = ''
+    author: str = ''
+    source_branch: str = ''
+    target_branch: str = ''
+    commits: List[Dict[str, Any]] = field(default_factory=list)
+    changes: List[Dict[str, Any]] = field(default_factory=list)
+    mr_info: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_mr_info(cls, mr_info: Dict, changes: List[Dict], commits: Optional[List[Dict]] = None) -> 'AnalysisRequest':
+        """Build a request from a GitLab API MR dictionary"""
+        mr_info = mr_info or {}
+        author = mr_info.get('author') or {}
+        return cls(
+            title=mr_info.get('title') or 'Merge Request',
+            description=mr_info.get('description') or '',
+            author=author.get('name', '') if isinstance(author, dict) else str(author),
+            source_branch=mr_info.get('source_branch', ''),
+            target_branch=mr_info.get('target_branch', ''),
+            commits=commits or [],
+            changes=changes or [],
+            mr_info=mr_info
+        )
+
+
+class AnalysisBackend(ABC):
+    """Produces the analysis markdown for a merge request"""
+
+    name = 'backend'
+
+    def is_available(self) -> bool:
+        """Whether the backend can currently be used"""
+        return True
+
+    @abstractmethod
+    def analyze(self, request: AnalysisRequest) -> Optional[str]:
+        """Return analysis markdown, or None to let the next backend try"""
+
+
+class GeminiWebBackend(AnalysisBackend):
+    """Gemini analysis through an existing browser automation flow"""
+
+    name = 'gemini-web'
+
+    def __init__(self, analyze_fn: Callable[[AnalysisRequest], str],
+                 is_ready: Callable[[], bool] = lambda: True, min_length: int = 100):
+        self._analyze_fn = analyze_fn
+        self._is_ready = is_ready
+        self.min_length = min_length
+
+    def is_available(self) -> bool:
+        try:
+            return bool(self._is_ready())
+        except Exception:
+            return False
+
+    def analyze(self, request: AnalysisRequest) -> Optional[str]:
+        response = self._analyze_fn(request)
+        if not response or response.startswith('Error') or len(response.strip()) < self.min_length:
+            return None
+        return response
+
+
+class ExtractiveSummaryBackend(AnalysisBackend):
+    """Offline analysis assembled from the MR's own text and diff structure"""
+
+    name = 'extractive'
+
+    def __init__(self, heading_level: int = 2):
+        self.heading_level = heading_level
+
+    def analyze(self, request: AnalysisRequest) -> Optional[str]:
+        facts = collect_structural_facts(request.changes)
+        sections = [
+            ("Executive Summary", self._summary(request, facts)),
+            ("Key Changes", self._key_changes(request.changes)),
+            ("Structural Changes", self._structural_changes(facts)),
+            ("Commit Highlights", self._commit_highlights(request.commits)),
+            ("Risk Assessment", self._risks(facts)),
+            ("Testing Recommendations", self._testing(facts)),
+        ]
+        prefix = '#' * self.heading_level
+        return '\n\n'.join(f"{prefix} {title}\n{body}" for title, body in sections if body)
+
+    def _summary(self, request: AnalysisRequest, facts: Dict[str, Any]) -> str:
+        sentences = _leading_sentences(request.description, MAX_SUMMARY_SENTENCES)
+        if not sentences:
+            sentences = _commit_subjects(request.commits)[:MAX_SUMMARY_SENTENCES]
+
+        kinds = facts['change_kinds']
+        scope = ', '.join(f"{count} {kind}" for kind, count in kinds.most_common()) or 'no file changes'
+        areas = ', '.join(sorted(facts['areas'])) or 'general'
+
+        lines = [f"**{request.title}**", ""]
+        lines.extend(sentences)
+        lines.append("")
+        lines.append(f"Scope: {len(request.changes)} files ({scope}), +{facts['added_lines']}/-{facts['removed_lines']} lines; "
+                     f"areas: {areas}.")
+        return '\n'.join(lines).strip()
+
+    def _key_changes(self, changes: List[Dict]) -> str:
+        hunks = rank_hunks(changes)[:MAX_RANKED_HUNKS]
+        if not hunks:
+            return ''
+        lines = []
+        for hunk in hunks:
+            snippet = '; '.join(hunk['highlights']) or 'content changes'
+            lines.append(f"- `{hunk['path']}` (+{hunk['added']}/-{hunk['removed']}): {snippet}")
+        return '\n'.join(lines)
+
+    def _structural_changes(self, facts: Dict[str, Any]) -> str:
+        lines = []
+        for label, key in (("New types", 'added_types'), ("Removed types", 'removed_types'),
+                           ("New/changed methods", 'added_methods'), ("Removed methods", 'removed_methods'),
+                           ("Endpoints", 'endpoints'), ("Component annotations", 'annotations'),
+                           ("Configuration keys", 'config_keys')):
+            values = facts[key]
+            if values:
+                shown = ', '.join(f"`{value}`" for value in sorted(values)[:MAX_LIST_ITEMS])
+                more = f" (+{len(values) - MAX_LIST_ITEMS} more)" if len(values) > MAX_LIST_ITEMS else ''
+                lines.append(f"- **{label}:** {shown}{more}")
+        return '\n'.join(lines)
+
+    def _commit_highlights(self, commits: List[Dict]) -> str:
+        subjects = _commit_subjects(commits)
+        if not subjects:
+            return ''
+        lines = [f"- {subject}" for subject in subjects[:MAX_LIST_ITEMS]]
+        if len(subjects) > MAX_LIST_ITEMS:
+            lines.append(f"- ... and {len(subjects) - MAX_LIST_ITEMS} more commits")
+        return '\n'.join(lines)
+
+    def _risks(self, facts: Dict[str, Any]) -> str:
+        risks = []
+        if facts['migrations']:
+            risks.append(f"- Database migrations: {', '.join(f'`{p}`' for p in facts['migrations'][:5])} "
+                         "- verify ordering and rollback")
+        if facts['dependency_files']:
+            risks.append(f"- Dependency changes in {', '.join(f'`{p}`' for p in facts['dependency_files'])}")
+        if facts['removed_types'] or facts['removed_methods']:
+            risks.append("- Removed types/methods may break callers outside this MR")
+        if facts['endpoints']:
+            risks.append("- HTTP endpoints touched; check API compatibility for clients")
+        if facts['config_keys']:
+            risks.append("- Configuration keys changed; update environment-specific settings before deployment")
+        if facts['change_kinds'].get('deleted'):
+            risks.append(f"- {facts['change_kinds']['deleted']} files deleted")
+        return '\n'.join(risks) or "- No elevated risk indicators found in the diff"
+
+    def _testing(self, facts: Dict[str, Any]) -> str:
+        tips = []
+        if facts['source_files'] and not facts['test_files']:
+            tips.append("- No tests were changed alongside source files; consider adding coverage for: "
+                        + ', '.join(f"`{p}`" for p in facts['source_files'][:5]))
+        elif facts['test_files']:
+            tips.append(f"- {len(facts['test_files'])} test files updated; run the affected suites")
+        if facts['endpoints']:
+            tips.append("- Exercise the changed endpoints: " + ', '.join(f"`{e}`" for e in sorted(facts['endpoints'])[:5]))
+        if facts['migrations']:
+            tips.append("- Run migrations against a copy of production data")
+        if facts['config_keys']:
+            tips.append("- Verify startup with the updated configuration in each environment")
+        return '\n'.join(tips)
+
+
+def run_backends(backends: List[AnalysisBackend], request: AnalysisRequest) -> Optional[str]:
+    """Return the first analysis produced by an available backend"""
+    for backend in backends:
+        if not backend.is_available():
+            continue
+        try:
+            result = backend.analyze(request)
+        except Exception as e:
+            logger.warning(f"Analysis backend '{backend.name}' failed: {e}")
+            continue
+        if result:
+            logger.info(f"Analysis produced by backend: {backend.name}")
+            return result
+    return None
+
+
+def collect_structural_facts(changes: List[Dict]) -> Dict[str, Any]:
+    """Collect declarations, endpoints, config keys and file categories from diffs"""
+    facts = {
+        'added_types': set(), 'removed_types': set(),
+        'added_methods': set(), 'removed_methods': set(),
+        'endpoints': set(), 'annotations': set(), 'config_keys': set(),
+        'migrations': [], 'dependency_files': [], 'test_files': [], 'source_files': [],
+        'areas': set(), 'change_kinds': Counter(),
+        'added_lines': 0, 'removed_lines': 0
+    }
+
+    for change in changes:
+        path = _change_path(change)
+        lower = path.lower()
+        facts['change_kinds'][_change_kind(change)] += 1
+
+        is_config = lower.endswith(CONFIG_EXTENSIONS)
+        if any(hint in lower for hint in TEST_HINTS):
+            facts['test_files'].append(path)
+        elif any(hint in lower for hint in MIGRATION_HINTS):
+            facts['migrations'].append(path)
+        elif lower.rsplit('/', 1)[-1] in DEPENDENCY_FILES:
+            facts['dependency_files'].append(path)
+        elif not is_config and not lower.endswith('.md'):
+            facts['source_files'].append(path)
+
+        facts['areas'].add(_area(lower))
+
+        for line in (change.get('diff') or '').split('\n'):
+            if line.startswith('+') and not line.startswith('+++'):
+                sign, body = 'added', line[1:]
+                facts['added_lines'] += 1
+            elif line.startswith('-') and not line.startswith('---'):
+                sign, body = 'removed', line[1:]
+                facts['removed_lines'] += 1
+            else:
+                continue
+
+            for match in DECLARATION_PATTERN.finditer(body):
+                facts[f'{sign}_types'].add(match.group(2))
+            for pattern in METHOD_PATTERNS:
+                match = pattern.match(body)
+                if match:
+                    facts[f'{sign}_methods'].add(match.group(1))
+                    break
+            if sign == 'added':
+                for match in ENDPOINT_PATTERN.finditer(body):
+                    facts['endpoints'].add(f"{match.group(1).upper()} {match.group(2)}")
+                for match in ANNOTATION_PATTERN.finditer(body):
+                    facts['annotations'].add(f"@{match.group(1)}")
+            if is_config:
+                match = CONFIG_KEY_PATTERN.match(body)
+                if match:
+                    facts['config_keys'].add(match.group(1))
+
+    # A type or method that is both removed and added was modified, not removed
+    facts['removed_types'] -= facts['added_types']
+    facts['removed_methods'] -= facts['added_methods']
+    facts['areas'].discard('')
+    return facts
+
+
+def rank_hunks(changes: List[Dict]) -> List[Dict[str, Any]]:
+    """Score diff hunks by size and structural weight, most important first"""
+    hunks = []
+    for change in changes:
+        path = _change_path(change)
+        lower = path.lower()
+        weight = 0.5 if any(hint in lower for hint in TEST_HINTS) or lower.endswith('.md') else 1.0
+
+        current = None
+        for line in (change.get('diff') or '').split('\n'):
+            if line.startswith('@@'):
+                current = {'path': path, 'added': 0, 'removed': 0, 'structural': 0, 'highlights': []}
+                hunks.append((weight, current))
+                continue
+            if current is None or line[:1] not in ('+', '-') or line.startswith(('+++', '---')):
+                continue
+
+            body = line[1:].strip()
+            current['added' if line[0] == '+' else 'removed'] += 1
+            structural = DECLARATION_PATTERN.search(body) or ENDPOINT_PATTERN.search(body) or \
+                any(pattern.match(line[1:]) for pattern in METHOD_PATTERNS)
+            if structural:
+                current['structural'] += 1
+                if len(current['highlights']) < 2:
+                    current['highlights'].append(f"`{body[:80]}`")
+
+    scored = []
+    for weight, hunk in hunks:
+        if hunk['added'] + hunk['removed'] == 0:
+            continue
+        score = weight * (hunk['added'] + hunk['removed'] + 10 * hunk['structural'])
+        scored.append((score, hunk))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [hunk for _, hunk in scored]
+
+
+def _change_path(change: Dict) -> str:
+    return change.get('file_path') or change.get('new_path') or change.get('old_path') or change.get('file') or ''
+
+
+def _change_kind(change: Dict) -> str:
+    if change.get('change_type'):
+        return change['change_type']
+    if change.get('new_file'):
+        return 'added'
+    if change.get('deleted_file'):
+        return 'deleted'
+    if change.get('renamed_file'):
+        return 'renamed'
+    return 'modified'
+
+
+def _area(path: str) -> str:
+    if any(hint in path for hint in TEST_HINTS):
+        return 'tests'
+    if path.endswith(('.java', '.kt', '.py', '.go')):
+        return 'backend'
+    if path.endswith(('.js', '.jsx', '.ts', '.tsx', '.css', '.scss', '.html', '.vue')):
+        return 'frontend'
+    if path.endswith(CONFIG_EXTENSIONS) or path.rsplit('/', 1)[-1] in DEPENDENCY_FILES:
+        return 'configuration'
+    if path.endswith('.md'):
+        return 'documentation'
+    return ''
+
+
+def _leading_sentences(text: str, limit: int) -> List[str]:
+    """First sentences of a description, ignoring markdown headings, images and checklists"""
+    sentences = []
+    for raw_line in (text or '').split('\n'):
+        line = raw_line.strip().lstrip('-*> ').strip()
+        if not line or line.startswith(('#', '!', '[ ]', '[x]', '<!--', '|')):
+            continue
+        for sentence in re.split(r'(?<=[.!?])\s+', line):
+            if len(sentence) > 15:
+                sentences.append(sentence)
+            if len(sentences) >= limit:
+                return sentences
+    return sentences
+
+
+def _commit_subjects(commits: List[Dict]) -> List[str]:
+    """Unique, meaningful commit subjects in chronological order"""
+    seen = set()
+    subjects = []
+    for commit in reversed(commits or []):  # GitLab lists newest first
+        subject = (commit.get('title') or (commit.get('message') or '').split('\n')[0]).strip()
+        key = subject.lower()
+        if not subject or key in seen or key.startswith(NOISE_COMMIT_PREFIXES):
+            continue
+        seen.add(key)
+        subjects.append(subject)
+    return subjects
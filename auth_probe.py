@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Concurrent Authentication Probe
+Checks whether the browser profile is signed in to Google, GitLab and
+Gemini with plain HTTP requests that carry the browser's cookies, all at
+the same time. Each result is reported as soon as it resolves and the whole
+probe is bounded by one deadline. A service whose answer is inconclusive
+(unexpected status, timeout) is reported as unknown so the caller can fall
+back to a browser check for that service only
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from dataclasses import dataclass
+from typing import Callable, List, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE = 8.0
+USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of one service probe"""
+    name: str
+    authenticated: Optional[bool]   # None: could not be determined over HTTP
+    elapsed: float
+    detail: str = ''
+
+
+@dataclass
+class AuthProbe:
+    """A URL to request and how to judge the response"""
+    name: str
+    url: str
+    judge: Callable[[requests.Response], Optional[bool]]
+
+
+def _redirect_target(response: requests.Response) -> str:
+    return response.headers.get('Location', '') if response.is_redirect else ''
+
+
+def _judge_google_account(response: requests.Response) -> Optional[bool]:
+    if response.status_code == 200:
+        return True
+    if 'accounts.google.com' in _redirect_target(response):
+        return False
+    return None
+
+
+def _judge_gitlab(response: requests.Response) -> Optional[bool]:
+    if response.status_code == 200:
+        return True
+    if '/users/sign_in' in _redirect_target(response) or response.status_code == 401:
+        return False
+    return None
+
+
+def _judge_gemini(response: requests.Response) -> Optional[bool]:
+    if 'accounts.google.com' in _redirect_target(response):
+        return False
+    if response.status_code != 200:
+        return None
+    # The page embeds its request token (SNlM0e) only for a signed-in user; anything
+    # else (consent pages, marketing landing page) is left to the browser check
+    return True if 'SNlM0e' in response.text else None
+
+
+def google_account_probe() -> AuthProbe:
+    return AuthProbe('gmail', "https://myaccount.google.com/", _judge_google_account)
+
+
+def gitlab_probe(gitlab_url: str) -> AuthProbe:
+    return AuthProbe('gitlab', f"{gitlab_url.rstrip('/')}/dashboard", _judge_gitlab)
+
+
+def gemini_probe() -> AuthProbe:
+    return AuthProbe('gemini', "https://gemini.google.com/app", _judge_gemini)
+
+
+def export_browser_cookies(driver) -> List[Dict]:
+    """
+    All cookies of the browser profile
+
+    driver.get_cookies() only returns cookies of the current page's domain;
+    CDP's Network.getAllCookies covers every domain without navigating.
+    """
+    if hasattr(driver, 'execute_cdp_cmd'):
+        try:
+            return driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        except Exception as e:
+            logger.debug(f"Network.getAllCookies failed, using current-page cookies: {e}")
+    try:
+        return driver.get_cookies()
+    except Exception as e:
+        logger.warning(f"Could not read browser cookies: {e}")
+        return []
+
+
+def _session_for(probe: AuthProbe, cookies: List[Dict]) -> requests.Session:
+    host = urlparse(probe.url).hostname or ''
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+    for cookie in cookies:
+        domain = cookie.get('domain', '')
+        # Only send cookies the browser would send to this host
+        bare = domain.lstrip('.')
+        if bare and host != bare and not host.endswith('.' + bare):
+            continue
+        session.cookies.set(cookie['name'], cookie['value'], domain=domain, path=cookie.get('path', '/'))
+    return session
+
+
+def _run_probe(probe: AuthProbe, cookies: List[Dict], timeout: float, verify: bool) -> ProbeResult:
+    started = time.time()
+    try:
+        with _session_for(probe, cookies) as session:
+            response = session.get(probe.url, allow_redirects=False, timeout=timeout, verify=verify)
+        authenticated = probe.judge(response)
+        detail = f"HTTP {response.status_code}"
+        if response.is_redirect:
+            detail += f" -> {urlparse(_redirect_target(response)).hostname or 'same host'}"
+    except Exception as e:
+        authenticated, detail = None, f"error: {e}"
+    return ProbeResult(probe.name, authenticated, time.time() - started, detail)
+
+
+def run_probes(probes: List[AuthProbe], cookies: List[Dict], deadline: float = DEFAULT_DEADLINE,
+               on_result: Optional[Callable[[ProbeResult], None]] = None,
+               verify: bool = True) -> Dict[str, ProbeResult]:
+    """
+    Run all probes concurrently
+
+    Args:
+        probes: Services to check
+        cookies: Browser cookies (see export_browser_cookies)
+        deadline: Seconds for the whole probe; unfinished probes are reported unknown
+        on_result: Called with each result as soon as it resolves
+        verify: Verify TLS certificates
+
+    Returns:
+        Result per probe name
+    """
+    started = time.time()
+    results: Dict[str, ProbeResult] = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, len(probes)), thread_name_prefix='auth-probe')
+    futures = {executor.submit(_run_probe, probe, cookies, deadline, verify): probe for probe in probes}
+
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            result = future.result()
+            results[result.name] = result
+            if on_result:
+                on_result(result)
+    except FuturesTimeout:
+        elapsed = time.time() - started
+        for probe in futures.values():
+            if probe.name not in results:
+                result = ProbeResult(probe.name, None, elapsed, 'timeout')
+                results[probe.name] = result
+                if on_result:
+                    on_result(result)
+    finally:
+        # Do not wait for stragglers; their request timeout ends them shortly after
+        executor.shutdown(wait=False)
+
+    logger.debug(f"Authentication probe finished in {time.time() - started:.2f}s")
+    return results
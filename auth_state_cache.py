@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Authentication State Cache
+Remembers the outcome of the start-up checks (verified GitLab identity,
+token scopes, API and browser-session access, browser cookie expiry, the
+SSL-verify decision and Gemini readiness) for a limited time, so warm
+starts skip /api/v4/user, the project probe and the browser checks. The
+token itself is never written; a fingerprint ties the state to it. Callers
+invalidate the state and re-verify when a real request is rejected with 401
+or a redirect to sign-in
+
+Usage:
+    python auth_state_cache.py            # show the cached state
+    python auth_state_cache.py --clear    # forget it
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = Path(os.path.expanduser('~/.cache/gitlab_mr_docs/auth_state.json'))
+DEFAULT_TTL = 4 * 3600      # Seconds a verified state is trusted
+STATE_VERSION = 1
+
+
+def token_fingerprint(token: str) -> str:
+    """Short SHA-256 digest identifying a token without storing it"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+
+
+@dataclass
+class AuthState:
+    """What the last full verification established"""
+    gitlab_url: str
+    token_fingerprint: str
+    username: str = ''
+    name: str = ''
+    scopes: List[str] = field(default_factory=list)
+    api_access: bool = False
+    browser_session: bool = False
+    ssl_verify: bool = True
+    cookie_expires_at: Optional[float] = None   # Earliest expiry of the browser's GitLab cookies
+    gemini_ready: bool = False
+    verified_at: float = field(default_factory=time.time)
+
+    def age(self) -> float:
+        return time.time() - self.verified_at
+
+
+class AuthStateCache:
+    """Loads and stores AuthState with a time-to-live"""
+
+    def __init__(self, path: Path = DEFAULT_STATE_PATH, ttl: float = DEFAULT_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+
+    def load(self, gitlab_url: str, token: str) -> Optional[AuthState]:
+        """
+        Return the cached state if it belongs to this instance and token and is still fresh
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            if raw.pop('version', None) != STATE_VERSION:
+                return None
+            state = AuthState(**raw)
+        except (OSError, ValueError, TypeError):
+            return None
+
+        if state.gitlab_url != gitlab_url.rstrip('/') or state.token_fingerprint != token_fingerprint(token):
+            logger.debug("Cached auth state belongs to another GitLab instance or token")
+            return None
+        if state.age() >= self.ttl:
+            logger.debug(f"Cached auth state expired ({state.age() / 60:.0f} min old)")
+            return None
+        if state.browser_session and state.cookie_expires_at and time.time() >= state.cookie_expires_at:
+            logger.debug("Cached auth state outlived the browser session cookies")
+            return None
+        return state
+
+    def save(self, state: AuthState) -> None:
+        """Write state atomically (readable by the current user only)"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(dict(asdict(state), version=STATE_VERSION), f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save auth state to {self.path}: {e}")
+
+    def invalidate(self, reason: str = '') -> None:
+        """Forget the cached state so the next start verifies again"""
+        try:
+            self.path.unlink()
+            logger.info(f"Cached auth state cleared{f' ({reason})' if reason else ''}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove auth state {self.path}: {e}")
+
+
+def main():
+    """Show or clear the cached authentication state"""
+    cache = AuthStateCache()
+    if '--clear' in sys.argv[1:]:
+        cache.invalidate('requested')
+        return
+
+    try:
+        with open(cache.path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        print(f"No auth state in {cache.path}")
+        return
+
+    age = time.time() - raw.get('verified_at', 0)
+    print(f"{raw.get('gitlab_url')}  {raw.get('username') or '-'}  verified {age / 60:.0f} min ago "
+          f"({'fresh' if age < cache.ttl else 'expired'})")
+    print(f"  API: {raw.get('api_access')}  browser: {raw.get('browser_session')}  "
+          f"SSL verify: {raw.get('ssl_verify')}  Gemini: {raw.get('gemini_ready')}")
+    if raw.get('scopes'):
+        print(f"  scopes: {', '.join(raw['scopes'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Warm Browser Daemon
+Keeps a long-lived Chrome with authenticated GitLab/Gemini sessions running
+in the background. CLI runs attach to it through the remote-debugging port
+instead of starting their own webdriver.Chrome, so second and later runs
+skip browser startup and the authentication flows entirely.
+
+Usage:
+    python browser_daemon.py start [--port 9222] [--profile-dir DIR] [--headless]
+    python browser_daemon.py status
+    python browser_daemon.py stop
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import logging
+import argparse
+import platform
+import subprocess
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 9222
+DEFAULT_PROFILE_DIR = os.path.expanduser('~/chrome_profile_gitlab_mr')
+STATE_FILE = Path(os.path.expanduser('~/.cache/gitlab_mr_docs/browser_daemon.json'))
+WARM_URLS = ['https://gemini.google.com/app']
+STARTUP_TIMEOUT = 20  # Seconds to wait for the debugging endpoint
+
+CHROME_CANDIDATES = {
+    'Linux': ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser'],
+    'Darwin': ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'],
+    'Windows': [r'C:\Program Files\Google\Chrome\Application\chrome.exe',
+                r'C:\Program Files (x86)\Google\Chrome\Application\chrome.exe'],
+}
+
+
+def find_chrome_binary() -> Optional[str]:
+    """Locate the Chrome executable for this platform"""
+    for candidate in CHROME_CANDIDATES.get(platform.system(), CHROME_CANDIDATES['Linux']):
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    return None
+
+
+def load_state() -> Optional[Dict[str, Any]]:
+    """Read the daemon state file"""
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(state: Dict[str, Any]):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = STATE_FILE.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def _endpoint_version(port: int, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+    """Query the DevTools version endpoint; None if nothing is listening"""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=timeout) as response:
+            return json.load(response)
+    except Exception:
+        return None
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def daemon_status() -> Optional[Dict[str, Any]]:
+    """Return the state of a running, reachable daemon, or None"""
+    state = load_state()
+    if not state or not _process_alive(state.get('pid', -1)):
+        return None
+    version = _endpoint_version(state['port'])
+    if not version:
+        return None
+    state['browser'] = version.get('Browser', 'unknown')
+    return state
+
+
+def start_daemon(port: int = DEFAULT_PORT, profile_dir: str = DEFAULT_PROFILE_DIR,
+                 headless: bool = False) -> Dict[str, Any]:
+    """Start Chrome with remote debugging enabled and record its state"""
+    running = daemon_status()
+    if running:
+        logger.info(f"Browser daemon already running (pid {running['pid']}, port {running['port']})")
+        return running
+
+    chrome = find_chrome_binary()
+    if not chrome:
+        raise RuntimeError("Chrome executable not found")
+
+    if _endpoint_version(port):
+        raise RuntimeError(f"Port {port} is already used by another DevTools endpoint")
+
+    args = [
+        chrome,
+        f'--remote-debugging-port={port}',
+        '--remote-debugging-address=127.0.0.1',
+        f'--user-data-dir={profile_dir}',
+        '--no-first-run',
+        '--no-default-browser-check',
+        '--disable-blink-features=AutomationControlled',
+        '--disable-dev-shm-usage',
+    ]
+    if headless:
+        args.append('--headless=new')
+    args.extend(WARM_URLS)
+
+    popen_kwargs = {'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL, 'stdin': subprocess.DEVNULL}
+    if platform.system() == 'Windows':
+        popen_kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        popen_kwargs['start_new_session'] = True
+
+    process = subprocess.Popen(args, **popen_kwargs)
+
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        if _endpoint_version(port, timeout=0.5):
+            break
+        if process.poll() is not None:
+            raise RuntimeError(f"Chrome exited during startup (code {process.returncode})")
+        time.sleep(0.2)
+    else:
+        process.terminate()
+        raise RuntimeError(f"Chrome did not open the debugging port {port} within {STARTUP_TIMEOUT}s")
+
+    state = {
+        'pid': process.pid,
+        'port': port,
+        'profile_dir': profile_dir,
+        'headless': headless,
+        'started_at': datetime.now().isoformat()
+    }
+    _save_state(state)
+    logger.info(f"✅ Browser daemon started (pid {process.pid}, port {port}, profile {profile_dir})")
+    return state
+
+
+def stop_daemon() -> bool:
+    """Terminate the daemon browser"""
+    state = load_state()
+    if not state:
+        logger.info("Browser daemon is not running")
+        return False
+
+    pid = state.get('pid', -1)
+    if _process_alive(pid):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError as e:
+            logger.error(f"Could not stop browser daemon: {e}")
+            return False
+        for _ in range(50):
+            if not _process_alive(pid):
+                break
+            time.sleep(0.1)
+
+    try:
+        STATE_FILE.unlink()
+    except OSError:
+        pass
+    logger.info("Browser daemon stopped")
+    return True
+
+
+def attach_driver(new_tab: bool = False):
+    """
+    Attach a Selenium driver to the running daemon
+
+    Args:
+        new_tab: Open and switch to a dedicated tab (for parallel sessions)
+
+    Returns:
+        WebDriver attached to the daemon browser, or None if no daemon is running
+    """
+    state = daemon_status()
+    if not state:
+        return None
+
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_experimental_option('debuggerAddress', f"127.0.0.1:{state['port']}")
+
+    started = time.time()
+    try:
+        driver = webdriver.Chrome(options=options)
+    except Exception as e:
+        logger.warning(f"Could not attach to browser daemon: {e}")
+        return None
+
+    driver.attached_to_daemon = True
+    driver.daemon_tab = None
+    driver.owned_tabs = []     # Tabs opened by this driver; the daemon's own tabs are never closed
+    if new_tab:
+        driver.daemon_tab = open_tab(driver)
+
+    logger.info(f"Attached to browser daemon on port {state['port']} in {time.time() - started:.2f}s")
+    return driver
+
+
+def open_tab(driver) -> str:
+    """Open a tab, switch to it and remember it for detach_driver(); returns its handle"""
+    driver.switch_to.new_window('tab')
+    handle = driver.current_window_handle
+    if hasattr(driver, 'owned_tabs'):
+        driver.owned_tabs.append(handle)
+    return handle
+
+
+def switch_to_tab(driver, url_fragment: str) -> bool:
+    """Switch to the first open tab whose URL contains url_fragment"""
+    for handle in driver.window_handles:
+        driver.switch_to.window(handle)
+        if url_fragment in driver.current_url:
+            return True
+    return False
+
+
+def detach_driver(driver) -> None:
+    """
+    Release an attached driver without closing the daemon browser
+
+    quit() would end the shared browser, so only the tabs opened for this
+    driver (attach_driver(new_tab=True), open_tab()) are closed and the
+    chromedriver process is stopped.
+    """
+    for handle in getattr(driver, 'owned_tabs', []):
+        try:
+            # Closing the last tab would close the daemon browser
+            if handle in driver.window_handles and len(driver.window_handles) > 1:
+                driver.switch_to.window(handle)
+                driver.close()
+        except Exception as e:
+            logger.debug(f"Error closing daemon tab: {e}")
+    try:
+        driver.service.stop()
+    except Exception as e:
+        logger.debug(f"Error stopping chromedriver: {e}")
+
+
+def main():
+    """Command line interface for the browser daemon"""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    parser = argparse.ArgumentParser(description='Warm Chrome daemon for the GitLab MR documentation tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    start_parser = subparsers.add_parser('start', help='Start the browser daemon')
+    start_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Remote debugging port')
+    start_parser.add_argument('--profile-dir', default=DEFAULT_PROFILE_DIR, help='Chrome user data directory')
+    start_parser.add_argument('--headless', action='store_true',
+                              help='Run without a window (log in once with a visible window first)')
+
+    subparsers.add_parser('status', help='Show daemon status')
+    subparsers.add_parser('stop', help='Stop the browser daemon')
+
+    args = parser.parse_args()
+
+    if args.command == 'start':
+        try:
+            start_daemon(args.port, args.profile_dir, args.headless)
+        except RuntimeError as e:
+            logger.error(f"❌ {e}")
+            sys.exit(1)
+    elif args.command == 'status':
+        state = daemon_status()
+        if state:
+            print(f"Running: pid {state['pid']}, port {state['port']}, {state['browser']}, "
+                  f"profile {state['profile_dir']}, since {state['started_at']}")
+        else:
+            print("Not running")
+            sys.exit(1)
+    elif args.command == 'stop':
+        stop_daemon()
+
+
+if __name__ == "__main__":
+    main()
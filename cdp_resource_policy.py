@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Per-Tab Resource Policies
+Uses the Chrome DevTools Protocol (Network.setBlockedURLs) to keep GitLab
+probing tabs lean - no images, fonts, media, avatars or analytics - while
+the Gemini tab keeps loading everything it needs. Chrome command-line flags
+such as --disable-images apply to the whole browser and break Gemini; CDP
+blocking is scoped to the tab the driver is focused on.
+
+Every navigation reports page-load time and bytes transferred, read from
+the page's Performance API.
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+from typing import List, Dict
+
+logger = logging.getLogger(__name__)
+
+_IMAGE_EXTENSIONS = ['png', 'jpg', 'jpeg', 'gif', 'svg', 'webp', 'ico', 'avif', 'bmp']
+_FONT_EXTENSIONS = ['woff', 'woff2', 'ttf', 'otf', 'eot']
+_MEDIA_EXTENSIONS = ['mp4', 'webm', 'ogg', 'mp3', 'wav']
+
+
+def _extension_patterns(extensions: List[str]) -> List[str]:
+    # Blocked-URL patterns only support '*', so query strings need their own pattern
+    patterns = []
+    for extension in extensions:
+        patterns.extend([f"*.{extension}", f"*.{extension}?*"])
+    return patterns
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    """A named set of URL patterns blocked in a tab"""
+    name: str
+    blocked_urls: tuple = ()
+
+
+FULL_POLICY = ResourcePolicy('full')
+
+LEAN_POLICY = ResourcePolicy('lean', tuple(
+    _extension_patterns(_IMAGE_EXTENSIONS + _FONT_EXTENSIONS + _MEDIA_EXTENSIONS) + [
+        "*/uploads/-/system/user/avatar/*",
+        "*gravatar.com*",
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*snowplow*",
+        "*sentry.io*",
+        "*/-/collect_events*"
+    ]
+))
+
+_METRICS_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+const bytes = resources.reduce((total, r) => total + (r.transferSize || 0), nav ? (nav.transferSize || 0) : 0);
+return {
+    load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : performance.now(),
+    dom_ready_ms: nav ? nav.domContentLoadedEventEnd - nav.startTime : 0,
+    transfer_bytes: bytes,
+    requests: resources.length + (nav ? 1 : 0)
+};
+"""
+
+
+@dataclass
+class NavigationMetrics:
+    """Cost of one page load"""
+    url: str
+    policy: str
+    wall_time: float
+    load_ms: float = 0.0
+    dom_ready_ms: float = 0.0
+    transfer_bytes: int = 0    # Cross-origin resources without Timing-Allow-Origin count as 0
+    requests: int = 0
+
+
+@dataclass
+class PolicyTotals:
+    navigations: int = 0
+    wall_time: float = 0.0
+    transfer_bytes: int = 0
+    requests: int = 0
+
+
+class ResourcePolicyManager:
+    """Applies resource policies per tab and measures navigations"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.history: List[NavigationMetrics] = []
+        self._applied: Dict[str, str] = {}   # window handle -> policy name
+        self._supported = hasattr(driver, 'execute_cdp_cmd')
+
+    def apply(self, policy: ResourcePolicy) -> bool:
+        """Apply policy to the current tab (no-op if it is already active there)"""
+        if not self._supported:
+            return False
+
+        try:
+            handle = self.driver.current_window_handle
+        except Exception:
+            handle = None
+        if handle and self._applied.get(handle) == policy.name:
+            return True
+
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(policy.blocked_urls)})
+            if handle:
+                self._applied[handle] = policy.name
+            logger.debug(f"Resource policy '{policy.name}' applied ({len(policy.blocked_urls)} blocked patterns)")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not apply resource policy '{policy.name}': {e}")
+            self._supported = False
+            return False
+
+    def navigate(self, url: str, policy: ResourcePolicy = LEAN_POLICY) -> NavigationMetrics:
+        """Load url in the current tab under policy and record what it cost"""
+        self.apply(policy)
+
+        started = time.time()
+        self.driver.get(url)
+        metrics = NavigationMetrics(url=url, policy=policy.name, wall_time=time.time() - started)
+
+        try:
+            raw = self.driver.execute_script(_METRICS_SCRIPT) or {}
+            metrics.load_ms = float(raw.get('load_ms') or 0)
+            metrics.dom_ready_ms = float(raw.get('dom_ready_ms') or 0)
+            metrics.transfer_bytes = int(raw.get('transfer_bytes') or 0)
+            metrics.requests = int(raw.get('requests') or 0)
+        except Exception as e:
+            logger.debug(f"Could not read navigation timing for {url}: {e}")
+
+        self.history.append(metrics)
+        logger.info(f"🌐 Loaded {url} in {metrics.wall_time:.2f}s "
+                    f"({metrics.transfer_bytes / 1024:.0f} KB, {metrics.requests} requests, {policy.name} policy)")
+        return metrics
+
+    def totals(self) -> Dict[str, PolicyTotals]:
+        """Aggregated navigation costs per policy"""
+        totals: Dict[str, PolicyTotals] = {}
+        for metrics in self.history:
+            entry = totals.setdefault(metrics.policy, PolicyTotals())
+            entry.navigations += 1
+            entry.wall_time += metrics.wall_time
+            entry.transfer_bytes += metrics.transfer_bytes
+            entry.requests += metrics.requests
+        return totals
+
+    def log_summary(self) -> None:
+        """Log navigation totals per policy"""
+        for name, entry in self.totals().items():
+            logger.info(f"📊 {entry.navigations} page loads under '{name}' policy: {entry.wall_time:.1f}s, "
+                        f"{entry.transfer_bytes / 1024:.0f} KB, {entry.requests} requests")
+
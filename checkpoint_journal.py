@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Journal
+Append-only JSONL record of a batch run: one line per MR stage that
+completed (fetched, documented, written, failed) with the paths of the
+artefacts it produced. Every line is flushed to the OS as it is written, so
+a Chrome crash or Ctrl+C loses nothing; fsync runs in batches (every N
+records or seconds, and on close) so a power loss costs at most the last
+batch without paying a disk sync per MR. Replaying the journal tells a
+resumed run which MRs are finished, where their fetched data was kept and
+what the summary has to contain
+
+Usage:
+    python checkpoint_journal.py documentation/.journal.jsonl    # show the state of a run
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+SYNC_EVERY = 10             # Records between fsyncs
+SYNC_INTERVAL = 5.0         # Seconds between fsyncs, whichever comes first
+
+FETCHED = 'fetched'
+DOCUMENTED = 'documented'
+WRITTEN = 'written'
+FAILED = 'failed'
+
+
+@dataclass
+class MRCheckpoint:
+    """Everything the journal knows about one MR"""
+    key: str
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)   # Stage -> data of its latest record
+
+    @property
+    def done(self) -> bool:
+        """Output was written; a later failure record does not undo that"""
+        return WRITTEN in self.stages
+
+    @property
+    def failed(self) -> bool:
+        return FAILED in self.stages and not self.done
+
+    def artefact(self, stage: str) -> Optional[Path]:
+        """Path recorded for stage, if the file still exists"""
+        path = self.stages.get(stage, {}).get('path')
+        return Path(path) if path and Path(path).is_file() else None
+
+
+def replay(path: Path) -> Dict[str, MRCheckpoint]:
+    """
+    Read a journal into per-MR checkpoints, in the order MRs first appear
+
+    A torn last line (the process died mid-write) is ignored.
+    """
+    checkpoints: Dict[str, MRCheckpoint] = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return checkpoints
+
+    for number, line in enumerate(lines, 1):
+        try:
+            record = json.loads(line)
+            key, stage = record['key'], record['stage']
+        except (ValueError, KeyError, TypeError):
+            if number < len(lines):
+                logger.warning(f"Skipping unreadable journal line {number} in {path}")
+            continue
+        checkpoint = checkpoints.setdefault(key, MRCheckpoint(key))
+        if stage != FAILED:
+            # A stage completed after an earlier failure (retried run) clears that failure
+            checkpoint.stages.pop(FAILED, None)
+        checkpoint.stages[stage] = record.get('data', {})
+
+    return checkpoints
+
+
+class CheckpointJournal:
+    """Writes a run's journal and answers resume questions from its previous contents"""
+
+    def __init__(self, path: str, resume: bool = False, sync_every: int = SYNC_EVERY,
+                 sync_interval: float = SYNC_INTERVAL):
+        """
+        Args:
+            path: Journal file; artefacts go to a directory next to it
+            resume: Keep and replay an existing journal instead of starting a new one
+            sync_every: Records between fsyncs
+            sync_interval: Maximum seconds between fsyncs
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.artefact_dir = self.path.with_name(self.path.stem + '_artefacts')
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+
+        self.checkpoints = replay(self.path) if resume else {}
+        if resume and self.checkpoints:
+            done = sum(1 for c in self.checkpoints.values() if c.done)
+            logger.info(f"📒 Resuming from {self.path}: {done}/{len(self.checkpoints)} MRs already written")
+
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if resume and self._ends_mid_line():
+            # Terminate the torn last line so the next record starts on its own
+            self._file.write('\n')
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._synced_at = time.time()
+
+    def __enter__(self) -> 'CheckpointJournal':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get(self, key: str) -> Optional[MRCheckpoint]:
+        """What an earlier run recorded for key"""
+        return self.checkpoints.get(key)
+
+    def is_done(self, key: str) -> bool:
+        checkpoint = self.checkpoints.get(key)
+        return bool(checkpoint and checkpoint.done)
+
+    def record(self, key: str, stage: str, **data) -> None:
+        """Append a stage completion for key; ignored once the journal is closed"""
+        line = json.dumps({'t': round(time.time(), 3), 'key': key, 'stage': stage, 'data': data},
+                          ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file.closed:
+                # A worker that outlived an interrupted run; the resumed run redoes its MR
+                logger.debug(f"Journal closed, not recording {stage} for {key}")
+                return
+            self._file.write(line + '\n')
+            self._file.flush()
+            checkpoint = self.checkpoints.setdefault(key, MRCheckpoint(key))
+            if stage != FAILED:
+                checkpoint.stages.pop(FAILED, None)
+            checkpoint.stages[stage] = data
+
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every or time.time() - self._synced_at >= self.sync_interval:
+                self._sync()
+
+    def save_artefact(self, key: str, stage: str, payload: Any) -> Path:
+        """Write payload as JSON next to the journal (atomically) and return its path"""
+        self.artefact_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+        path = self.artefact_dir / f"{stage}_{digest}.json"
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, default=str)
+        os.replace(tmp, path)
+        return path
+
+    def load_artefact(self, key: str, stage: str) -> Optional[Any]:
+        """Payload saved for key's stage by an earlier run, or None"""
+        checkpoint = self.checkpoints.get(key)
+        path = checkpoint.artefact(stage) if checkpoint else None
+        if not path:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not reuse {stage} artefact for {key}: {e}")
+            return None
+
+    def _ends_mid_line(self) -> bool:
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return False
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b'\n'
+        except OSError:
+            return False
+
+    def _sync(self):
+        try:
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logger.debug(f"Journal fsync failed: {e}")
+        self._unsynced = 0
+        self._synced_at = time.time()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync()
+            self._file.close()
+
+
+def main():
+    """Show the state of a journaled run"""
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+
+    checkpoints = replay(Path(sys.argv[1]))
+    if not checkpoints:
+        print(f"No journal records in {sys.argv[1]}")
+        return
+
+    for checkpoint in checkpoints.values():
+        state = 'done' if checkpoint.done else 'failed' if checkpoint.failed else 'incomplete'
+        print(f"{state:<10} {checkpoint.key}  ({', '.join(checkpoint.stages)})")
+    done = sum(1 for c in checkpoints.values() if c.done)
+    print(f"\n{done}/{len(checkpoints)} MRs written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Browser Cookie Bridge
+Copies the authenticated browser's GitLab cookies into a pooled
+requests.Session, so users who can only sign in through SSO still fetch raw
+files, .diff/.patch views and JSON endpoints at HTTP speed instead of
+driving the browser to each page and scraping <pre> text. Cookies are
+re-read from the browser when one of them expires, after a maximum age, and
+once whenever GitLab answers as if the session were signed out
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, Optional, Any
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from auth_probe import export_browser_cookies
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE = 300.0     # Seconds before cookies are re-read from the browser anyway
+DEFAULT_TIMEOUT = 30
+POOL_SIZE = 10
+
+
+class CookieBridge:
+    """HTTP access to GitLab with the browser's session"""
+
+    def __init__(self, driver, gitlab_url: str, verify: bool = True,
+                 max_age: float = DEFAULT_MAX_AGE, pool_size: int = POOL_SIZE):
+        """
+        Args:
+            driver: Selenium WebDriver signed in to GitLab
+            gitlab_url: GitLab instance URL
+            verify: Verify TLS certificates
+            max_age: Seconds after which cookies are refreshed from the browser
+            pool_size: Connections kept open to the GitLab host
+        """
+        self.driver = driver
+        self.gitlab_url = gitlab_url.rstrip('/')
+        self.host = urlparse(self.gitlab_url).hostname or ''
+        self.verify = verify
+        self.max_age = max_age
+        self.requests_sent = 0
+        self.refreshes = 0
+        self.signed_in: Optional[bool] = None   # False once GitLab rejected freshly read cookies
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._expires_at: Optional[float] = None
+
+    def refresh(self) -> int:
+        """Re-read GitLab cookies from the browser; returns how many were loaded"""
+        with self._lock:
+            cookies = [c for c in export_browser_cookies(self.driver) if self._applies(c)]
+            self.session.cookies.clear()
+            for cookie in cookies:
+                self.session.cookies.set(cookie['name'], cookie['value'],
+                                         domain=cookie.get('domain', self.host), path=cookie.get('path', '/'))
+
+            try:
+                self.session.headers['User-Agent'] = self.driver.execute_script("return navigator.userAgent")
+            except Exception:
+                pass
+
+            # CDP reports 'expires' (-1 for session cookies), WebDriver reports 'expiry'
+            expiries = [c.get('expires', c.get('expiry')) for c in cookies]
+            expiries = [e for e in expiries if e and e > 0]
+            self._expires_at = min(expiries) if expiries else None
+            self._loaded_at = time.time()
+            self.refreshes += 1
+
+        logger.debug(f"Cookie bridge loaded {len(cookies)} GitLab cookies from the browser")
+        return len(cookies)
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        """Earliest expiry (epoch seconds) of the loaded cookies; None for session cookies only"""
+        return self._expires_at
+
+    def _applies(self, cookie: Dict) -> bool:
+        domain = cookie.get('domain', '').lstrip('.')
+        return not domain or self.host == domain or self.host.endswith('.' + domain)
+
+    def _stale(self) -> bool:
+        now = time.time()
+        if not self._loaded_at or now - self._loaded_at >= self.max_age:
+            return True
+        return self._expires_at is not None and now >= self._expires_at
+
+    @staticmethod
+    def _signed_out(response: requests.Response) -> bool:
+        if response.status_code == 401:
+            return True
+        return response.is_redirect and '/users/sign_in' in response.headers.get('Location', '')
+
+    def get(self, path_or_url: str, **kwargs) -> Optional[requests.Response]:
+        """
+        GET a GitLab page with the browser session
+
+        Returns:
+            The response, or None if GitLab still treats the session as signed out
+            after refreshing cookies, or the request failed
+        """
+        url = path_or_url if path_or_url.startswith('http') else f"{self.gitlab_url}/{path_or_url.lstrip('/')}"
+        kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+        kwargs.setdefault('verify', self.verify)
+        kwargs.setdefault('allow_redirects', False)
+
+        if self._stale():
+            self.refresh()
+
+        try:
+            for attempt in range(2):
+                response = self.session.get(url, **kwargs)
+                self.requests_sent += 1
+                if not self._signed_out(response):
+                    self.signed_in = True
+                    return response
+                if attempt == 0:
+                    logger.debug(f"GitLab session cookies rejected for {url}; refreshing from the browser")
+                    self.refresh()
+            self.signed_in = False
+            logger.info(f"Browser session is not signed in to GitLab (cookie bridge, {url})")
+        except requests.RequestException as e:
+            logger.warning(f"Cookie bridge request failed for {url}: {e}")
+        return None
+
+    def get_text(self, path_or_url: str) -> Optional[str]:
+        """Body of a page that returned 200, e.g. a raw file or a .diff/.patch view"""
+        response = self.get(path_or_url)
+        if response is None or response.status_code != 200:
+            return None
+        return response.text
+
+    def get_json(self, path_or_url: str) -> Optional[Any]:
+        """Decoded JSON of an endpoint that returned 200"""
+        response = self.get(path_or_url, headers={'Accept': 'application/json'})
+        if response is None or response.status_code != 200:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    def raw_file(self, project_id: str, file_path: str, ref: str = 'main') -> Optional[str]:
+        """
+        Content of a file at ref
+
+        Returns:
+            The file content, or None if it could not be fetched over HTTP
+
+        Raises:
+            FileNotFoundError: if a signed-in request got 404 (the file does not exist at ref)
+        """
+        response = self.get(f"{project_id}/-/raw/{ref}/{file_path}")
+        if response is None:
+            return None
+        if response.status_code == 404:
+            raise FileNotFoundError(f"{file_path} not found at {ref} in {project_id}")
+        return response.text if response.status_code == 200 else None
+
+    def mr_diff(self, project_id: str, mr_iid: str, patch: bool = False) -> Optional[str]:
+        """Unified diff (or mailbox patch series) of a merge request"""
+        return self.get_text(f"{project_id}/-/merge_requests/{mr_iid}.{'patch' if patch else 'diff'}")
+
+    def mr_info(self, project_id: str, mr_iid: str) -> Optional[Dict]:
+        """Merge request attributes from the web UI's JSON endpoint"""
+        data = self.get_json(f"{project_id}/-/merge_requests/{mr_iid}.json")
+        return data if isinstance(data, dict) else None
+
+    def close(self):
+        self.session.close()
+        if self.requests_sent:
+            logger.info(f"🍪 Cookie bridge: {self.requests_sent} HTTP requests, {self.refreshes} cookie refreshes")
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Diff Noise Filter
+Pre-processes MR diffs before prompt construction: lockfiles and generated
+sources are summarised, whitespace-only and license-header hunks are dropped,
+and import-only hunks are reduced to a one-line note
+"""
+
+import re
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Optional
+
+logger = logging.getLogger(__name__)
+
+LOCKFILE_NAMES = (
+    'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml', 'npm-shrinkwrap.json',
+    'gemfile.lock', 'poetry.lock', 'pipfile.lock', 'composer.lock', 'cargo.lock', 'go.sum',
+    'gradle.lockfile'
+)
+
+GENERATED_PATH_PATTERNS = (
+    # Build output only at the repository root or, for Maven/Gradle modules, a module root;
+    # packages named build/out/generated inside a source tree are kept
+    r'^(target|build|dist|out|generated)/',
+    r'^(?!src/)[^/]+/(target|build)/',
+    r'(^|/)(generated-sources|node_modules)/',
+    r'\.min\.(js|css)$',
+    r'\.generated\.\w+$',
+    r'\.(js|css)\.map$',
+    r'_pb2(_grpc)?\.py$',
+    r'\.pb\.go$',
+    r'(^|/)__snapshots__/',
+)
+
+GENERATED_MARKERS = ('@generated', 'do not edit', 'code generated by', 'auto-generated', 'autogenerated')
+
+IMPORT_LINE_PATTERN = (
+    r'^\s*('
+    r'import\s|from\s+\S+\s+import\s|package\s|using\s|#include\s|#import\s'
+    r'|(const|let|var)\s+.*=\s*require\(|export\s+\*\s+from\s|export\s+\{[^}]*\}\s+from\s'
+    r')'
+)
+
+# Languages where whitespace between tokens carries no meaning; indentation-sensitive
+# sources (Python, YAML, Makefiles, Markdown) never have hunks dropped as whitespace-only
+WHITESPACE_INSENSITIVE_EXTENSIONS = (
+    '.java', '.kt', '.kts', '.scala', '.groovy', '.gradle', '.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs',
+    '.c', '.h', '.cc', '.cpp', '.hpp', '.cs', '.go', '.rs', '.swift', '.php',
+    '.css', '.scss', '.less', '.json', '.xml', '.html', '.sql'
+)
+
+# String literals stay single tokens, so whitespace inside them still counts as a change
+_TOKEN = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`[^`]*`|\w+|[^\w\s]')
+
+LICENSE_KEYWORDS = ('copyright', 'license', 'licensed', 'spdx-license-identifier', 'all rights reserved')
+COMMENT_PREFIXES = ('//', '/*', '*', '#', '<!--', '-->', '--', ';')
+
+# License headers live at the top of a file
+LICENSE_HEADER_MAX_LINE = 40
+# Generated-file markers are searched only in the first part of a diff
+MARKER_SCAN_CHARS = 2000
+
+_HUNK_OLD_START = re.compile(r'@@ -(\d+)')
+
+
+@dataclass
+class NoiseFilterConfig:
+    """Configuration for the diff noise filter"""
+    summarize_lockfiles: bool = True
+    summarize_generated: bool = True
+    drop_whitespace_hunks: bool = True
+    whitespace_insensitive_extensions: Tuple[str, ...] = WHITESPACE_INSENSITIVE_EXTENSIONS
+    summarize_import_hunks: bool = True
+    drop_license_headers: bool = True
+    lockfile_names: Tuple[str, ...] = LOCKFILE_NAMES
+    generated_path_patterns: Tuple[str, ...] = GENERATED_PATH_PATTERNS
+    generated_markers: Tuple[str, ...] = GENERATED_MARKERS
+
+
+@dataclass
+class NoiseFilterStats:
+    """Counters describing what the filter removed"""
+    files_seen: int = 0
+    files_summarized: int = 0
+    hunks_seen: int = 0
+    hunks_dropped: int = 0
+    hunks_summarized: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    by_kind: Counter = field(default_factory=Counter)
+
+    @property
+    def bytes_removed(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    def describe(self) -> str:
+        kinds = ', '.join(f"{kind}: {count}" for kind, count in sorted(self.by_kind.items())) or 'none'
+        return (f"removed {self.bytes_removed:,} of {self.bytes_in:,} diff bytes "
+                f"({self.files_summarized} files summarised, {self.hunks_dropped} hunks dropped, "
+                f"{self.hunks_summarized} hunks summarised; {kinds})")
+
+
+class DiffNoiseFilter:
+    """Classifies diff hunks and drops or summarises the noisy ones"""
+
+    def __init__(self, config: Optional[NoiseFilterConfig] = None):
+        self.config = config or NoiseFilterConfig()
+        self._lockfiles = frozenset(name.lower() for name in self.config.lockfile_names)
+        self._generated_path = re.compile('|'.join(self.config.generated_path_patterns), re.IGNORECASE)
+        self._import_line = re.compile(IMPORT_LINE_PATTERN)
+
+    def filter_changes(self, changes: List[Dict], diff_key: str = 'diff') -> Tuple[List[Dict], NoiseFilterStats]:
+        """
+        Filter the diffs of a list of change dictionaries
+
+        Works with raw GitLab changes ('new_path'/'old_path') as well as the
+        processed dictionaries used by the generators ('file_path'). Input
+        dictionaries are not modified.
+
+        Returns:
+            Tuple of (filtered changes, statistics)
+        """
+        stats = NoiseFilterStats()
+        filtered = []
+
+        for change in changes:
+            diff = change.get(diff_key) or ''
+            path = change.get('file_path') or change.get('new_path') or change.get('old_path') or ''
+
+            new_diff, kind = self.filter_diff(path, diff, stats)
+
+            if kind or new_diff != diff:
+                change = dict(change)
+                change[diff_key] = new_diff
+                if kind:
+                    change['noise'] = kind
+            filtered.append(change)
+
+        return filtered, stats
+
+    def filter_diff(self, path: str, diff: str, stats: Optional[NoiseFilterStats] = None) -> Tuple[str, Optional[str]]:
+        """
+        Filter a single file diff
+
+        Returns:
+            Tuple of (filtered diff, whole-file noise kind or None)
+        """
+        stats = stats if stats is not None else NoiseFilterStats()
+        stats.files_seen += 1
+        stats.bytes_in += len(diff)
+
+        kind = self._classify_file(path, diff)
+        if kind:
+            summary = self._summarize_file(kind, diff)
+            stats.files_summarized += 1
+            stats.by_kind[kind] += 1
+            stats.bytes_out += len(summary)
+            return summary, kind
+
+        if '@@' not in diff:
+            stats.bytes_out += len(diff)
+            return diff, None
+
+        output = []
+        for header, hunk_lines in self._split_hunks(diff):
+            if header is None:
+                output.extend(hunk_lines)
+                continue
+
+            stats.hunks_seen += 1
+            hunk_kind = self._classify_hunk(path, header, hunk_lines)
+
+            if hunk_kind is None:
+                output.append(header)
+                output.extend(hunk_lines)
+            elif hunk_kind == 'import-only':
+                added, removed = self._count_changes(hunk_lines)
+                output.append(header)
+                output.append(f"[omitted: import-only changes, +{added}/-{removed} lines]")
+                stats.hunks_summarized += 1
+                stats.by_kind[hunk_kind] += 1
+            else:
+                stats.hunks_dropped += 1
+                stats.by_kind[hunk_kind] += 1
+
+        new_diff = '\n'.join(output)
+        stats.bytes_out += len(new_diff)
+        return new_diff, None
+
+    def _classify_file(self, path: str, diff: str) -> Optional[str]:
+        """Detect files whose whole diff is noise"""
+        file_name = path.rsplit('/', 1)[-1].lower()
+
+        if self.config.summarize_lockfiles and file_name in self._lockfiles:
+            return 'lockfile'
+
+        if self.config.summarize_generated:
+            if self._generated_path.search(path):
+                return 'generated'
+            head = diff[:MARKER_SCAN_CHARS].lower()
+            if any(marker in head for marker in self.config.generated_markers):
+                return 'generated'
+
+        return None
+
+    def _summarize_file(self, kind: str, diff: str) -> str:
+        """One-line replacement for a noisy file diff"""
+        added, removed = self._count_changes(diff.split('\n'))
+        return f"[omitted: {kind} diff, +{added}/-{removed} lines]"
+
+    def _split_hunks(self, diff: str):
+        """Yield (header, lines) pairs; the file preamble has a None header"""
+        header = None
+        lines = []
+        for line in diff.split('\n'):
+            if line.startswith('@@'):
+                if header is not None or lines:
+                    yield header, lines
+                header, lines = line, []
+            else:
+                lines.append(line)
+        if header is not None or lines:
+            yield header, lines
+
+    def _classify_hunk(self, path: str, header: str, lines: List[str]) -> Optional[str]:
+        """Return the noise kind of a hunk, or None if it should be kept"""
+        added = [line[1:] for line in lines if line.startswith('+')]
+        removed = [line[1:] for line in lines if line.startswith('-')]
+
+        if (self.config.drop_whitespace_hunks
+                and path.lower().endswith(self.config.whitespace_insensitive_extensions)
+                and self._tokens(added) == self._tokens(removed)):
+            return 'whitespace-only'
+
+        changed = [line for line in added + removed if line.strip()]
+
+        if self.config.summarize_import_hunks and changed and all(self._import_line.match(line) for line in changed):
+            return 'import-only'
+
+        if self.config.drop_license_headers and self._is_license_header(header, changed):
+            return 'license-header'
+
+        return None
+
+    def _is_license_header(self, header: str, changed: List[str]) -> bool:
+        """Check whether a hunk only touches a license comment at the top of a file"""
+        match = _HUNK_OLD_START.match(header)
+        if not match or int(match.group(1)) > LICENSE_HEADER_MAX_LINE:
+            return False
+
+        if not all(line.lstrip().startswith(COMMENT_PREFIXES) for line in changed):
+            return False
+
+        text = ' '.join(changed).lower()
+        return any(keyword in text for keyword in LICENSE_KEYWORDS)
+
+    @staticmethod
+    def _tokens(lines: List[str]) -> List[str]:
+        """Token sequence of lines, with string literals kept whole"""
+        return _TOKEN.findall('\n'.join(lines))
+
+    @staticmethod
+    def _count_changes(lines: List[str]) -> Tuple[int, int]:
+        """Count added and removed lines, ignoring file headers"""
+        added = sum(1 for line in lines if line.startswith('+') and not line.startswith('+++'))
+        removed = sum(1 for line in lines if line.startswith('-') and not line.startswith('---'))
+        return added, removed
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+MR Documentation Renderer
+Renders MR documentation from precompiled templates (markdown and HTML) with
+reusable partials for file analysis, commit summary and impact assessment.
+Has no browser dependency, so offline batches run at disk speed
+"""
+
+import re
+import html
+import logging
+from datetime import datetime
+from functools import lru_cache
+from string import Template
+from urllib.parse import urlparse
+from typing import List, Dict, Any, Optional
+
+from analysis_backends import AnalysisRequest, ExtractiveSummaryBackend
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ('markdown', 'html')
+FILE_EXTENSIONS = {'markdown': '.md', 'html': '.html'}
+
+MAX_LISTED_FILES = 25
+MAX_LISTED_COMMITS = 5
+
+STATUS_EMOJI = {
+    'merged': '✅',
+    'opened': '🔄',
+    'closed': '❌'
+}
+
+# Template sources; compiled once per process by get_template()
+TEMPLATE_SOURCES = {
+    'markdown': {
+        'document': """# $status_emoji $title
+
+## Overview
+**MR !$iid** | **Project:** $project_name | **Type:** $project_type  
+**Author:** $author (@$author_username)  
+**Created:** $created | **Updated:** $updated  
+**Status:** $state | **Merge Status:** $merge_status  
+$pipeline_status  
+$milestone_info
+
+## Description
+$description
+
+## Technical Summary
+- **Files Modified:** $files_count files
+- **Lines Added:** $additions
+- **Lines Removed:** $deletions
+- **Commits:** $commits_count
+
+## Changes Overview
+
+### Modified Files
+$file_list
+
+### File Type Analysis
+$file_analysis
+
+## Commit History
+$commit_summary
+
+## Branch Information
+- **Source Branch:** `$source_branch`
+- **Target Branch:** `$target_branch`
+
+## Metadata
+- **Labels:** $labels
+- **Assignees:** $assignees
+- **Reviewers:** $reviewers
+- **GitLab URL:** [View MR]($web_url)
+
+## Impact Assessment
+$impact_assessment
+
+## Change Analysis
+$change_analysis
+
+---
+*Generated automatically from GitLab API on $generated_at*
+""",
+        'page': "$body\n",
+        'list': "$items",
+        'list_item': "- $text",
+    },
+    'html': {
+        'document': """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title_text</title>
+</head>
+<body>
+<h1>$status_emoji $title</h1>
+
+<h2>Overview</h2>
+<p><strong>MR !$iid</strong> | <strong>Project:</strong> $project_name | <strong>Type:</strong> $project_type<br>
+<strong>Author:</strong> $author (@$author_username)<br>
+<strong>Created:</strong> $created | <strong>Updated:</strong> $updated<br>
+<strong>Status:</strong> $state | <strong>Merge Status:</strong> $merge_status<br>
+$pipeline_status<br>
+$milestone_info</p>
+
+<h2>Description</h2>
+$description
+
+<h2>Technical Summary</h2>
+<ul>
+<li><strong>Files Modified:</strong> $files_count files</li>
+<li><strong>Lines Added:</strong> $additions</li>
+<li><strong>Lines Removed:</strong> $deletions</li>
+<li><strong>Commits:</strong> $commits_count</li>
+</ul>
+
+<h2>Changes Overview</h2>
+<h3>Modified Files</h3>
+$file_list
+
+<h3>File Type Analysis</h3>
+$file_analysis
+
+<h2>Commit History</h2>
+$commit_summary
+
+<h2>Branch Information</h2>
+<ul>
+<li><strong>Source Branch:</strong> <code>$source_branch</code></li>
+<li><strong>Target Branch:</strong> <code>$target_branch</code></li>
+</ul>
+
+<h2>Metadata</h2>
+<ul>
+<li><strong>Labels:</strong> $labels</li>
+<li><strong>Assignees:</strong> $assignees</li>
+<li><strong>Reviewers:</strong> $reviewers</li>
+<li><strong>GitLab URL:</strong> <a href="$web_url">View MR</a></li>
+</ul>
+
+<h2>Impact Assessment</h2>
+$impact_assessment
+
+<h2>Change Analysis</h2>
+$change_analysis
+
+<hr>
+<p><em>Generated automatically from GitLab API on $generated_at</em></p>
+</body>
+</html>
+""",
+        'page': """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title_text</title>
+</head>
+<body>
+$body
+</body>
+</html>
+""",
+        'list': "<ul>\n$items\n</ul>",
+        'list_item': "<li>$text</li>",
+    }
+}
+
+
+@lru_cache(maxsize=None)
+def get_template(output_format: str, name: str) -> Template:
+    """Return the compiled template, compiling it on first use"""
+    return Template(TEMPLATE_SOURCES[output_format][name])
+
+
+_INLINE_CODE = re.compile(r'`([^`]+)`')
+_BOLD = re.compile(r'\*\*(.+?)\*\*')
+_ITALIC = re.compile(r'(?<!\*)\*(?!\*)(.+?)(?<!\*)\*(?!\*)')
+_LINK = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+_LINK_SCHEMES = ('http', 'https', '')    # '' is a relative link
+
+
+def _link(match: re.Match) -> str:
+    # MR descriptions and Gemini answers are untrusted: no javascript:/data: links, no attribute breakout
+    label, target = match.group(1), html.unescape(match.group(2))
+    if urlparse(target).scheme.lower() not in _LINK_SCHEMES:
+        return label
+    return f'<a href="{html.escape(target, quote=True)}">{label}</a>'
+
+
+def inline_markdown_to_html(text: str) -> str:
+    """Convert the inline markdown used by the partials (code, bold, italic, links)"""
+    text = html.escape(text, quote=False)
+    text = _INLINE_CODE.sub(r'<code>\1</code>', text)
+    text = _BOLD.sub(r'<strong>\1</strong>', text)
+    text = _ITALIC.sub(r'<em>\1</em>', text)
+    return _LINK.sub(_link, text)
+
+
+def markdown_to_html(text: str) -> str:
+    """Minimal block-level conversion: headings, bullet lists, rules and paragraphs"""
+    blocks = []
+    list_items = []
+
+    def flush_list():
+        if list_items:
+            blocks.append("<ul>\n" + '\n'.join(f"<li>{item}</li>" for item in list_items) + "\n</ul>")
+            list_items.clear()
+
+    for raw_line in (text or '').split('\n'):
+        line = raw_line.rstrip()
+        stripped = line.lstrip()
+        if stripped.startswith(('- ', '* ')):
+            list_items.append(inline_markdown_to_html(stripped[2:]))
+            continue
+        flush_list()
+        if not stripped:
+            continue
+        heading = re.match(r'(#{1,6})\s+(.*)', stripped)
+        if heading:
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{inline_markdown_to_html(heading.group(2))}</h{level}>")
+        elif stripped in ('---', '***'):
+            blocks.append("<hr>")
+        else:
+            blocks.append(f"<p>{inline_markdown_to_html(stripped)}</p>")
+    flush_list()
+
+    return '\n'.join(blocks)
+
+
+class DocumentRenderer:
+    """Renders MRData-like objects (attribute access) into documentation"""
+
+    def __init__(self, output_format: str = 'markdown'):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+        self.output_format = output_format
+        self.extension = FILE_EXTENSIONS[output_format]
+        self.summarizer = ExtractiveSummaryBackend(heading_level=3)
+
+    def render(self, mr_data: Any) -> str:
+        """Render the full documentation for one MR"""
+        pipeline_status = f"**Pipeline:** {mr_data.pipeline_status}" if mr_data.pipeline_status else ""
+        milestone_info = f"**Milestone:** {mr_data.milestone}" if mr_data.milestone else ""
+
+        files = [f"`{file}`" for file in mr_data.files_changed[:MAX_LISTED_FILES]]
+        if len(mr_data.files_changed) > MAX_LISTED_FILES:
+            files.append(f"... and {len(mr_data.files_changed) - MAX_LISTED_FILES} more files")
+
+        values = {
+            'status_emoji': STATUS_EMOJI.get(mr_data.state, '📝'),
+            'title': self._text(mr_data.title),
+            'title_text': html.escape(mr_data.title),
+            'iid': mr_data.iid,
+            'project_name': self._text(mr_data.project_name),
+            'project_type': self._text(mr_data.project_type.replace('-', ' ').title()),
+            'author': self._text(mr_data.author),
+            'author_username': self._text(mr_data.author_username),
+            'created': (mr_data.created_at or '')[:10],
+            'updated': (mr_data.updated_at or '')[:10],
+            'state': self._text(mr_data.state.title()),
+            'merge_status': self._text(mr_data.merge_status),
+            'pipeline_status': self._inline(pipeline_status),
+            'milestone_info': self._inline(milestone_info),
+            'description': self._block(mr_data.description or 'No description provided'),
+            'files_count': len(mr_data.files_changed),
+            'additions': mr_data.additions,
+            'deletions': mr_data.deletions,
+            'commits_count': len(mr_data.commits),
+            'file_list': self._list(files),
+            'file_analysis': self.file_analysis(mr_data.changes),
+            'commit_summary': self.commit_summary(mr_data.commits[:10]),
+            'source_branch': self._text(mr_data.source_branch),
+            'target_branch': self._text(mr_data.target_branch),
+            'labels': self._text(', '.join(mr_data.labels) if mr_data.labels else 'None'),
+            'assignees': self._text(', '.join(mr_data.assignees) if mr_data.assignees else 'None'),
+            'reviewers': self._text(', '.join(mr_data.reviewers) if mr_data.reviewers else 'None'),
+            'web_url': html.escape(mr_data.web_url) if self.output_format == 'html' else mr_data.web_url,
+            'impact_assessment': self.impact_assessment(mr_data),
+            'change_analysis': self.change_analysis(mr_data),
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        return get_template(self.output_format, 'document').substitute(values)
+
+    def render_markdown(self, title: str, markdown: str) -> str:
+        """Render markdown produced elsewhere (e.g. a Gemini response) in the output format"""
+        if self.output_format == 'markdown':
+            return markdown
+        return get_template(self.output_format, 'page').substitute(
+            title_text=html.escape(title), body=markdown_to_html(markdown)
+        )
+
+    # Partials
+
+    def file_analysis(self, changes: List[Dict]) -> str:
+        """Counts of new, deleted, renamed and modified files"""
+        if not changes:
+            return self._inline("No detailed change information available")
+
+        new_files = [c for c in changes if c.get('new_file')]
+        deleted_files = [c for c in changes if c.get('deleted_file')]
+        renamed_files = [c for c in changes if c.get('renamed_file')]
+        modified_files = [c for c in changes if not any([c.get('new_file'), c.get('deleted_file'), c.get('renamed_file')])]
+
+        analysis = []
+        if new_files:
+            analysis.append(f"**New Files:** {len(new_files)} files created")
+        if deleted_files:
+            analysis.append(f"**Deleted Files:** {len(deleted_files)} files removed")
+        if renamed_files:
+            analysis.append(f"**Renamed Files:** {len(renamed_files)} files renamed")
+        if modified_files:
+            analysis.append(f"**Modified Files:** {len(modified_files)} files changed")
+
+        return self._list(analysis) if analysis else self._inline("No change type information available")
+
+    def commit_summary(self, commits: List[Dict]) -> str:
+        """First few commits with id, title and author"""
+        if not commits:
+            return self._inline("No commit information available")
+
+        summary = []
+        for commit in commits[:MAX_LISTED_COMMITS]:
+            title = (commit.get('title') or 'No title')[:60]
+            short_id = commit.get('short_id', '')
+            author = commit.get('author_name', 'Unknown')
+            summary.append(f"`{short_id}` {title} - *{author}*")
+
+        if len(commits) > MAX_LISTED_COMMITS:
+            summary.append(f"... and {len(commits) - MAX_LISTED_COMMITS} more commits")
+
+        return self._list(summary)
+
+    def impact_assessment(self, mr_data: Any) -> str:
+        """Size, spread and project-type based impact notes"""
+        impact = []
+
+        total_changes = mr_data.additions + mr_data.deletions
+        if total_changes > 1000:
+            impact.append("🔴 **High Impact**: Large changeset with 1000+ line changes")
+        elif total_changes > 500:
+            impact.append("🟡 **Medium Impact**: Moderate changeset with 500+ line changes")
+        else:
+            impact.append("🟢 **Low Impact**: Small changeset with minimal changes")
+
+        if len(mr_data.files_changed) > 20:
+            impact.append("📁 **Multiple Components**: Changes span across many files")
+
+        if mr_data.project_type == 'react':
+            impact.append("⚛️ **Frontend Impact**: React application changes")
+        elif mr_data.project_type == 'spring-boot':
+            impact.append("🍃 **Backend Impact**: Spring Boot application changes")
+        elif mr_data.project_type == 'mixed':
+            impact.append("🔄 **Full Stack Impact**: Both frontend and backend changes")
+
+        return self._lines(impact)
+
+    def change_analysis(self, mr_data: Any) -> str:
+        """Offline extractive analysis from the description, commits and diff structure"""
+        request = AnalysisRequest(
+            title=mr_data.title,
+            description=mr_data.description or '',
+            author=mr_data.author,
+            source_branch=mr_data.source_branch,
+            target_branch=mr_data.target_branch,
+            commits=mr_data.commits,
+            changes=mr_data.changes
+        )
+        analysis = self.summarizer.analyze(request) or 'No analysis available'
+        return self._block(analysis)
+
+    # Format helpers
+
+    def _text(self, value: Optional[str]) -> str:
+        value = '' if value is None else str(value)
+        return html.escape(value, quote=False) if self.output_format == 'html' else value
+
+    def _inline(self, markdown: str) -> str:
+        return inline_markdown_to_html(markdown) if self.output_format == 'html' else markdown
+
+    def _block(self, markdown: str) -> str:
+        return markdown_to_html(markdown) if self.output_format == 'html' else markdown
+
+    def _lines(self, items: List[str]) -> str:
+        if self.output_format == 'html':
+            return '<br>\n'.join(inline_markdown_to_html(item) for item in items)
+        return '\n'.join(items)
+
+    def _list(self, items: List[str]) -> str:
+        item_template = get_template(self.output_format, 'list_item')
+        rendered = [item_template.substitute(text=self._inline(item)) for item in items]
+        return get_template(self.output_format, 'list').substitute(items='\n'.join(rendered))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Gemini DOM Extraction
+Fetches the latest model turn (text and, optionally, its markdown-bearing
+HTML) in a single execute_script call instead of one find_elements plus one
+.text round trip per selector. Callers pass the turn count recorded before
+the prompt was sent, so only a new turn is returned and the rest of the
+conversation is never serialised
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Most specific first: the first selector that matches anything defines what a "turn" is
+RESPONSE_SELECTORS = [
+    "model-response",
+    "[data-test-id='response']",
+    "[data-testid='response']",
+    ".model-response",
+    ".response-content",
+    ".response-container",
+    ".markdown-content",
+    ".message-content",
+    ".chat-message"
+]
+
+_TURN_SCRIPT = """
+const [selectors, afterIndex, includeHtml] = arguments;
+const query = sel => {
+    try {
+        if (sel.startsWith('/') || sel.startsWith('(')) {
+            const snapshot = document.evaluate(sel, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let j = 0; j < snapshot.snapshotLength; j++) nodes.push(snapshot.snapshotItem(j));
+            return nodes;
+        }
+        return Array.from(document.querySelectorAll(sel));
+    } catch (e) {
+        return [];
+    }
+};
+for (const sel of selectors) {
+    const nodes = query(sel);
+    if (!nodes.length) continue;
+    if (nodes.length <= afterIndex) return {selector: sel, count: nodes.length, found: false};
+    const turn = nodes[nodes.length - 1];
+    return {
+        selector: sel,
+        count: nodes.length,
+        found: true,
+        text: (turn.innerText || '').trim(),
+        html: includeHtml ? turn.innerHTML : null
+    };
+}
+return {selector: null, count: 0, found: false};
+"""
+
+
+@dataclass
+class ExtractedTurn:
+    """The latest model turn as read from the page"""
+    text: str
+    html: Optional[str]
+    index: int           # Zero-based position of the turn among all matched turns
+    selector: str
+    elapsed: float
+
+
+class TurnExtractor:
+    """Reads the latest Gemini model turn with one WebDriver round trip"""
+
+    def __init__(self, driver, selectors: Optional[List[str]] = None):
+        """
+        Args:
+            driver: Selenium WebDriver on the Gemini tab
+            selectors: CSS selectors or XPath expressions (starting with '/' or '('), most specific first
+        """
+        self.driver = driver
+        self.selectors = selectors or RESPONSE_SELECTORS
+
+    def mark(self) -> int:
+        """Number of turns on the page; call right before submitting a prompt"""
+        try:
+            raw = self.driver.execute_script(_TURN_SCRIPT, self.selectors, 1 << 30, False)
+            return int((raw or {}).get('count', 0))
+        except Exception as e:
+            logger.debug(f"Could not count response turns: {e}")
+            return 0
+
+    def latest(self, after_index: Optional[int] = None, include_html: bool = False) -> Optional[ExtractedTurn]:
+        """
+        Return the last turn if it is newer than after_index
+
+        Args:
+            after_index: Turn count from mark(); None accepts whatever turn is last
+            include_html: Also return the turn's innerHTML (keeps code blocks and lists)
+        """
+        started = time.time()
+        try:
+            raw = self.driver.execute_script(_TURN_SCRIPT, self.selectors, after_index or 0, include_html)
+        except Exception as e:
+            logger.debug(f"Response extraction failed: {e}")
+            return None
+
+        if not raw or not raw.get('found'):
+            return None
+
+        return ExtractedTurn(
+            text=raw.get('text') or '',
+            html=raw.get('html'),
+            index=int(raw['count']) - 1,
+            selector=raw['selector'],
+            elapsed=time.time() - started
+        )
@@ -14,6 +14,17 @@ from typing import List, Dict
 import logging
 import re
 
+from gemini_response_protocol import SectionedResponseProtocol, IncrementalResponseParser, locate_response_start
+from analysis_backends import AnalysisRequest, ExtractiveSummaryBackend
+from prompt_injection import PromptInjector
+from selector_resolver import SelectorResolver
+from dom_extraction import TurnExtractor
+from gemini_conversation import ConversationManager
+from cdp_resource_policy import ResourcePolicyManager, LEAN_POLICY
+from readiness import wait_until, page_settled, network_idle, tab_opened, log_trace_summary
+from cookie_bridge import CookieBridge
+from login_detection import LoginDetector
+
 # Configure logging with more detailed format
 logging.basicConfig(
     level=logging.INFO,
@@ -97,6 +108,22 @@ REACT_PATTERNS = [
     r'const.*=.*\(\)\s*=>'
 ]
 
+# Sections requested from Gemini (parsed with the sectioned response protocol)
+ANALYSIS_SECTIONS = [
+    'Executive Summary',
+    'Technical Impact',
+    'Architecture Changes',
+    'Dependencies',
+    'Testing Strategy',
+    'Deployment Considerations',
+    'Risk Assessment',
+    'Code Quality'
+]
+GEMINI_RESPONSE_TIMEOUT = 180  # Seconds to wait for all sections
+
+# Analysis Configuration
+ANALYSIS_MODE = "gemini"  # "gemini" (local summary as fallback) or "quick" (local extractive summary only, no browser AI)
+
 # ========================================
 # END CONFIGURATION SECTION
 # ========================================
@@ -123,15 +150,22 @@ class GitLabMRDocumentationGenerator:
         self.browser_session_available = False
         self.skip_browser = SKIP_BROWSER_VERIFICATION
         self.gemini_ready = False
+        self.quick_mode = ANALYSIS_MODE == "quick"
+        self.local_summarizer = ExtractiveSummaryBackend()
 
         # Setup Chrome driver
         self.setup_chrome_driver()
+        self.selectors = SelectorResolver(self.driver)
+        self.turns = TurnExtractor(self.driver)
+        self.conversation = ConversationManager(self.driver, self.turns)
+        self.resources = ResourcePolicyManager(self.driver)
+        self.login_detector = LoginDetector(CookieBridge(self.driver, self.gitlab_url))
 
         # Verify GitLab authentication
         self.verify_gitlab_authentication()
 
         # Initialize Gemini web interface only if browser verification passed
-        if not self.skip_browser:
+        if not self.skip_browser and not self.quick_mode:
             self.setup_gemini_web_interface()
 
     def verify_gitlab_authentication(self):
@@ -246,6 +280,13 @@ class GitLabMRDocumentationGenerator:
         """Enhanced browser session verification for private GitLab instances"""
         try:
             logger.info("Verifying browser session with GitLab...")
+            
+            # A signed-in session is recognised from its cookies without loading a page
+            if self.login_detector.check(verify=getattr(self, 'ssl_verify', True)).signed_in:
+                logger.info("✓ Browser session verified successfully")
+                self.browser_session_available = True
+                return
+            
             self.driver.get(self.gitlab_url)
             
             # Wait for page to load
@@ -253,7 +294,7 @@ class GitLabMRDocumentationGenerator:
                 lambda driver: driver.execute_script("return document.readyState") == "complete"
             )
             
-            time.sleep(3)  # Additional wait for dynamic content
+            wait_until(self.driver, page_settled(), timeout=5, label='gitlab dynamic content')
             
             # Check current URL for redirects (common in corporate SSO)
             current_url = self.driver.current_url
@@ -280,6 +321,14 @@ class GitLabMRDocumentationGenerator:
 
     def _detect_login_page(self) -> bool:
         """Enhanced login page detection for various GitLab configurations"""
+        # The session cookies answer this in milliseconds; the page is only inspected if that is ambiguous
+        signed_in = self.login_detector.check(verify=getattr(self, 'ssl_verify', True)).signed_in
+        if signed_in is not None:
+            return not signed_in
+        return self._detect_login_page_dom()
+
+    def _detect_login_page_dom(self) -> bool:
+        """Login page detection from the loaded page's elements and text"""
         try:
             # Standard GitLab login selectors
             standard_selectors = [
@@ -333,6 +382,13 @@ class GitLabMRDocumentationGenerator:
 
     def _verify_authenticated_session(self) -> bool:
         """Enhanced authentication verification"""
+        signed_in = self.login_detector.check(verify=getattr(self, 'ssl_verify', True)).signed_in
+        if signed_in is not None:
+            return signed_in
+        return self._verify_authenticated_session_dom()
+
+    def _verify_authenticated_session_dom(self) -> bool:
+        """Authentication verification from the loaded page's elements and text"""
         try:
             # Look for authenticated user indicators
             auth_indicators = [
@@ -400,7 +456,7 @@ class GitLabMRDocumentationGenerator:
                 WebDriverWait(self.driver, VERIFICATION_TIMEOUT).until(
                     lambda driver: driver.execute_script("return document.readyState") == "complete"
                 )
-                time.sleep(3)
+                wait_until(self.driver, page_settled(), timeout=5, label='gitlab sign-in refresh')
                 
                 # Check if still on login page
                 if self._detect_login_page():
@@ -508,21 +564,27 @@ class GitLabMRDocumentationGenerator:
         try:
             mr_url = f"{self.gitlab_url}/{project_id}/-/merge_requests/{mr_iid}"
             
-            # Switch to GitLab tab
+            # Switch to GitLab tab; it only loads HTML and scripts (no images, fonts, avatars, analytics)
             self.driver.switch_to.window(self.driver.window_handles[0])
-            self.driver.get(mr_url)
+            self.resources.navigate(mr_url, LEAN_POLICY)
             
             # Wait for page load
             WebDriverWait(self.driver, VERIFICATION_TIMEOUT).until(
                 lambda driver: driver.execute_script("return document.readyState") == "complete"
             )
-            time.sleep(3)
 
             # Check for access denied or not found
             error_indicators = [
                 ".access-denied", ".not-found", ".error-message", 
                 ".permission-denied", ".page-404", ".error-content"
             ]
+            mr_indicators = [
+                ".merge-request", ".mr-widget", ".mr-state-widget", 
+                ".issuable-meta", ".merge-request-details", ".mr-tabs"
+            ]
+            
+            # Returns as soon as GitLab has rendered either the MR or an error page
+            self.selectors.find('gitlab-mr-page', mr_indicators + error_indicators, timeout=3)
             
             for selector in error_indicators:
                 if self.driver.find_elements(By.CSS_SELECTOR, selector):
@@ -539,11 +601,6 @@ class GitLabMRDocumentationGenerator:
                     return False
 
             # Look for MR content
-            mr_indicators = [
-                ".merge-request", ".mr-widget", ".mr-state-widget", 
-                ".issuable-meta", ".merge-request-details", ".mr-tabs"
-            ]
-            
             for selector in mr_indicators:
                 if self.driver.find_elements(By.CSS_SELECTOR, selector):
                     result['browser_accessible'] = True
@@ -683,7 +740,7 @@ class GitLabMRDocumentationGenerator:
             self.driver.execute_script("window.open('https://gemini.google.com/', '_blank');")
             
             # Wait for tab to open
-            time.sleep(3)
+            wait_until(self.driver, tab_opened(initial_tabs), timeout=5, label='gemini tab')
             new_tabs = len(self.driver.window_handles)
             logger.info(f"New number of browser tabs: {new_tabs}")
             
@@ -700,7 +757,7 @@ class GitLabMRDocumentationGenerator:
 
             # Wait for page to load
             logger.info("Waiting for Gemini page to load...")
-            time.sleep(8)  # Increased wait time
+            wait_until(self.driver, page_settled(), timeout=15, label='gemini page')
 
             # Check if we're on the right page
             current_url = self.driver.current_url
@@ -721,7 +778,7 @@ class GitLabMRDocumentationGenerator:
                 
                 # Refresh and check again
                 self.driver.refresh()
-                time.sleep(5)
+                wait_until(self.driver, page_settled(), timeout=10, label='gemini page')
                 page_text = self.driver.find_element(By.TAG_NAME, "body").text.lower()
 
             # Look for the input area with multiple strategies
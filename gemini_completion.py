@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Gemini Response Completion Detection
+Injects a MutationObserver through execute_async_script and resolves as soon
+as the last model turn has stopped changing for a quiet period, or when the
+stop control disappears / the regenerate control appears. Replaces fixed
+sleeps and multi-second polling with a single event-driven wait
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUIET_PERIOD = 0.8      # Seconds without changes in the last turn
+DEFAULT_START_TIMEOUT = 30.0    # Seconds to wait for the model turn to appear
+DEFAULT_TIMEOUT = 180.0
+POLL_INTERVAL_MS = 100          # In-page check interval (no WebDriver round-trips)
+
+RESPONSE_SELECTOR = ", ".join([
+    "model-response",
+    "[data-test-id='response']",
+    "[data-testid='response']",
+    ".model-response",
+    ".response-content",
+    ".message-content",
+    ".markdown-content"
+])
+
+# Visible while Gemini is still generating
+BUSY_SELECTOR = ", ".join([
+    "button[aria-label*='Stop']",
+    "[data-test-id='stop-button']",
+    ".stop-button",
+    "[aria-busy='true']",
+    ".loading-indicator",
+    ".spinner"
+])
+
+# Appear once per finished turn
+DONE_SELECTOR = ", ".join([
+    "button[aria-label*='Regenerate']",
+    "button[aria-label*='Redo']",
+    "[data-test-id='regenerate-button']",
+    "button[aria-label*='Good response']"
+])
+
+_BASELINE_SCRIPT = """
+const [responseSel, doneSel] = arguments;
+return [document.querySelectorAll(responseSel).length,
+        doneSel ? document.querySelectorAll(doneSel).length : 0];
+"""
+
+_COMPLETION_SCRIPT = """
+const [responseSel, busySel, doneSel, baseTurns, baseDone, quietMs, startMs, timeoutMs, pollMs] = arguments;
+const callback = arguments[arguments.length - 1];
+const t0 = performance.now();
+const minTurns = baseTurns < 0 ? 0 : baseTurns;
+const doneBaseline = baseDone < 0 ? Infinity : baseDone;
+
+const lastTurn = () => {
+    const turns = document.querySelectorAll(responseSel);
+    return turns.length > minTurns ? turns[turns.length - 1] : null;
+};
+const visible = sel => !!sel && Array.from(document.querySelectorAll(sel)).some(el => el.offsetParent !== null);
+
+let lastChange = t0, activity = false, busySeen = false, finished = false, timer = null;
+
+const observer = new MutationObserver(mutations => {
+    const turn = lastTurn();
+    if (turn && mutations.some(m => turn.contains(m.target) || m.target.contains(turn))) {
+        lastChange = performance.now();
+        activity = true;
+    }
+});
+observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+
+const finish = reason => {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearInterval(timer);
+    const turn = lastTurn();
+    callback({reason: reason, elapsed: (performance.now() - t0) / 1000,
+              length: turn ? (turn.innerText || '').trim().length : 0});
+};
+
+timer = setInterval(() => {
+    const now = performance.now();
+    const turn = lastTurn();
+    const hasText = !!turn && (turn.innerText || '').trim().length > 0;
+    const busy = visible(busySel);
+    if (busy) busySeen = true;
+
+    if (hasText && !busy) {
+        if (busySeen) return finish('control');
+        if (doneSel && document.querySelectorAll(doneSel).length > doneBaseline) return finish('control');
+        // Without a baseline the last turn may be an old one: require fresh activity
+        if ((baseTurns >= 0 || activity) && now - lastChange >= quietMs) return finish('quiet');
+    } else if (!hasText && !busySeen && now - t0 >= startMs) {
+        return finish('no-response');
+    }
+    if (now - t0 >= timeoutMs) finish('timeout');
+}, pollMs);
+"""
+
+
+@dataclass
+class CompletionResult:
+    """Outcome of waiting for a Gemini response"""
+    completed: bool
+    reason: str          # 'quiet', 'control', 'no-response', 'timeout' or 'error'
+    elapsed: float
+    text_length: int = 0
+
+
+class GeminiCompletionDetector:
+    """Waits for the Gemini model turn to finish without sleeping"""
+
+    def __init__(self, driver, quiet_period: float = DEFAULT_QUIET_PERIOD,
+                 start_timeout: float = DEFAULT_START_TIMEOUT,
+                 response_selector: str = RESPONSE_SELECTOR,
+                 busy_selector: str = BUSY_SELECTOR,
+                 done_selector: str = DONE_SELECTOR):
+        self.driver = driver
+        self.quiet_period = quiet_period
+        self.start_timeout = start_timeout
+        self.response_selector = response_selector
+        self.busy_selector = busy_selector
+        self.done_selector = done_selector
+        self._baseline = None
+
+    def mark(self) -> None:
+        """Record the current turn count; call right before submitting the prompt"""
+        try:
+            turns, done = self.driver.execute_script(_BASELINE_SCRIPT, self.response_selector, self.done_selector)
+            self._baseline = (int(turns), int(done))
+        except Exception as e:
+            logger.debug(f"Could not record response baseline: {e}")
+            self._baseline = None
+
+    def _script_timeout(self):
+        """Current async-script timeout of the driver in seconds, or None if it cannot be read"""
+        try:
+            return self.driver.timeouts.script
+        except Exception:
+            return None
+
+    def wait(self, timeout: float = DEFAULT_TIMEOUT, keep_mark: bool = False) -> CompletionResult:
+        """
+        Block until the response is complete or the timeout expires
+
+        Without a prior mark() the detector only trusts turns that change while
+        it is watching, so an older finished answer is never mistaken for the new one.
+        With keep_mark the baseline survives the call, so the wait can be split
+        into short slices (e.g. to stream partial text between them).
+        """
+        base_turns, base_done = self._baseline if self._baseline else (-1, -1)
+        started = time.time()
+        previous_timeout = self._script_timeout()
+
+        try:
+            self.driver.set_script_timeout(timeout + 10)
+            raw = self.driver.execute_async_script(
+                _COMPLETION_SCRIPT,
+                self.response_selector, self.busy_selector, self.done_selector,
+                base_turns, base_done,
+                int(self.quiet_period * 1000), int(self.start_timeout * 1000), int(timeout * 1000),
+                POLL_INTERVAL_MS
+            )
+        except Exception as e:
+            logger.warning(f"Completion detector failed, falling back to polling: {e}")
+            return CompletionResult(False, 'error', time.time() - started)
+        finally:
+            if not keep_mark:
+                self._baseline = None
+            # The driver is shared: other async scripts keep the timeout they configured
+            if previous_timeout is not None:
+                try:
+                    self.driver.set_script_timeout(previous_timeout)
+                except Exception as e:
+                    logger.debug(f"Could not restore the script timeout: {e}")
+
+        reason = (raw or {}).get('reason', 'error')
+        result = CompletionResult(
+            completed=reason in ('quiet', 'control'),
+            reason=reason,
+            elapsed=float((raw or {}).get('elapsed', time.time() - started)),
+            text_length=int((raw or {}).get('length', 0))
+        )
+        level = logging.DEBUG if keep_mark and not result.completed else logging.INFO
+        logger.log(level, f"Gemini response {'complete' if result.completed else 'not complete'} "
+                          f"({result.reason}) after {result.elapsed:.1f}s, {result.text_length} chars")
+        return result
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Gemini Conversation Lifecycle
+Starts a fresh Gemini chat once the current one has N turns or its DOM
+has grown past M KB, so selector scans, text extraction and the body-text
+fallbacks stay fast over long batches and old answers cannot be picked up
+by mistake. Turn indices are tracked explicitly, and DOM size and
+extraction latency are recorded for every prompt
+"""
+
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from dom_extraction import TurnExtractor, ExtractedTurn
+from readiness import wait_until, element_present, all_of, GEMINI_INPUT_SELECTORS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TURNS = 8
+DEFAULT_MAX_DOM_KB = 2048
+NEW_CHAT_URL = "https://gemini.google.com/app"
+
+NEW_CHAT_SELECTORS = [
+    "[data-test-id='new-chat-button'] button",
+    "[data-test-id='new-chat-button']",
+    "button[aria-label*='New chat']",
+    "a[aria-label*='New chat']",
+    "a[href='/app']"
+]
+
+_DOM_SIZE_SCRIPT = """
+return [document.documentElement.outerHTML.length, document.getElementsByTagName('*').length];
+"""
+
+_CLICK_FIRST_VISIBLE_SCRIPT = """
+for (const sel of arguments[0]) {
+    const el = Array.from(document.querySelectorAll(sel)).find(e => e.offsetWidth || e.offsetHeight);
+    if (el) { el.click(); return sel; }
+}
+return null;
+"""
+
+
+@dataclass
+class TurnRecord:
+    """Cost of one prompt/response turn"""
+    label: str
+    chat: int                  # Sequence number of the chat the turn ran in
+    turn_index: int            # Model turns in the chat before this prompt
+    dom_kb: float
+    dom_nodes: int
+    extractions: int = 0
+    extraction_ms: float = 0.0
+    response_chars: int = 0
+
+    @property
+    def avg_extraction_ms(self) -> float:
+        return self.extraction_ms / self.extractions if self.extractions else 0.0
+
+
+@dataclass
+class ConversationStats:
+    chats_started: int = 1
+    records: List[TurnRecord] = field(default_factory=list)
+
+
+class ConversationManager:
+    """Owns the Gemini chat used for a batch and rotates it when it grows too large"""
+
+    def __init__(self, driver, turns: Optional[TurnExtractor] = None,
+                 max_turns: int = DEFAULT_MAX_TURNS, max_dom_kb: float = DEFAULT_MAX_DOM_KB):
+        """
+        Args:
+            driver: Selenium WebDriver; the Gemini tab must be current when turns start
+            turns: Extractor shared with the caller (a default one is created otherwise)
+            max_turns: Model turns after which a new chat is started
+            max_dom_kb: DOM size after which a new chat is started
+        """
+        self.driver = driver
+        self.turns = turns or TurnExtractor(driver)
+        self.max_turns = max_turns
+        self.max_dom_kb = max_dom_kb
+        self.stats = ConversationStats()
+        self.turn_index: Optional[int] = None
+        self._current: Optional[TurnRecord] = None
+
+    def start_turn(self, label: str = '', allow_rotation: bool = True) -> int:
+        """
+        Prepare the chat for the next prompt; call before entering the prompt
+
+        Follow-up prompts that rely on the previous answer pass allow_rotation=False.
+
+        Returns:
+            Turn count before the prompt, to be passed to the extractor as after_index
+        """
+        if self._current:
+            self.finish_turn()
+
+        dom_kb, dom_nodes = self.dom_size()
+        turn_count = self.turns.mark()
+
+        if allow_rotation and turn_count and (turn_count >= self.max_turns or dom_kb >= self.max_dom_kb):
+            logger.info(f"🔄 Starting a new Gemini chat ({turn_count} turns, {dom_kb:.0f} KB DOM)")
+            if self.new_chat():
+                dom_kb, dom_nodes = self.dom_size()
+                turn_count = self.turns.mark()
+
+        self.turn_index = turn_count
+        self._current = TurnRecord(
+            label=label or f"turn {len(self.stats.records) + 1}",
+            chat=self.stats.chats_started,
+            turn_index=turn_count,
+            dom_kb=dom_kb,
+            dom_nodes=dom_nodes
+        )
+        self.stats.records.append(self._current)
+        return turn_count
+
+    def latest(self, include_html: bool = False) -> Optional[ExtractedTurn]:
+        """Response to the current prompt, if it has appeared"""
+        started = time.time()
+        turn = self.turns.latest(after_index=self.turn_index, include_html=include_html)
+        if self._current:
+            self._current.extractions += 1
+            self._current.extraction_ms += (time.time() - started) * 1000
+            if turn:
+                self._current.response_chars = len(turn.text)
+        return turn
+
+    def finish_turn(self) -> Optional[TurnRecord]:
+        """Log the cost of the current turn"""
+        record, self._current = self._current, None
+        if record:
+            logger.info(f"📏 {record.label}: chat {record.chat}, turn {record.turn_index + 1}, "
+                        f"DOM {record.dom_kb:.0f} KB / {record.dom_nodes} nodes, "
+                        f"extraction {record.avg_extraction_ms:.1f} ms avg, {record.response_chars} chars")
+        return record
+
+    def new_chat(self) -> bool:
+        """Open a fresh chat and wait until it is empty and ready for input"""
+        try:
+            clicked = self.driver.execute_script(_CLICK_FIRST_VISIBLE_SCRIPT, NEW_CHAT_SELECTORS)
+            if not clicked:
+                self.driver.get(NEW_CHAT_URL)
+
+            def chat_empty(driver) -> bool:
+                return self.turns.mark() == 0
+
+            ready = wait_until(self.driver, all_of(element_present(*GEMINI_INPUT_SELECTORS), chat_empty),
+                               timeout=15, label='gemini new chat')
+            if not ready:
+                logger.warning("New Gemini chat did not become ready; continuing in the current page")
+                return False
+
+            self.stats.chats_started += 1
+            return True
+        except Exception as e:
+            logger.warning(f"Could not start a new Gemini chat: {e}")
+            return False
+
+    def dom_size(self) -> Tuple[float, int]:
+        """(KB of serialised DOM, element count) of the current page"""
+        try:
+            chars, nodes = self.driver.execute_script(_DOM_SIZE_SCRIPT)
+            return chars / 1024, int(nodes)
+        except Exception as e:
+            logger.debug(f"Could not measure DOM size: {e}")
+            return 0.0, 0
+
+    def log_summary(self) -> None:
+        """Log totals over all turns"""
+        records = self.stats.records
+        if not records:
+            return
+        extraction_ms = sum(r.extraction_ms for r in records)
+        extractions = sum(r.extractions for r in records)
+        logger.info(f"💬 {len(records)} Gemini turns in {self.stats.chats_started} chats, "
+                    f"max DOM {max(r.dom_kb for r in records):.0f} KB, "
+                    f"extraction {extraction_ms / extractions if extractions else 0:.1f} ms avg")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Gemini Sectioned Response Protocol
+Asks Gemini to wrap every documentation section in explicit markers, parses
+the growing response incrementally, and builds follow-up prompts that ask
+only for the sections that are still missing
+"""
+
+import re
+import logging
+from typing import List, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Markers use plain characters so they survive Gemini's markdown rendering
+SECTION_BEGIN = "@@SECTION {key}@@"
+SECTION_END = "@@END {key}@@"
+RESPONSE_END = "@@END OF RESPONSE@@"
+
+_ANY_SECTION_BEGIN = re.compile(r'@@SECTION ([A-Z0-9_]+)@@')
+
+
+def section_key(title: str) -> str:
+    """Turn a section title into its marker key ('Risk Assessment' -> 'RISK_ASSESSMENT')"""
+    return re.sub(r'[^A-Z0-9]+', '_', title.upper()).strip('_')
+
+
+def locate_response_start(text: str) -> int:
+    """
+    Return the index of the first section marker of the latest response in text, or -1
+
+    Earlier answers in the same chat carry markers too. Every prompt and every
+    finished answer contains the end marker, so the latest response starts
+    after the last end marker that is still followed by a section.
+    """
+    text = text or ''
+    boundary = 0
+    for end in reversed([match.end() for match in re.finditer(re.escape(RESPONSE_END), text)]):
+        if _ANY_SECTION_BEGIN.search(text, end):
+            boundary = end
+            break
+    match = _ANY_SECTION_BEGIN.search(text, boundary)
+    return match.start() if match else -1
+
+
+class SectionedResponseProtocol:
+    """Describes the sections requested from Gemini and how to ask for them"""
+
+    def __init__(self, sections: List[str]):
+        if not sections:
+            raise ValueError("At least one section is required")
+        self.titles = list(sections)
+        self.keys = [section_key(title) for title in sections]
+        self.title_for_key = dict(zip(self.keys, self.titles))
+
+    def instructions(self, sections: Optional[List[str]] = None) -> str:
+        """Formatting rules to append to a prompt"""
+        keys = sections or self.keys
+        lines = [
+            "**Response format (required):**",
+            f"- Wrap every section between a line {SECTION_BEGIN.format(key='<KEY>')} "
+            f"and a line {SECTION_END.format(key='<KEY>')}",
+            "- Write markdown inside the sections, but do not add headings for the section itself",
+            f"- After the last section write the line {RESPONSE_END}",
+            "- Sections, in this order (KEY: content):"
+        ]
+        for key in keys:
+            lines.append(f"  - {key}: {self.title_for_key[key]}")
+        return '\n'.join(lines)
+
+    def parser(self) -> 'IncrementalResponseParser':
+        """Create a parser for a response to this protocol"""
+        return IncrementalResponseParser(self.keys)
+
+    def followup_prompt(self, missing: List[str]) -> str:
+        """Prompt that re-requests only the missing sections"""
+        titles = ', '.join(self.title_for_key[key] for key in missing)
+        return (f"Your previous answer was incomplete. Please write only the following sections: {titles}.\n\n"
+                + self.instructions(missing))
+
+    def render_markdown(self, sections: Dict[str, str], heading_level: int = 2) -> str:
+        """Render parsed sections as markdown in protocol order"""
+        prefix = '#' * heading_level
+        parts = []
+        for key in self.keys:
+            if key in sections:
+                parts.append(f"{prefix} {self.title_for_key[key]}\n\n{sections[key]}")
+        return '\n\n'.join(parts)
+
+
+class IncrementalResponseParser:
+    """
+    Parses a response snapshot that grows over time
+
+    feed() accepts the full text scraped so far. Closed sections are consumed
+    once and the parser resumes scanning after the last one, so repeated
+    polling costs only the newly generated text.
+    """
+
+    def __init__(self, keys: List[str]):
+        self.keys = list(keys)
+        self.sections: Dict[str, str] = {}
+        self.response_ended = False
+        self._offset = 0
+        self._anchor = ''
+        self._expected = set(keys)
+        self._section_pattern = re.compile(
+            r'@@SECTION (?P<key>[A-Z0-9_]+)@@(?P<body>.*?)@@END (?P=key)@@', re.DOTALL
+        )
+
+    @property
+    def is_complete(self) -> bool:
+        """All requested sections have been received"""
+        return all(key in self.sections for key in self.keys)
+
+    @property
+    def is_finished(self) -> bool:
+        """No more text is expected: everything arrived or Gemini closed the response"""
+        return self.is_complete or self.response_ended
+
+    def missing(self) -> List[str]:
+        """Keys of sections that have not been received, in protocol order"""
+        return [key for key in self.keys if key not in self.sections]
+
+    def feed(self, snapshot: str) -> List[str]:
+        """
+        Parse the latest response snapshot
+
+        Returns:
+            Keys of sections completed by this snapshot
+        """
+        snapshot = snapshot or ''
+
+        # The snapshot no longer extends what was parsed (e.g. a different turn): start over
+        if self._offset and snapshot[max(0, self._offset - len(self._anchor)):self._offset] != self._anchor:
+            self._offset = 0
+            self._anchor = ''
+
+        completed = []
+        for match in self._section_pattern.finditer(snapshot, self._offset):
+            key = match.group('key')
+            self._offset = match.end()
+            if key not in self._expected or key in self.sections:
+                continue
+            self.sections[key] = match.group('body').strip()
+            completed.append(key)
+
+        self._anchor = snapshot[max(0, self._offset - 32):self._offset]
+
+        # Only trust the end marker once this turn produced a section; a stale
+        # previous turn still ends with the marker while a follow-up is pending
+        if self.sections and RESPONSE_END in snapshot[self._offset:]:
+            self.response_ended = True
+
+        return completed
+
+    def merge(self, other: 'IncrementalResponseParser') -> None:
+        """Add sections received by a follow-up parser"""
+        for key, body in other.sections.items():
+            self.sections.setdefault(key, body)
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Gemini Session Pool
+Runs N browser sessions, each with its own Gemini conversation, fed from a
+shared work queue. Sessions are health-checked before every item, crashed
+sessions are replaced transparently and results come back in input order.
+The pool size is capped by the memory available for Chrome instances
+"""
+
+import os
+import queue
+import logging
+import threading
+from dataclasses import dataclass
+from typing import List, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 2
+CHROME_SESSION_MB = 600      # Typical resident size of a Chrome instance with a Gemini tab
+MEMORY_RESERVE_MB = 1024     # Left free for the OS and this process
+MAX_SESSION_RESTARTS = 2     # Per worker, before it gives up and leaves the queue to the others
+MAX_ATTEMPTS = 2             # Per item, when the session crashed while working on it
+
+
+def available_memory_mb() -> Optional[int]:
+    """Memory available for new processes, or None if it cannot be determined"""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def limit_pool_size(requested: int, per_session_mb: int = CHROME_SESSION_MB,
+                    reserve_mb: int = MEMORY_RESERVE_MB) -> int:
+    """Clamp the requested session count to what fits in available memory"""
+    requested = max(1, requested)
+    available = available_memory_mb()
+    if available is None:
+        return requested
+
+    fits = max(1, (available - reserve_mb) // per_session_mb)
+    if fits < requested:
+        logger.warning(f"Limiting Gemini sessions to {fits} (requested {requested}, "
+                       f"{available} MB available, ~{per_session_mb} MB per session)")
+    return min(requested, fits)
+
+
+@dataclass
+class PoolStats:
+    """Counters describing pool activity"""
+    sessions_started: int = 0
+    sessions_replaced: int = 0
+    items_retried: int = 0
+    items_failed: int = 0
+
+
+class SessionUnavailableError(RuntimeError):
+    """No healthy session could be provided for an item"""
+
+
+class GeminiSessionPool:
+    """
+    Pool of long-lived browser sessions working through a shared queue
+
+    Sessions are created lazily by the factory inside their worker thread and
+    kept across map() calls, so every session keeps its authenticated Gemini
+    conversation until close().
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = DEFAULT_POOL_SIZE,
+                 health_check: Optional[Callable[[Any], bool]] = None,
+                 close: Optional[Callable[[Any], None]] = None,
+                 per_session_mb: int = CHROME_SESSION_MB):
+        """
+        Args:
+            factory: Creates a ready-to-use session (e.g. a Gemini browser integration)
+            size: Requested number of sessions; capped by available memory
+            health_check: Returns False for sessions that must be replaced
+            close: Releases a session
+            per_session_mb: Memory estimate used to cap the pool size
+        """
+        self.factory = factory
+        self.size = limit_pool_size(size, per_session_mb)
+        self.health_check = health_check or (lambda session: True)
+        self.close_session = close or (lambda session: None)
+        self.stats = PoolStats()
+        self._sessions: List[Any] = [None] * self.size
+        self._start_failures: List[int] = [0] * self.size
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'GeminiSessionPool':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def map(self, work: Callable[[Any, Any], Any], items: List[Any]) -> List[Any]:
+        """
+        Process items on the pool sessions
+
+        Args:
+            work: Called as work(session, item)
+            items: Work items
+
+        Returns:
+            One result per item in input order; failed items hold the exception
+        """
+        if not items:
+            return []
+
+        tasks = queue.Queue()
+        for index, item in enumerate(items):
+            tasks.put((index, item, 1))
+
+        results: List[Any] = [None] * len(items)
+        workers = [
+            threading.Thread(target=self._worker, args=(slot, work, tasks, results),
+                             name=f"gemini-session-{slot}", daemon=True)
+            for slot in range(min(self.size, len(items)))
+        ]
+        logger.info(f"Processing {len(items)} items on {len(workers)} Gemini sessions")
+
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        # Every worker gave up: whatever is left cannot be processed
+        while not tasks.empty():
+            index, _, _ = tasks.get_nowait()
+            results[index] = SessionUnavailableError("No healthy Gemini session available")
+            self._count('items_failed')
+
+        return results
+
+    def session(self, slot: int) -> Any:
+        """
+        Healthy session of a slot, for callers that run their own workers (one per slot)
+
+        Raises:
+            SessionUnavailableError: if the slot's session cannot be (re)started
+        """
+        slot %= self.size
+        if self._start_failures[slot] > MAX_SESSION_RESTARTS:
+            raise SessionUnavailableError(f"Session {slot} gave up after {MAX_SESSION_RESTARTS} restarts")
+        try:
+            return self._healthy_session(slot)
+        except Exception as e:
+            self._start_failures[slot] += 1
+            logger.error(f"Session {slot}: could not start ({e}), "
+                         f"restart {self._start_failures[slot]}/{MAX_SESSION_RESTARTS}")
+            if isinstance(e, SessionUnavailableError):
+                raise
+            raise SessionUnavailableError(f"Session {slot} could not start: {e}") from e
+
+    def call(self, slot: int, work: Callable[[Any, Any], Any], item: Any) -> Any:
+        """
+        Run work(session, item) on a slot's session, retrying on a fresh session if it crashed
+
+        A crash counts when work() raises on a session that then fails its
+        health check, or when work() returned (e.g. fallback output after
+        swallowing the browser error) but the session is no longer healthy.
+
+        Raises:
+            SessionUnavailableError: if the slot's session cannot be (re)started
+        """
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            session = self.session(slot)
+            try:
+                result = work(session, item)
+            except Exception as e:
+                if self._is_healthy(session) or attempt == MAX_ATTEMPTS:
+                    self._count('items_failed')
+                    raise
+                logger.warning(f"Session {slot} crashed ({e}), retrying on a fresh session")
+                self._count('items_retried')
+                continue
+            if attempt < MAX_ATTEMPTS and not self._is_healthy(session):
+                logger.warning(f"Session {slot} crashed during its item, retrying on a fresh session")
+                self._count('items_retried')
+                continue
+            return result
+
+    def close(self) -> None:
+        """Close all sessions"""
+        for slot, session in enumerate(self._sessions):
+            if session is not None:
+                self._close(session)
+                self._sessions[slot] = None
+
+    def _worker(self, slot: int, work: Callable[[Any, Any], Any], tasks: queue.Queue, results: List[Any]):
+        restarts = 0
+
+        while True:
+            try:
+                index, item, attempt = tasks.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                session = self._healthy_session(slot)
+            except Exception as e:
+                restarts += 1
+                logger.error(f"Session {slot}: could not start ({e}), restart {restarts}/{MAX_SESSION_RESTARTS}")
+                tasks.put((index, item, attempt))
+                if restarts > MAX_SESSION_RESTARTS:
+                    logger.error(f"Session {slot}: giving up, remaining items go to other sessions")
+                    return
+                continue
+
+            try:
+                result = work(session, item)
+                if attempt < MAX_ATTEMPTS and not self._is_healthy(session):
+                    # The work degraded to its fallback because the browser died under it
+                    logger.warning(f"Session {slot} crashed on item {index}, retrying on a fresh session")
+                    tasks.put((index, item, attempt + 1))
+                    self._count('items_retried')
+                    continue
+                results[index] = result
+            except Exception as e:
+                if self._is_healthy(session):
+                    logger.error(f"Session {slot}: item {index} failed: {e}")
+                    results[index] = e
+                    self._count('items_failed')
+                elif attempt < MAX_ATTEMPTS:
+                    logger.warning(f"Session {slot} crashed on item {index} ({e}), retrying on a fresh session")
+                    tasks.put((index, item, attempt + 1))
+                    self._count('items_retried')
+                else:
+                    logger.error(f"Item {index} failed after {attempt} attempts: {e}")
+                    results[index] = e
+                    self._count('items_failed')
+
+    def _healthy_session(self, slot: int) -> Any:
+        """Return the slot's session, creating or replacing it as needed"""
+        session = self._sessions[slot]
+
+        if session is not None and not self._is_healthy(session):
+            logger.warning(f"Session {slot} failed its health check, replacing it")
+            self._close(session)
+            self._sessions[slot] = session = None
+            self._count('sessions_replaced')
+
+        if session is None:
+            session = self.factory()
+            self._sessions[slot] = session
+            self._count('sessions_started')
+            if not self._is_healthy(session):
+                raise SessionUnavailableError("new session failed its health check")
+
+        return session
+
+    def _is_healthy(self, session: Any) -> bool:
+        try:
+            return bool(self.health_check(session))
+        except Exception:
+            return False
+
+    def _close(self, session: Any):
+        try:
+            self.close_session(session)
+        except Exception as e:
+            logger.debug(f"Error closing session: {e}")
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
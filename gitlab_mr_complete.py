@@ -11,12 +11,23 @@ from datetime import datetime
 import time
 import os
 from typing import List, Dict
+from urllib.parse import urlparse
 import logging
 
+from readiness import (
+    wait_until, page_settled, element_present, url_changed, any_of, log_trace_summary, GEMINI_INPUT_SELECTORS
+)
+from sso_state_machine import SSOLoginMachine, SSOProvider, LoginResult, GOOGLE, EMAIL, PASSWORD
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Screens GitLab can show after the sign-in form: signed in, 2FA code, or an error message
+GITLAB_AFTER_SIGNIN_SELECTORS = (
+    "[data-testid='user-menu']", ".header-user-avatar", "#user_otp_attempt", ".flash-alert", ".gl-alert-danger"
+)
+
 class GitLabMRDocumentationGenerator:
     def __init__(self, gitlab_url: str, private_token: str, gmail_email: str, gmail_password: str,
                  gitlab_username: str = None, gitlab_password: str = None):
@@ -83,7 +94,7 @@ class GitLabMRDocumentationGenerator:
             self.driver.get("https://accounts.google.com/signin")
 
             # Wait for page to load
-            time.sleep(3)
+            wait_until(self.driver, page_settled(), timeout=10, label='google sign-in page')
 
             # Check if already logged in
             try:
@@ -101,476 +112,40 @@ class GitLabMRDocumentationGenerator:
             except:
                 pass
 
-            # Find email input field using multiple XPath strategies
-            email_input = None
-            email_xpaths = [
-                "//input[@type='email']",
-                "//input[@id='identifierId']",
-                "//input[@name='identifier']",
-                "//input[@aria-label='Email or phone']",
-                "//input[contains(@placeholder, 'Email')]"
-            ]
-
-            for xpath in email_xpaths:
-                try:
-                    email_input = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    break
-                except:
-                    continue
-
-            if not email_input:
-                logger.error("Could not find email input field")
+            # Email, password and whatever SSO provider Google hands the account to are driven by
+            # the state machine, which waits for each screen to change instead of re-reading the old one
+            result = self._run_login_machine(GOOGLE)
+            if not (result.success or result.needs_user):
+                logger.error(f"Gmail SSO login failed: {result.reason}")
                 return False
 
-            # Clear and enter email
-            email_input.clear()
-            email_input.send_keys(self.gmail_email)
-            time.sleep(1)
-
-            # Find and click Next button
-            next_button = None
-            next_xpaths = [
-                "//button[@id='identifierNext']",
-                "//button[contains(text(), 'Next')]",
-                "//button[@type='submit']",
-                "//div[@id='identifierNext']//button",
-                "//span[text()='Next']/../.."
-            ]
-
-            for xpath in next_xpaths:
-                try:
-                    next_button = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    break
-                except:
-                    continue
-
-            if not next_button:
-                logger.error("Could not find Next button")
-                return False
-
-            next_button.click()
-            time.sleep(3)
-
-            # Check if redirected to company SSO login page
-            current_url = self.driver.current_url
-            logger.info(f"Current URL after email submission: {current_url}")
-
-            # Handle SSO redirect (common SSO providers)
-            if self._is_sso_redirect():
-                logger.info("Detected SSO redirect. Handling company SSO login...")
-                if not self._handle_sso_login():
-                    logger.error("SSO login failed")
-                    return False
-            else:
-                # Regular Google password flow (fallback)
-                logger.info("No SSO redirect detected, trying regular password flow...")
-                if not self._handle_regular_password_flow():
-                    logger.error("Regular password authentication failed")
-                    return False
-
-            # Handle post-authentication steps
+            # Handle post-authentication steps (2FA and screens the machine does not model)
             return self._handle_post_authentication()
 
         except Exception as e:
             logger.error(f"Error during automatic Gmail SSO authentication: {e}")
             return False
 
-    def _is_sso_redirect(self) -> bool:
-        """
-        Check if we've been redirected to an SSO provider
-
-        Returns:
-            True if SSO redirect detected, False otherwise
-        """
-        current_url = self.driver.current_url.lower()
-
-        # Common SSO provider domains
-        sso_indicators = [
-            'login.microsoftonline.com',  # Microsoft Azure AD
-            'accounts.google.com/signin/oauth',  # Google Workspace SSO
-            'login.okta.com',  # Okta
-            'auth0.com',  # Auth0
-            'onelogin.com',  # OneLogin
-            'ping',  # PingIdentity
-            'saml',  # Generic SAML
-            'sso',  # Generic SSO
-            'adfs',  # Active Directory Federation Services
-            'federation'
-        ]
-
-        return any(indicator in current_url for indicator in sso_indicators)
-
-    def _handle_sso_login(self) -> bool:
-        """
-        Handle SSO login process
-
-        Returns:
-            True if SSO login successful, False otherwise
-        """
-        try:
-            current_url = self.driver.current_url.lower()
-
-            # Microsoft Azure AD SSO
-            if 'login.microsoftonline.com' in current_url:
-                return self._handle_microsoft_sso()
-
-            # Okta SSO
-            elif 'okta.com' in current_url:
-                return self._handle_okta_sso()
-
-            # Generic SSO handling
-            else:
-                return self._handle_generic_sso()
-
-        except Exception as e:
-            logger.error(f"Error handling SSO login: {e}")
-            return False
-
-    def _handle_microsoft_sso(self) -> bool:
-        """
-        Handle Microsoft Azure AD SSO login
-
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            logger.info("Handling Microsoft Azure AD SSO login...")
-
-            # Wait for Microsoft login page to load
-            time.sleep(3)
-
-            # Look for email field (sometimes pre-filled)
-            email_xpaths = [
-                "//input[@type='email']",
-                "//input[@name='loginfmt']",
-                "//input[@id='i0116']",
-                "//input[@placeholder='Email, phone, or Skype']"
-            ]
-
-            for xpath in email_xpaths:
-                try:
-                    email_input = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    # Clear and re-enter email if needed
-                    if not email_input.get_attribute('value'):
-                        email_input.clear()
-                        email_input.send_keys(self.gmail_email)
-                    break
-                except:
-                    continue
-
-            # Click Next if email step
-            next_xpaths = [
-                "//input[@id='idSIButton9']",
-                "//button[contains(text(), 'Next')]",
-                "//input[@type='submit']"
-            ]
-
-            for xpath in next_xpaths:
-                try:
-                    next_button = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    next_button.click()
-                    time.sleep(3)
-                    break
-                except:
-                    continue
-
-            # Handle password input
-            password_xpaths = [
-                "//input[@type='password']",
-                "//input[@name='passwd']",
-                "//input[@id='i0118']",
-                "//input[@placeholder='Password']"
-            ]
-
-            for xpath in password_xpaths:
-                try:
-                    password_input = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    password_input.clear()
-                    password_input.send_keys(self.gmail_password)
-                    time.sleep(1)
-                    break
-                except:
-                    continue
-
-            # Click Sign in
-            signin_xpaths = [
-                "//input[@id='idSIButton9']",
-                "//button[contains(text(), 'Sign in')]",
-                "//input[@type='submit']"
-            ]
-
-            for xpath in signin_xpaths:
-                try:
-                    signin_button = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    signin_button.click()
-                    time.sleep(5)
-                    break
-                except:
-                    continue
-
-            # Handle "Stay signed in?" prompt
-            try:
-                stay_signed_in_xpaths = [
-                    "//input[@id='idSIButton9']",  # Yes button
-                    "//button[contains(text(), 'Yes')]"
-                ]
-
-                for xpath in stay_signed_in_xpaths:
-                    try:
-                        yes_button = WebDriverWait(self.driver, 5).until(
-                            EC.element_to_be_clickable((By.XPATH, xpath))
-                        )
-                        yes_button.click()
-                        time.sleep(3)
-                        break
-                    except:
-                        continue
-            except:
-                pass
-
-            return True
-
-        except Exception as e:
-            logger.error(f"Error in Microsoft SSO handling: {e}")
-            return False
-
-    def _handle_okta_sso(self) -> bool:
+    def _run_login_machine(self, provider: SSOProvider = None) -> LoginResult:
         """
-        Handle Okta SSO login
-
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            logger.info("Handling Okta SSO login...")
+        Log in with the declarative SSO state machine
 
-            # Wait for Okta login page
-            time.sleep(3)
-
-            # Find username field
-            username_xpaths = [
-                "//input[@id='okta-signin-username']",
-                "//input[@name='username']",
-                "//input[@type='email']",
-                "//input[@placeholder='Username']"
-            ]
-
-            for xpath in username_xpaths:
-                try:
-                    username_input = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    username_input.clear()
-                    username_input.send_keys(self.gmail_email)
-                    break
-                except:
-                    continue
-
-            # Find password field
-            password_xpaths = [
-                "//input[@id='okta-signin-password']",
-                "//input[@name='password']",
-                "//input[@type='password']"
-            ]
-
-            for xpath in password_xpaths:
-                try:
-                    password_input = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    password_input.clear()
-                    password_input.send_keys(self.gmail_password)
-                    break
-                except:
-                    continue
-
-            # Click Sign In
-            signin_xpaths = [
-                "//input[@id='okta-signin-submit']",
-                "//button[@type='submit']",
-                "//button[contains(text(), 'Sign In')]"
-            ]
-
-            for xpath in signin_xpaths:
-                try:
-                    signin_button = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    signin_button.click()
-                    time.sleep(5)
-                    break
-                except:
-                    continue
-
-            return True
-
-        except Exception as e:
-            logger.error(f"Error in Okta SSO handling: {e}")
-            return False
-
-    def _handle_generic_sso(self) -> bool:
-        """
-        Handle generic SSO login (fallback method)
-
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            logger.info("Handling generic SSO login...")
-
-            # Wait for SSO page to load
-            time.sleep(3)
-
-            # Generic approach - look for common input fields
-            username_xpaths = [
-                "//input[@type='email']",
-                "//input[@type='text']",
-                "//input[@name='username']",
-                "//input[@name='email']",
-                "//input[contains(@placeholder, 'email')]",
-                "//input[contains(@placeholder, 'username')]"
-            ]
-
-            # Try to find and fill username/email field
-            for xpath in username_xpaths:
-                try:
-                    username_elements = self.driver.find_elements(By.XPATH, xpath)
-                    if username_elements:
-                        username_input = username_elements[0]
-                        if username_input.is_displayed() and username_input.is_enabled():
-                            username_input.clear()
-                            username_input.send_keys(self.gmail_email)
-                            time.sleep(1)
-                            break
-                except:
-                    continue
-
-            # Look for password field
-            password_xpaths = [
-                "//input[@type='password']",
-                "//input[@name='password']",
-                "//input[contains(@placeholder, 'password')]"
-            ]
-
-            for xpath in password_xpaths:
-                try:
-                    password_elements = self.driver.find_elements(By.XPATH, xpath)
-                    if password_elements:
-                        password_input = password_elements[0]
-                        if password_input.is_displayed() and password_input.is_enabled():
-                            password_input.clear()
-                            password_input.send_keys(self.gmail_password)
-                            time.sleep(1)
-                            break
-                except:
-                    continue
-
-            # Look for submit button
-            submit_xpaths = [
-                "//button[@type='submit']",
-                "//input[@type='submit']",
-                "//button[contains(text(), 'Sign in')]",
-                "//button[contains(text(), 'Login')]",
-                "//button[contains(text(), 'Submit')]"
-            ]
-
-            for xpath in submit_xpaths:
-                try:
-                    submit_elements = self.driver.find_elements(By.XPATH, xpath)
-                    if submit_elements:
-                        submit_button = submit_elements[0]
-                        if submit_button.is_displayed() and submit_button.is_enabled():
-                            submit_button.click()
-                            time.sleep(5)
-                            break
-                except:
-                    continue
-
-            logger.warning("Generic SSO handling completed. Manual verification may be required.")
-            return True
-
-        except Exception as e:
-            logger.error(f"Error in generic SSO handling: {e}")
-            return False
-
-    def _handle_regular_password_flow(self) -> bool:
-        """
-        Handle regular Google password authentication (fallback)
+        Args:
+            provider: Provider to start with (identified from the current URL if None)
 
         Returns:
-            True if successful, False otherwise
+            The machine's result; needs_user means it stopped on a screen it does not
+            model (a 2-step challenge, for instance) that post-authentication handles
         """
+        destinations = ('myaccount.google.com', 'accounts.google.com/manageaccount', 'mail.google.com',
+                        urlparse(self.gitlab_url).hostname or self.gitlab_url)
         try:
-            # Wait for password page and enter password
-            password_input = None
-            password_xpaths = [
-                "//input[@type='password']",
-                "//input[@name='password']",
-                "//input[@aria-label='Enter your password']",
-                "//input[contains(@placeholder, 'password')]"
-            ]
-
-            for xpath in password_xpaths:
-                try:
-                    password_input = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    break
-                except:
-                    continue
-
-            if not password_input:
-                logger.error("Could not find password input field")
-                return False
-
-            # Clear and enter password
-            password_input.clear()
-            password_input.send_keys(self.gmail_password)
-            time.sleep(1)
-
-            # Find and click Next button for password
-            password_next_button = None
-            password_next_xpaths = [
-                "//button[@id='passwordNext']",
-                "//button[contains(text(), 'Next')]",
-                "//button[@type='submit']",
-                "//div[@id='passwordNext']//button",
-                "//span[text()='Next']/../.."
-            ]
-
-            for xpath in password_next_xpaths:
-                try:
-                    password_next_button = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    break
-                except:
-                    continue
-
-            if not password_next_button:
-                logger.error("Could not find password Next button")
-                return False
-
-            password_next_button.click()
-            time.sleep(5)
-
-            return True
-
+            machine = SSOLoginMachine(self.driver, {EMAIL: self.gmail_email, PASSWORD: self.gmail_password},
+                                      destinations=destinations)
+            return machine.run(provider)
         except Exception as e:
-            logger.error(f"Error in regular password flow: {e}")
-            return False
+            logger.warning(f"SSO state machine failed: {e}")
+            return LoginResult(False, provider.name if provider else '', str(e))
 
     def _handle_post_authentication(self) -> bool:
         """
@@ -654,7 +229,7 @@ class GitLabMRDocumentationGenerator:
 
             # Navigate to GitLab login page
             self.driver.get(f"{self.gitlab_url}/users/sign_in")
-            time.sleep(3)
+            wait_until(self.driver, page_settled(), timeout=10, label='gitlab sign-in page')
 
             # Check if already logged in
             try:
@@ -750,8 +325,11 @@ class GitLabMRDocumentationGenerator:
                 logger.error("Could not find GitLab sign in button")
                 return False
 
+            # The sign-in page itself is already settled: wait for the navigation or the next screen
+            before = self.driver.current_url
             signin_button.click()
-            time.sleep(5)
+            wait_until(self.driver, any_of(url_changed(before), element_present(*GITLAB_AFTER_SIGNIN_SELECTORS)),
+                       timeout=10, label='gitlab sign-in submit')
 
             # Handle potential 2FA or additional verification
             try:
@@ -835,7 +413,7 @@ class GitLabMRDocumentationGenerator:
                 self.driver.switch_to.window(self.driver.window_handles[0])
 
             self.driver.get("https://gemini.google.com/")
-            time.sleep(5)
+            wait_until(self.driver, page_settled(), timeout=15, label='gemini page')
 
             # Check for terms acceptance or setup screens
             try:
@@ -852,8 +430,10 @@ class GitLabMRDocumentationGenerator:
                         try_button = WebDriverWait(self.driver, 5).until(
                             EC.element_to_be_clickable((By.XPATH, xpath))
                         )
+                        before = self.driver.current_url
                         try_button.click()
-                        time.sleep(3)
+                        wait_until(self.driver, any_of(url_changed(before), element_present(*GEMINI_INPUT_SELECTORS)),
+                                   timeout=10, label='gemini setup screen')
                         break
                     except:
                         continue
@@ -1026,7 +606,7 @@ class GitLabMRDocumentationGenerator:
             # Make sure we're on Gemini page
             if "gemini.google.com" not in self.driver.current_url:
                 self.driver.get("https://gemini.google.com/")
-                time.sleep(3)
+                wait_until(self.driver, element_present(*GEMINI_INPUT_SELECTORS), timeout=10, label='gemini input')
 
             # Find the input area using XPath
             input_element = None
@@ -1349,6 +929,7 @@ Please format your response in clear sections with markdown formatting."""
     def cleanup(self):
         """Clean up resources"""
         try:
+            log_trace_summary()
             if hasattr(self, 'driver') and self.driver:
                 self.driver.quit()
                 logger.info("WebDriver closed successfully")
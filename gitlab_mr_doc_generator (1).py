@@ -6,25 +6,22 @@ Supports integration with Gemini Pro via browser automation
 """
 
 import requests
-from bs4 import BeautifulSoup
 import json
 import time
 import re
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, TYPE_CHECKING
 import argparse
 import os
 from dataclasses import dataclass
 from pathlib import Path
 import logging
 from urllib.parse import urljoin, urlparse
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+
+# BeautifulSoup, pandas and selenium are imported where they are used: together they add
+# over a second to every start, including --help and --no-gemini runs that never need them
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -63,6 +60,7 @@ class GitLabScraper:
         try:
             response = self.session.get(mr_url)
             response.raise_for_status()
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(response.content, 'html.parser')
             
             # Extract basic information
@@ -104,7 +102,7 @@ class GitLabScraper:
             logger.error(f"Error extracting MR data from {mr_url}: {e}")
             return None
     
-    def _extract_title(self, soup: BeautifulSoup) -> str:
+    def _extract_title(self, soup: 'BeautifulSoup') -> str:
         """Extract MR title"""
         title_selectors = [
             'h1.title',
@@ -119,7 +117,7 @@ class GitLabScraper:
                 return element.get_text(strip=True)
         return "Unknown Title"
     
-    def _extract_description(self, soup: BeautifulSoup) -> str:
+    def _extract_description(self, soup: 'BeautifulSoup') -> str:
         """Extract MR description"""
         desc_selectors = [
             '.description .md',
@@ -134,7 +132,7 @@ class GitLabScraper:
                 return element.get_text(strip=True)
         return ""
     
-    def _extract_author(self, soup: BeautifulSoup) -> str:
+    def _extract_author(self, soup: 'BeautifulSoup') -> str:
         """Extract MR author"""
         author_selectors = [
             '.author-link',
@@ -148,7 +146,7 @@ class GitLabScraper:
                 return element.get_text(strip=True)
         return "Unknown Author"
     
-    def _extract_created_date(self, soup: BeautifulSoup) -> str:
+    def _extract_created_date(self, soup: 'BeautifulSoup') -> str:
         """Extract creation date"""
         date_selectors = [
             'time[datetime]',
@@ -162,7 +160,7 @@ class GitLabScraper:
                 return element.get('datetime', element.get_text(strip=True))
         return ""
     
-    def _extract_merged_date(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_merged_date(self, soup: 'BeautifulSoup') -> Optional[str]:
         """Extract merge date if merged"""
         merged_selectors = [
             '.merged-at time',
@@ -175,7 +173,7 @@ class GitLabScraper:
                 return element.get('datetime', element.get_text(strip=True))
         return None
     
-    def _extract_branches(self, soup: BeautifulSoup) -> Dict[str, str]:
+    def _extract_branches(self, soup: 'BeautifulSoup') -> Dict[str, str]:
         """Extract source and target branches"""
         branches = {'source': '', 'target': ''}
         
@@ -187,7 +185,7 @@ class GitLabScraper:
         
         return branches
     
-    def _extract_labels(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_labels(self, soup: 'BeautifulSoup') -> List[str]:
         """Extract MR labels"""
         labels = []
         label_elements = soup.select('.label, .badge')
@@ -199,7 +197,7 @@ class GitLabScraper:
         
         return labels
     
-    def _extract_changed_files(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_changed_files(self, soup: 'BeautifulSoup') -> List[str]:
         """Extract list of changed files"""
         files = []
         
@@ -258,6 +256,9 @@ class GeminiProIntegration:
     
     def setup_driver(self):
         """Setup Chrome WebDriver"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
         chrome_options = Options()
         if self.headless:
             chrome_options.add_argument('--headless')
@@ -277,6 +278,11 @@ class GeminiProIntegration:
         if not self.driver:
             return self._generate_basic_documentation(mr_data)
         
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException, NoSuchElementException
+        
         try:
             # Navigate to Gemini Pro
             self.driver.get("https://gemini.google.com/")
@@ -509,6 +515,7 @@ This merge request appears to be related to **{mr_data.project_type.replace('-',
             return
         
         # Create DataFrame for analysis
+        import pandas as pd
         df = pd.DataFrame(self.processed_mrs)
         
         # Generate summary
@@ -17,19 +17,34 @@ from dataclasses import dataclass, asdict
 from pathlib import Path
 import logging
 from urllib.parse import urljoin, urlparse
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import base64
+
+# pandas and selenium are imported where they are used: together they add over a second
+# to every start, including --help and --no-gemini runs that never need them
+
+from doc_renderer import DocumentRenderer, OUTPUT_FORMATS
+from gemini_completion import GeminiCompletionDetector
+from prompt_injection import PromptInjector
+from selector_resolver import SelectorResolver
+from dom_extraction import TurnExtractor
+from response_streaming import StreamingResponseWriter, DEFAULT_FLUSH_INTERVAL, PARTIAL, STREAMING
+from gemini_session_pool import GeminiSessionPool, SessionUnavailableError
+from browser_daemon import attach_driver, detach_driver
+from lazy_browser import LazyBrowser
+from mr_pipeline import Pipeline, Stage
+from checkpoint_journal import CheckpointJournal, FETCHED, DOCUMENTED, WRITTEN, FAILED
+
+from mr_prompt_packing import (
+    DEFAULT_MAX_PACK_SIZE, MIN_SECTION_LENGTH, build_packed_prompt, plan_packs, split_packed_response
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+DEFAULT_FETCH_WORKERS = 4      # Concurrent MR fetches; each one issues four API requests
+DEFAULT_ANALYSIS_WORKERS = 4   # Upper bound for local analysis workers (also capped by CPU count)
+JOURNAL_NAME = '.journal.jsonl'  # Checkpoint journal inside the output directory
+
 @dataclass
 class MRData:
     """Data structure for Merge Request information"""
@@ -159,7 +174,8 @@ class GitLabAPIClient:
                 'deletions': deletions,
                 'new_file': change.get('new_file', False),
                 'renamed_file': change.get('renamed_file', False),
-                'deleted_file': change.get('deleted_file', False)
+                'deleted_file': change.get('deleted_file', False),
+                'diff': diff
             })
         
         # Process commits
@@ -272,13 +288,24 @@ class GitLabAPIClient:
 class GeminiProIntegration:
     """Integration with Gemini Pro via browser automation"""
     
-    def __init__(self, headless: bool = True):
-        self.driver = None
+    def __init__(self, headless: bool = True, renderer: Optional[DocumentRenderer] = None):
         self.headless = headless
-        self.setup_driver()
+        self.renderer = renderer or DocumentRenderer()
+        # The browser starts with the first Gemini prompt, so runs that never reach one cost no Chrome
+        self.driver = LazyBrowser(self.setup_driver)
+        self.selectors = SelectorResolver(self.driver)
+        self.turns = TurnExtractor(self.driver)
     
     def setup_driver(self):
-        """Setup Chrome WebDriver"""
+        """Setup Chrome WebDriver, attaching to the warm browser daemon when it runs; None on failure"""
+        # Each integration gets its own daemon tab so parallel sessions do not collide
+        driver = attach_driver(new_tab=True)
+        if driver:
+            return driver
+        
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
         chrome_options = Options()
         if self.headless:
             chrome_options.add_argument('--headless')
@@ -288,112 +315,192 @@ class GeminiProIntegration:
         chrome_options.add_argument('--window-size=1920,1080')
         
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.implicitly_wait(10)
+            driver = webdriver.Chrome(options=chrome_options)
+            driver.implicitly_wait(10)
+            return driver
         except Exception as e:
             logger.error(f"Failed to setup Chrome driver: {e}")
             logger.info("Continuing without Gemini integration...")
-            self.driver = None
+            return None
     
-    def enhance_documentation(self, mr_data: MRData) -> str:
-        """Use Gemini Pro to enhance MR documentation"""
+    def is_healthy(self) -> bool:
+        """Check that the browser session still responds (a browser not started yet counts as healthy)"""
         if not self.driver:
+            return not self.driver.failed
+        try:
+            self.driver.execute_script("return document.readyState")
+            return True
+        except Exception:
+            return False
+    
+    def enhance_documentation(self, mr_data: MRData, stream: Optional[StreamingResponseWriter] = None) -> str:
+        """Use Gemini Pro to enhance MR documentation, optionally streaming the response to disk"""
+        if not self.driver.available('Gemini prompt'):
             return self._generate_enhanced_documentation(mr_data)
         
         try:
-            # Navigate to Gemini Pro
-            self.driver.get("https://gemini.google.com/")
-            
-            # Wait for page to load
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
             # Prepare prompt for Gemini
             prompt = self._create_gemini_prompt(mr_data)
             
-            # Find and fill the input field
-            input_selectors = [
-                'textarea[placeholder*="Enter a prompt"]',
-                'textarea[data-testid="input-textarea"]',
-                '.ql-editor',
-                'div[contenteditable="true"]',
-                'textarea'
-            ]
-            
-            input_element = None
-            for selector in input_selectors:
-                try:
-                    input_element = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    break
-                except TimeoutException:
-                    continue
-            
-            if not input_element:
-                logger.warning("Could not find Gemini input field, using enhanced documentation")
-                return self._generate_enhanced_documentation(mr_data)
-            
-            # Clear and enter prompt
-            input_element.clear()
-            input_element.send_keys(prompt)
+            response_text = self._ask_gemini(prompt, stream=stream)
+            if response_text:
+                if stream and stream.state == PARTIAL:
+                    # Appended, not prepended: the streamed file only grows
+                    response_text = (f"{response_text}\n\n> **Partial response** ({stream.reason}): "
+                                     f"Gemini did not finish within the time budget.")
+                return self.renderer.render_markdown(mr_data.title, response_text)
             
-            # Find and click submit button
-            submit_selectors = [
-                'button[type="submit"]',
-                'button[aria-label*="Send"]',
-                'button[data-testid="send-button"]',
-                '.send-button'
-            ]
-            
-            submitted = False
-            for selector in submit_selectors:
-                try:
-                    submit_button = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    submit_button.click()
-                    submitted = True
-                    break
-                except (TimeoutException, NoSuchElementException):
-                    continue
-            
-            if not submitted:
-                # Try pressing Enter
-                input_element.send_keys('\n')
-            
-            # Wait for response
-            time.sleep(8)
-            
-            # Extract response
-            response_selectors = [
-                '[data-testid="response"]',
-                '.response-content',
-                '.markdown-content',
-                '.message-content',
-                '.model-response'
-            ]
-            
-            for selector in response_selectors:
-                try:
-                    response_element = WebDriverWait(self.driver, 15).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    response_text = response_element.text
-                    if response_text and len(response_text) > 100:
-                        return response_text
-                except TimeoutException:
-                    continue
-            
-            logger.warning("Could not extract Gemini response, using enhanced documentation")
+            logger.warning("Could not get Gemini response, using enhanced documentation")
             return self._generate_enhanced_documentation(mr_data)
             
         except Exception as e:
             logger.error(f"Error with Gemini integration: {e}")
             return self._generate_enhanced_documentation(mr_data)
     
-    def _create_gemini_prompt(self, mr_data: MRData) -> str:
+    def enhance_documentation_batch(self, mr_list: List[MRData]) -> List[str]:
+        """Document several small MRs with a single packed Gemini prompt"""
+        if len(mr_list) < 2 or not self.driver.available('Gemini prompt'):
+            return [self.enhance_documentation(mr_data) for mr_data in mr_list]
+        
+        # Per-MR ids only need to be unique within the pack
+        mr_ids = [f"{i}-{mr_data.iid}" for i, mr_data in enumerate(mr_list, 1)]
+        sections = {}
+        
+        try:
+            packed_prompt = build_packed_prompt(
+                [(mr_id, self._create_gemini_prompt(mr_data)) for mr_id, mr_data in zip(mr_ids, mr_list)]
+            )
+            response_text = self._ask_gemini(packed_prompt, min_length=MIN_SECTION_LENGTH)
+            sections = split_packed_response(response_text or '', mr_ids)
+        except Exception as e:
+            logger.error(f"Error with packed Gemini prompt: {e}")
+        
+        logger.info(f"Packed prompt returned {len(sections)}/{len(mr_list)} valid sections")
+        
+        documents = []
+        for mr_id, mr_data in zip(mr_ids, mr_list):
+            if mr_id in sections:
+                documents.append(self.renderer.render_markdown(mr_data.title, sections[mr_id]))
+            else:
+                logger.warning(f"Section missing for MR !{mr_data.iid}, retrying it alone")
+                documents.append(self.enhance_documentation(mr_data))
+        
+        return documents
+    
+    def _ask_gemini(self, prompt: str, min_length: int = 100,
+                    stream: Optional[StreamingResponseWriter] = None) -> Optional[str]:
+        """Send a prompt to Gemini Pro and return the response text"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        # Navigate to Gemini Pro
+        self.driver.get("https://gemini.google.com/")
+        
+        # Wait for page to load
+        WebDriverWait(self.driver, 20).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
+        
+        # Find and fill the input field
+        input_selectors = [
+            'textarea[placeholder*="Enter a prompt"]',
+            'textarea[data-testid="input-textarea"]',
+            '.ql-editor',
+            'div[contenteditable="true"]',
+            'textarea'
+        ]
+        
+        input_element = self.selectors.find('gemini-input', input_selectors, timeout=10)
+        
+        if not input_element:
+            logger.warning("Could not find Gemini input field")
+            return None
+        
+        # Enter the whole prompt in one round trip
+        PromptInjector(self.driver).inject(input_element, prompt)
+        
+        completion = GeminiCompletionDetector(self.driver)
+        completion.mark()
+        turn_index = self.turns.mark()
+        
+        # Find and click submit button
+        submit_selectors = [
+            'button[type="submit"]',
+            'button[aria-label*="Send"]',
+            'button[data-testid="send-button"]',
+            '.send-button'
+        ]
+        
+        submit_button = self.selectors.find('gemini-send', submit_selectors, timeout=5, enabled=True)
+        if submit_button:
+            submit_button.click()
+        else:
+            # Try pressing Enter
+            input_element.send_keys('\n')
+        
+        if stream:
+            # The partial text is on disk even if generation never finishes
+            response_text = self._stream_response(completion, turn_index, stream, timeout=120)
+            return response_text if len(response_text) > min_length else None
+        
+        # Wait for the response to finish generating
+        completion.wait(timeout=120)
+        
+        # Extract response
+        response_selectors = [
+            '[data-testid="response"]',
+            '.response-content',
+            '.markdown-content',
+            '.message-content',
+            '.model-response'
+        ]
+        
+        # Candidates are tried in order until one holds a response of useful length
+        response_element = self.selectors.find('gemini-response', response_selectors, timeout=15, pick='last',
+                                               min_text_length=min_length)
+        if response_element:
+            response_text = response_element.text
+            if response_text and len(response_text) > min_length:
+                return response_text
+        
+        logger.warning("Could not extract Gemini response")
+        return None
+    
+    def _stream_response(self, completion: GeminiCompletionDetector, turn_index: int,
+                         stream: StreamingResponseWriter, timeout: float) -> str:
+        """Mirror the growing response into the output file until it completes or the budget runs out"""
+        deadline = time.time() + timeout
+        text = ''
+        
+        while True:
+            # Short detector slices keep the baseline, so completion is still event-driven
+            result = completion.wait(timeout=DEFAULT_FLUSH_INTERVAL, keep_mark=True)
+            turn = self.turns.latest(after_index=turn_index)
+            if turn:
+                text = turn.text
+                stream.update(text)
+            
+            if result.completed:
+                stream.finish(text, complete=True)
+                return text
+            if result.reason == 'no-response':
+                reason = 'no response'
+                break
+            if stream.expired:
+                reason = 'time budget exceeded'
+                break
+            if time.time() >= deadline:
+                reason = 'timeout'
+                break
+            if result.reason == 'error':
+                time.sleep(DEFAULT_FLUSH_INTERVAL)
+        
+        stream.finish(text, complete=False, reason=reason)
+        return text
+    
+    @staticmethod
+    def _create_gemini_prompt(mr_data: MRData) -> str:
         """Create a structured prompt for Gemini Pro"""
         files_summary = ', '.join(mr_data.files_changed[:15])
         if len(mr_data.files_changed) > 15:
@@ -426,143 +533,45 @@ Format as clear markdown with proper headers and bullet points.
     
     def _generate_enhanced_documentation(self, mr_data: MRData) -> str:
         """Generate enhanced documentation without Gemini"""
-        status_emoji = {
-            'merged': '✅',
-            'opened': '🔄',
-            'closed': '❌'
-        }.get(mr_data.state, '📝')
-        
-        pipeline_status = f"**Pipeline:** {mr_data.pipeline_status}" if mr_data.pipeline_status else ""
-        milestone_info = f"**Milestone:** {mr_data.milestone}" if mr_data.milestone else ""
-        
-        return f"""# {status_emoji} {mr_data.title}
-
-## Overview
-**MR !{mr_data.iid}** | **Project:** {mr_data.project_name} | **Type:** {mr_data.project_type.replace('-', ' ').title()}  
-**Author:** {mr_data.author} (@{mr_data.author_username})  
-**Created:** {mr_data.created_at[:10]} | **Updated:** {mr_data.updated_at[:10]}  
-**Status:** {mr_data.state.title()} | **Merge Status:** {mr_data.merge_status}  
-{pipeline_status}  
-{milestone_info}
-
-## Description
-{mr_data.description or 'No description provided'}
-
-## Technical Summary
-- **Files Modified:** {len(mr_data.files_changed)} files
-- **Lines Added:** {mr_data.additions}
-- **Lines Removed:** {mr_data.deletions}
-- **Commits:** {len(mr_data.commits)}
-
-## Changes Overview
-
-### Modified Files
-{chr(10).join(f'- `{file}`' for file in mr_data.files_changed[:25])}
-{f'... and {len(mr_data.files_changed) - 25} more files' if len(mr_data.files_changed) > 25 else ''}
-
-### File Type Analysis
-{self._generate_file_analysis(mr_data.changes)}
-
-## Commit History
-{self._generate_commit_summary(mr_data.commits[:10])}
-
-## Branch Information
-- **Source Branch:** `{mr_data.source_branch}`
-- **Target Branch:** `{mr_data.target_branch}`
-
-## Metadata
-- **Labels:** {', '.join(mr_data.labels) if mr_data.labels else 'None'}
-- **Assignees:** {', '.join(mr_data.assignees) if mr_data.assignees else 'None'}
-- **Reviewers:** {', '.join(mr_data.reviewers) if mr_data.reviewers else 'None'}
-- **GitLab URL:** [View MR]({mr_data.web_url})
-
-## Impact Assessment
-{self._generate_impact_assessment(mr_data)}
-
----
-*Generated automatically from GitLab API on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
-        """
-    
-    def _generate_file_analysis(self, changes: List[Dict]) -> str:
-        """Generate analysis of file changes"""
-        if not changes:
-            return "No detailed change information available"
-        
-        new_files = [c for c in changes if c.get('new_file')]
-        deleted_files = [c for c in changes if c.get('deleted_file')]
-        renamed_files = [c for c in changes if c.get('renamed_file')]
-        modified_files = [c for c in changes if not any([c.get('new_file'), c.get('deleted_file'), c.get('renamed_file')])]
-        
-        analysis = []
-        if new_files:
-            analysis.append(f"- **New Files:** {len(new_files)} files created")
-        if deleted_files:
-            analysis.append(f"- **Deleted Files:** {len(deleted_files)} files removed")
-        if renamed_files:
-            analysis.append(f"- **Renamed Files:** {len(renamed_files)} files renamed")
-        if modified_files:
-            analysis.append(f"- **Modified Files:** {len(modified_files)} files changed")
-        
-        return '\n'.join(analysis) if analysis else "No change type information available"
-    
-    def _generate_commit_summary(self, commits: List[Dict]) -> str:
-        """Generate commit summary"""
-        if not commits:
-            return "No commit information available"
-        
-        summary = []
-        for commit in commits[:5]:  # Show first 5 commits
-            title = commit.get('title', 'No title')[:60]
-            short_id = commit.get('short_id', '')
-            author = commit.get('author_name', 'Unknown')
-            summary.append(f"- `{short_id}` {title} - *{author}*")
-        
-        if len(commits) > 5:
-            summary.append(f"... and {len(commits) - 5} more commits")
-        
-        return '\n'.join(summary)
-    
-    def _generate_impact_assessment(self, mr_data: MRData) -> str:
-        """Generate impact assessment based on changes"""
-        impact = []
-        
-        # Size-based assessment
-        total_changes = mr_data.additions + mr_data.deletions
-        if total_changes > 1000:
-            impact.append("🔴 **High Impact**: Large changeset with 1000+ line changes")
-        elif total_changes > 500:
-            impact.append("🟡 **Medium Impact**: Moderate changeset with 500+ line changes")
-        else:
-            impact.append("🟢 **Low Impact**: Small changeset with minimal changes")
-        
-        # File-based assessment
-        if len(mr_data.files_changed) > 20:
-            impact.append("📁 **Multiple Components**: Changes span across many files")
-        
-        # Project type specific assessment
-        if mr_data.project_type == 'react':
-            impact.append("⚛️ **Frontend Impact**: React application changes")
-        elif mr_data.project_type == 'spring-boot':
-            impact.append("🍃 **Backend Impact**: Spring Boot application changes")
-        elif mr_data.project_type == 'mixed':
-            impact.append("🔄 **Full Stack Impact**: Both frontend and backend changes")
-        
-        return '\n'.join(impact) if impact else "Impact assessment not available"
+        return self.renderer.render(mr_data)
     
     def close(self):
         """Close the browser driver"""
+        self.selectors.save()
+        self.driver.log_summary()
         if self.driver:
             try:
-                self.driver.quit()
+                if getattr(self.driver, 'attached_to_daemon', False):
+                    detach_driver(self.driver.instance)
+                else:
+                    self.driver.quit()
             except Exception as e:
                 logger.error(f"Error closing driver: {e}")
 
 class DocumentationGenerator:
     """Main class for generating technical documentation"""
     
-    def __init__(self, gitlab_url: str, private_token: str, use_gemini: bool = True, headless: bool = True):
+    def __init__(self, gitlab_url: str, private_token: str, use_gemini: bool = True, headless: bool = True,
+                 pack_size: int = 1, output_format: str = 'markdown', sessions: int = 1,
+                 stream: bool = False, stream_budget: Optional[float] = None,
+                 fetch_workers: int = DEFAULT_FETCH_WORKERS, analysis_workers: Optional[int] = None,
+                 resume: bool = False):
+        if stream and (sessions > 1 or pack_size > 1 or output_format != 'markdown'):
+            raise ValueError("Streaming needs a single Gemini session, no packing and markdown output")
         self.gitlab_client = GitLabAPIClient(gitlab_url, private_token)
-        self.gemini = GeminiProIntegration(headless=headless) if use_gemini else None
+        self.renderer = DocumentRenderer(output_format)
+        self.use_gemini = use_gemini
+        self.headless = headless
+        self.sessions = sessions
+        # Parallel runs start their browsers in the session pool instead
+        self.gemini = GeminiProIntegration(headless=headless, renderer=self.renderer) if use_gemini and sessions <= 1 else None
+        self.pack_size = pack_size
+        self.stream = stream
+        self.stream_budget = stream_budget
+        self.fetch_workers = max(1, fetch_workers)
+        self.analysis_workers = analysis_workers or min(DEFAULT_ANALYSIS_WORKERS, os.cpu_count() or 1)
+        self.resume = resume
+        self.journal: Optional[CheckpointJournal] = None
         self.processed_mrs = []
         self.failed_mrs = []
     
@@ -572,62 +581,19 @@ class DocumentationGenerator:
         
         logger.info(f"Processing {len(mr_urls)} merge requests...")
         
-        for i, url in enumerate(mr_urls, 1):
-            logger.info(f"Processing MR {i}/{len(mr_urls)}: {url}")
-            
-            try:
-                # Parse MR URL
-                parsed = self.gitlab_client.parse_mr_url(url)
-                if not parsed:
-                    self.failed_mrs.append({'url': url, 'reason': 'Invalid URL format'})
-                    continue
-                
-                project_id, mr_iid = parsed
-                
-                # Extract MR data via API
-                mr_data = self.gitlab_client.get_mr_data(project_id, mr_iid)
-                if not mr_data:
-                    self.failed_mrs.append({'url': url, 'reason': 'Failed to fetch MR data'})
-                    continue
-                
-                # Generate documentation
-                if self.gemini:
-                    documentation = self.gemini.enhance_documentation(mr_data)
-                else:
-                    documentation = self._generate_basic_doc(mr_data)
-                
-                # Save documentation
-                filename = f"MR_{mr_data.iid}_{mr_data.project_type}_{mr_data.project_name.replace('/', '_')}.md"
-                # Sanitize filename
-                filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-                filepath = Path(output_dir) / filename
-                
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(documentation)
-                
-                self.processed_mrs.append({
-                    'id': mr_data.id,
-                    'iid': mr_data.iid,
-                    'title': mr_data.title,
-                    'type': mr_data.project_type,
-                    'project': mr_data.project_name,
-                    'file': filename,
-                    'url': url,
-                    'state': mr_data.state,
-                    'additions': mr_data.additions,
-                    'deletions': mr_data.deletions,
-                    'files_changed': len(mr_data.files_changed)
-                })
-                
-                logger.info(f"Documentation saved: {filepath}")
-                
-                # Small delay to be respectful to GitLab API
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error processing {url}: {e}")
-                self.failed_mrs.append({'url': url, 'reason': str(e)})
-                continue
+        self.journal = CheckpointJournal(Path(output_dir) / JOURNAL_NAME, resume=self.resume)
+        try:
+            pending = self._restore_from_journal(mr_urls) if self.resume else mr_urls
+            if self.use_gemini and self.pack_size > 1:
+                self._process_packed(pending, output_dir)
+            else:
+                self._process_pipelined(pending, output_dir)
+        finally:
+            self.journal.close()
+        
+        # Stages finish out of order; the summary lists MRs in input order
+        order = {url: i for i, url in enumerate(mr_urls)}
+        self.processed_mrs.sort(key=lambda mr: order.get(mr['url'], len(order)))
         
         # Generate summary report
         self._generate_summary_report(output_dir)
@@ -637,12 +603,236 @@ class DocumentationGenerator:
         logger.info(f"Processing complete! {success_count} successful, {failed_count} failed")
         logger.info(f"Documentation saved in '{output_dir}' directory")
     
+    def _start_pooled_session(self) -> 'GeminiProIntegration':
+        """
+        Gemini session for the session pool, with its browser already running
+
+        Pooled sessions start eagerly: a lazy browser that cannot launch would
+        pass the pool's health check and fail on every item instead of
+        counting as a start failure of its slot.
+        """
+        gemini = GeminiProIntegration(headless=self.headless, renderer=self.renderer)
+        gemini.driver.start('Gemini session pool')
+        return gemini
+    
+    def _process_pipelined(self, mr_urls: List[str], output_dir: str) -> None:
+        """Fetch, analyse, document and write MRs in overlapping stages connected by bounded queues"""
+        pool = None
+        if self.use_gemini and self.sessions > 1:
+            pool = GeminiSessionPool(
+                factory=self._start_pooled_session,
+                size=self.sessions,
+                health_check=lambda gemini: gemini.is_healthy(),
+                close=lambda gemini: gemini.close()
+            )
+        gemini_workers = pool.size if pool else 1
+        
+        def fetch(worker: int, url: str) -> Optional[Dict]:
+            mr_data = self._fetch_mr(url)
+            return {'url': url, 'mr_data': mr_data} if mr_data else None
+        
+        def analyse(worker: int, entry: Dict) -> Dict:
+            # Local analysis doubles as the fallback when Gemini does not answer
+            entry['documentation'] = self._generate_basic_doc(entry['mr_data'])
+            return entry
+        
+        def document(worker: int, entry: Dict) -> Dict:
+            if pool:
+                # Retried on a fresh session when the browser died, even if the fallback text came back
+                try:
+                    entry['documentation'] = pool.call(
+                        worker, lambda gemini, mr_data: gemini.enhance_documentation(mr_data), entry['mr_data'])
+                except SessionUnavailableError as e:
+                    logger.warning(f"No Gemini session available ({e}), using enhanced documentation")
+                    return entry
+            else:
+                if self.stream:
+                    entry['stream'] = StreamingResponseWriter(self._documentation_path(entry['mr_data'], output_dir),
+                                                              budget=self.stream_budget)
+                entry['documentation'] = self.gemini.enhance_documentation(entry['mr_data'], stream=entry.get('stream'))
+            self.journal.record(entry['url'], DOCUMENTED)
+            return entry
+        
+        def write(worker: int, entry: Dict) -> Dict:
+            stream = entry.get('stream')
+            if stream:
+                # The file already holds the streamed response; only what is missing is appended
+                if stream.state == STREAMING:
+                    # Gemini never answered; the file gets the fallback documentation
+                    stream.finish(entry['documentation'], complete=True, reason='fallback documentation')
+                else:
+                    stream.update(entry['documentation'], force=True)
+            self._save_documentation(entry['url'], entry['mr_data'], entry['documentation'], output_dir,
+                                     write_file=not stream)
+            return entry
+        
+        def record_failure(stage: str, item, error: Exception):
+            url = item if isinstance(item, str) else item['url']
+            self._record_failure(url, f"{stage}: {error}")
+        
+        stages = [
+            Stage('fetch', fetch, workers=self.fetch_workers),
+            Stage('analyse', analyse, workers=self.analysis_workers)
+        ]
+        if self.use_gemini:
+            stages.append(Stage('gemini', document, workers=gemini_workers))
+        stages.append(Stage('write', write, workers=1))
+        
+        try:
+            stats = Pipeline(stages, on_error=record_failure).run(mr_urls)
+            stats.log()
+            if pool:
+                logger.info(f"Session pool: {pool.stats}")
+        finally:
+            if pool:
+                pool.close()
+    
+    def _restore_from_journal(self, mr_urls: List[str]) -> List[str]:
+        """Take over the MRs an interrupted run already wrote and return the ones still to do"""
+        pending = []
+        for url in mr_urls:
+            checkpoint = self.journal.get(url)
+            if checkpoint and checkpoint.done and checkpoint.artefact(WRITTEN):
+                self.processed_mrs.append(checkpoint.stages[WRITTEN]['summary'])
+            else:
+                pending.append(url)
+        
+        logger.info(f"📒 {len(mr_urls) - len(pending)} MRs already documented, {len(pending)} to go")
+        return pending
+    
+    def _record_failure(self, url: str, reason: str) -> None:
+        """Remember a failed MR for the summary and the journal"""
+        self.failed_mrs.append({'url': url, 'reason': reason})
+        if self.journal:
+            self.journal.record(url, FAILED, reason=reason)
+    
+    def _process_packed(self, mr_urls: List[str], output_dir: str) -> None:
+        """Fetch all MRs first, then document them in (packed) Gemini prompts, optionally in parallel"""
+        fetched = []
+        for i, url in enumerate(mr_urls, 1):
+            logger.info(f"Fetching MR {i}/{len(mr_urls)}: {url}")
+            try:
+                mr_data = self._fetch_mr(url)
+                if mr_data:
+                    fetched.append({
+                        'id': url,
+                        'url': url,
+                        'mr_data': mr_data,
+                        'prompt': GeminiProIntegration._create_gemini_prompt(mr_data),
+                        'files': len(mr_data.files_changed),
+                        'lines': mr_data.additions + mr_data.deletions
+                    })
+            except Exception as e:
+                logger.error(f"Error fetching {url}: {e}")
+                self._record_failure(url, str(e))
+        
+        packs = plan_packs(fetched, max_pack_size=self.pack_size)
+        logger.info(f"Documenting {len(fetched)} MRs in {len(packs)} Gemini prompts")
+        
+        def document_pack(gemini: GeminiProIntegration, pack: List[Dict]) -> List[str]:
+            return gemini.enhance_documentation_batch([entry['mr_data'] for entry in pack])
+        
+        if self.sessions > 1:
+            with GeminiSessionPool(
+                factory=self._start_pooled_session,
+                size=self.sessions,
+                health_check=lambda gemini: gemini.is_healthy(),
+                close=lambda gemini: gemini.close()
+            ) as pool:
+                results = pool.map(document_pack, packs)
+                logger.info(f"Session pool: {pool.stats}")
+        else:
+            results = []
+            for pack in packs:
+                try:
+                    results.append(document_pack(self.gemini, pack))
+                except Exception as e:
+                    results.append(e)
+        
+        # Results are in pack order regardless of which session finished first
+        for pack, documents in zip(packs, results):
+            if isinstance(documents, SessionUnavailableError):
+                logger.warning("No Gemini session available, using enhanced documentation")
+                documents = [self._generate_basic_doc(entry['mr_data']) for entry in pack]
+            elif isinstance(documents, Exception):
+                logger.error(f"Error documenting pack: {documents}")
+                for entry in pack:
+                    self._record_failure(entry['url'], str(documents))
+                continue
+            
+            for entry, documentation in zip(pack, documents):
+                try:
+                    self._save_documentation(entry['url'], entry['mr_data'], documentation, output_dir)
+                except Exception as e:
+                    logger.error(f"Error saving {entry['url']}: {e}")
+                    self._record_failure(entry['url'], str(e))
+    
+    def _fetch_mr(self, url: str) -> Optional[MRData]:
+        """Parse an MR URL and fetch its data (reusing what a resumed run already fetched), recording failures"""
+        if self.journal:
+            saved = self.journal.load_artefact(url, FETCHED)
+            if saved:
+                logger.info(f"📒 Reusing fetched data for {url}")
+                return MRData(**saved)
+        
+        parsed = self.gitlab_client.parse_mr_url(url)
+        if not parsed:
+            self._record_failure(url, 'Invalid URL format')
+            return None
+        
+        project_id, mr_iid = parsed
+        
+        # Extract MR data via API
+        mr_data = self.gitlab_client.get_mr_data(project_id, mr_iid)
+        if not mr_data:
+            self._record_failure(url, 'Failed to fetch MR data')
+            return None
+        
+        if self.journal:
+            path = self.journal.save_artefact(url, FETCHED, asdict(mr_data))
+            self.journal.record(url, FETCHED, path=str(path))
+        return mr_data
+    
+    def _documentation_path(self, mr_data: MRData, output_dir: str) -> Path:
+        """Output file of an MR's documentation"""
+        filename = f"MR_{mr_data.iid}_{mr_data.project_type}_{mr_data.project_name.replace('/', '_')}{self.renderer.extension}"
+        # Sanitize filename
+        filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+        return Path(output_dir) / filename
+    
+    def _save_documentation(self, url: str, mr_data: MRData, documentation: str, output_dir: str,
+                            write_file: bool = True) -> Path:
+        """Write an MR's documentation to disk (unless it was streamed there) and record it for the summary"""
+        filepath = self._documentation_path(mr_data, output_dir)
+        filename = filepath.name
+        
+        if write_file:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(documentation)
+        
+        summary = {
+            'id': mr_data.id,
+            'iid': mr_data.iid,
+            'title': mr_data.title,
+            'type': mr_data.project_type,
+            'project': mr_data.project_name,
+            'file': filename,
+            'url': url,
+            'state': mr_data.state,
+            'additions': mr_data.additions,
+            'deletions': mr_data.deletions,
+            'files_changed': len(mr_data.files_changed)
+        }
+        self.processed_mrs.append(summary)
+        if self.journal:
+            self.journal.record(url, WRITTEN, path=str(filepath), summary=summary)
+        
+        logger.info(f"Documentation saved: {filepath}")
+        return filepath
+    
     def _generate_basic_doc(self, mr_data: MRData) -> str:
-        """Generate basic documentation without Gemini"""
-        gemini_integration = GeminiProIntegration(headless=True)
-        doc = gemini_integration._generate_enhanced_documentation(mr_data)
-        gemini_integration.close()
-        return doc
+        """Generate basic documentation without Gemini (no browser needed)"""
+        return self.renderer.render(mr_data)
     
     def _generate_summary_report(self, output_dir: str) -> None:
         """Generate a comprehensive summary report"""
@@ -651,6 +841,7 @@ class DocumentationGenerator:
         
         # Create DataFrame for analysis
         if self.processed_mrs:
+            import pandas as pd
             df = pd.DataFrame(self.processed_mrs)
         
         # Generate summary
@@ -710,7 +901,7 @@ class DocumentationGenerator:
 ## Usage Instructions
 
 1. **Individual Documentation**: Each MR has its own detailed documentation file
-2. **File Naming**: `MR_{{iid}}_{{type}}_{{project}}.md`
+2. **File Naming**: `MR_{{iid}}_{{type}}_{{project}}{self.renderer.extension}`
 3. **Content**: Each file contains technical analysis, impact assessment, and change details
 4. **API Source**: All data extracted using GitLab API for accuracy
 
@@ -729,4 +920,102 @@ Generated using GitLab API with private token authentication.
                 'processed_mrs': self.processed_mrs,
                 'failed_mrs': self.failed_mrs,
                 'generated_at': datetime.now().isoformat()
-            
\ No newline at end of file
+                        }, f, indent=2)
+        
+        logger.info(f"Summary report saved: {summary_path}")
+    
+    def cleanup(self):
+        """Cleanup resources"""
+        if self.gemini:
+            self.gemini.close()
+
+def load_mr_urls_from_file(file_path: str) -> List[str]:
+    """Load MR URLs from a text file"""
+    urls = []
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    urls.append(line)
+    except FileNotFoundError:
+        logger.error(f"File not found: {file_path}")
+    except Exception as e:
+        logger.error(f"Error reading file {file_path}: {e}")
+    
+    return urls
+
+def main():
+    """Main function with CLI interface"""
+    parser = argparse.ArgumentParser(description='Generate technical documentation from GitLab MRs using the API')
+    parser.add_argument('--gitlab-url', required=True, help='GitLab instance base URL')
+    parser.add_argument('--token', default=os.environ.get('GITLAB_TOKEN'), help='GitLab private token (default: $GITLAB_TOKEN)')
+    parser.add_argument('--mr-file', help='File containing MR URLs (one per line)')
+    parser.add_argument('--mr-urls', nargs='+', help='Space-separated list of MR URLs')
+    parser.add_argument('--output-dir', default='documentation', help='Output directory for documentation')
+    parser.add_argument('--no-gemini', action='store_true', help='Skip Gemini Pro integration')
+    parser.add_argument('--quick', action='store_true',
+                        help='Offline mode: local extractive analysis only, no browser or Gemini')
+    parser.add_argument('--show-browser', action='store_true', help='Show browser during Gemini automation')
+    parser.add_argument('--sessions', type=int, default=1,
+                        help='Number of parallel Gemini browser sessions (capped by available memory)')
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default='markdown',
+                        help='Format of the per-MR documentation files')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write Gemini responses to the output files while they generate '
+                             '(single session, markdown output, no packing)')
+    parser.add_argument('--stream-budget', type=float,
+                        help='Seconds after which a streamed response is cut off and kept as partial')
+    parser.add_argument('--fetch-workers', type=int, default=DEFAULT_FETCH_WORKERS,
+                        help='Merge requests fetched from the GitLab API in parallel')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run in --output-dir: skip MRs already written, reuse fetched data')
+    parser.add_argument('--pack-size', type=int, default=1,
+                        help=f'Pack up to N small MRs into one Gemini prompt (e.g. {DEFAULT_MAX_PACK_SIZE}; 1 disables packing)')
+    
+    args = parser.parse_args()
+    
+    if args.stream and (args.sessions > 1 or args.pack_size > 1 or args.output_format != 'markdown'):
+        parser.error("--stream needs --sessions 1, --pack-size 1 and --output-format markdown")
+    
+    if not args.token:
+        logger.error("No GitLab token provided. Use --token or set GITLAB_TOKEN")
+        return
+    
+    # Get MR URLs
+    mr_urls = []
+    if args.mr_file:
+        mr_urls.extend(load_mr_urls_from_file(args.mr_file))
+    if args.mr_urls:
+        mr_urls.extend(args.mr_urls)
+    
+    if not mr_urls:
+        logger.error("No MR URLs provided. Use --mr-file or --mr-urls")
+        return
+    
+    generator = DocumentationGenerator(
+        gitlab_url=args.gitlab_url,
+        private_token=args.token,
+        use_gemini=not (args.no_gemini or args.quick),
+        headless=not args.show_browser,
+        pack_size=max(1, args.pack_size),
+        output_format=args.output_format,
+        sessions=max(1, args.sessions),
+        stream=args.stream,
+        stream_budget=args.stream_budget,
+        fetch_workers=args.fetch_workers,
+        resume=args.resume
+    )
+    
+    try:
+        # Process MRs
+        generator.process_mr_list(mr_urls, args.output_dir)
+    except KeyboardInterrupt:
+        logger.info("Process interrupted by user")
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+    finally:
+        generator.cleanup()
+
+if __name__ == "__main__":
+    main()
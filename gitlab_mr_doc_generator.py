@@ -13,6 +13,9 @@ import os
 from typing import List, Dict
 import logging
 
+from cdp_resource_policy import ResourcePolicyManager, LEAN_POLICY, FULL_POLICY
+from cookie_bridge import CookieBridge
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -199,8 +202,15 @@ class GitLabMRDocumentationGenerator:
             if self.browser_session_available or not result['api_accessible']:
                 logger.info(f"Checking browser access for MR {project_id}/{mr_iid}")
                 mr_url = f"{self.gitlab_url}/{project_id}/-/merge_requests/{mr_iid}"
-                self.driver.get(mr_url)
-                time.sleep(3)
+                self.resources.navigate(mr_url, LEAN_POLICY)
+
+                # Wait until GitLab has rendered the MR or an error page instead of sleeping
+                try:
+                    WebDriverWait(self.driver, 3).until(lambda driver: driver.find_elements(
+                        By.CSS_SELECTOR, ".merge-request, .mr-widget, .issuable-meta, .access-denied, .not-found, .error-message"
+                    ))
+                except Exception:
+                    pass
 
                 # Check for access denied or not found indicators
                 access_denied_indicators = self.driver.find_elements(By.CSS_SELECTOR,
@@ -269,12 +279,15 @@ class GitLabMRDocumentationGenerator:
         self.driver = webdriver.Chrome(options=chrome_options)
         self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         self.driver.maximize_window()
+        self.resources = ResourcePolicyManager(self.driver)
+        self.cookie_bridge = CookieBridge(self.driver, self.gitlab_url)
 
     def setup_gemini_web_interface(self):
         """Setup Gemini web interface"""
         try:
             logger.info("Opening Gemini web interface...")
-            self.driver.get("https://gemini.google.com/")
+            # The same tab probes GitLab with the lean policy; Gemini needs every resource
+            self.resources.navigate("https://gemini.google.com/", FULL_POLICY)
 
             # Wait for page to load
             time.sleep(5)
@@ -377,8 +390,18 @@ class GitLabMRDocumentationGenerator:
             File content as string
         """
         try:
+            # Plain HTTP with the browser's cookies; the page is only rendered if that fails
+            try:
+                content = self.cookie_bridge.raw_file(project_id, file_path, ref)
+            except FileNotFoundError as e:
+                # GitLab answered for a signed-in session; the browser would only render the 404 page
+                logger.warning(f"{e}")
+                return ""
+            if content is not None:
+                return content
+
             url = f"{self.gitlab_url}/{project_id}/-/raw/{ref}/{file_path}"
-            self.driver.get(url)
+            self.resources.navigate(url, LEAN_POLICY)
 
             # Wait for content to load
             WebDriverWait(self.driver, 10).until(
@@ -408,7 +431,7 @@ class GitLabMRDocumentationGenerator:
 
             # Navigate to Gemini if not already there
             if "gemini.google.com" not in self.driver.current_url:
-                self.driver.get("https://gemini.google.com/")
+                self.resources.navigate("https://gemini.google.com/", FULL_POLICY)
                 time.sleep(3)
 
             # Find the input area (try multiple selectors as Gemini's UI might change)
@@ -746,6 +769,8 @@ Format the response in clear markdown with appropriate headings."""
 
     def cleanup(self):
         """Cleanup resources"""
+        if hasattr(self, 'cookie_bridge'):
+            self.cookie_bridge.close()
         if hasattr(self, 'driver'):
             self.driver.quit()
 
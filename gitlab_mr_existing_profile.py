@@ -11,17 +11,51 @@ from datetime import datetime
 import time
 import os
 import platform
-from typing import List, Dict
+from typing import List, Dict, Optional
 import logging
 
+from diff_noise_filter import DiffNoiseFilter, NoiseFilterConfig
+from gemini_response_protocol import (
+    SectionedResponseProtocol, IncrementalResponseParser, locate_response_start
+)
+from gemini_completion import GeminiCompletionDetector
+from prompt_injection import PromptInjector
+from browser_daemon import attach_driver, detach_driver, switch_to_tab, open_tab
+from selector_resolver import SelectorResolver
+from dom_extraction import TurnExtractor
+from profile_snapshot import ensure_snapshot, clone_snapshot, remove_clone, cookie_hosts, sweep_stale_clones
+from auth_probe import (
+    run_probes, export_browser_cookies, google_account_probe, gitlab_probe, gemini_probe, ProbeResult
+)
+from gemini_conversation import ConversationManager
+from readiness import (
+    wait_until, page_settled, element_present, url_changed, any_of, log_trace_summary, GEMINI_INPUT_SELECTORS
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sections requested from Gemini for every MR
+DOCUMENTATION_SECTIONS = [
+    "Summary",
+    "Technical Details",
+    "Impact Analysis",
+    "Risk Assessment",
+    "Testing Recommendations"
+]
+
+# Total seconds allowed for the concurrent HTTP authentication probe
+AUTH_PROBE_DEADLINE = 8.0
+
+# Diff pre-processing
+NOISE_FILTER_ENABLED = True  # Drop/summarise lockfile, generated, whitespace, import and license-header noise
+
 class GitLabMRDocumentationGenerator:
     def __init__(self, gitlab_url: str, private_token: str, use_existing_profile: bool = True, 
                  profile_path: str = None, gmail_email: str = None, gmail_password: str = None,
-                 gitlab_username: str = None, gitlab_password: str = None):
+                 gitlab_username: str = None, gitlab_password: str = None, profile_snapshot: bool = False,
+                 noise_filter: bool = NOISE_FILTER_ENABLED, noise_filter_config: NoiseFilterConfig = None):
         """
         Initialize the documentation generator
         
@@ -34,6 +68,9 @@ class GitLabMRDocumentationGenerator:
             gmail_password: Gmail password for authentication (only needed if not using existing profile)
             gitlab_username: GitLab username (optional)
             gitlab_password: GitLab password (optional)
+            profile_snapshot: Start from a minimal tmpfs clone of the existing profile instead of the profile itself
+            noise_filter: Strip diff noise before the prompt is built
+            noise_filter_config: What the noise filter drops or summarises (defaults to everything)
         """
         self.gitlab_url = gitlab_url.rstrip('/')
         self.private_token = private_token
@@ -43,15 +80,25 @@ class GitLabMRDocumentationGenerator:
         self.gmail_password = gmail_password
         self.gitlab_username = gitlab_username
         self.gitlab_password = gitlab_password
+        self.profile_snapshot = profile_snapshot
+        self.profile_clone = None  # tmpfs user-data-dir of this session when snapshots are used
+        self.noise_filter = DiffNoiseFilter(noise_filter_config) if noise_filter else None
         self.headers = {'PRIVATE-TOKEN': private_token}
         
         # Authentication status
         self.authenticated_gmail = False
         self.authenticated_gitlab = False
         self.authenticated_gemini = False
+        self.attached_to_daemon = False
+        self.gemini_handle = None  # Tab holding the Gemini conversation (the main tab unless attached)
+        self.main_handle = None    # Tab for Google sign-in and Gemini
+        self.gitlab_handle = None  # Tab for GitLab sign-in
 
         # Setup Chrome driver
         self.setup_chrome_driver()
+        self.selectors = SelectorResolver(self.driver)
+        self.turns = TurnExtractor(self.driver)
+        self.conversation = ConversationManager(self.driver, self.turns)
 
     def get_default_chrome_profile_path(self) -> str:
         """
@@ -77,6 +124,12 @@ class GitLabMRDocumentationGenerator:
 
     def setup_chrome_driver(self):
         """Setup Chrome WebDriver with existing profile or new persistent profile"""
+        # A running browser daemon already holds warm, authenticated sessions
+        self.driver = attach_driver()
+        if self.driver:
+            self.attached_to_daemon = True
+            return
+
         chrome_options = Options()
         
         # Basic options for better compatibility
@@ -96,7 +149,18 @@ class GitLabMRDocumentationGenerator:
             else:
                 user_data_dir = self.get_default_chrome_profile_path()
             
-            logger.info(f"Using existing Chrome profile: {user_data_dir}")
+            if self.profile_snapshot:
+                # Small private copy of the session state: fast to open, no lock on the desktop profile
+                try:
+                    sweep_stale_clones()
+                    snapshot = ensure_snapshot(user_data_dir, hosts=cookie_hosts(self.gitlab_url))
+                    self.profile_clone = clone_snapshot(snapshot)
+                    logger.info(f"Using snapshot of {user_data_dir} at {self.profile_clone}")
+                    user_data_dir = str(self.profile_clone)
+                except Exception as e:
+                    logger.warning(f"Profile snapshot failed ({e}); using the full profile")
+            else:
+                logger.info(f"Using existing Chrome profile: {user_data_dir}")
             chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
             
             # Optionally specify a profile directory (Default, Profile 1, etc.)
@@ -112,10 +176,12 @@ class GitLabMRDocumentationGenerator:
         # chrome_options.add_argument('--start-maximized')
         
         try:
+            started = time.time()
             self.driver = webdriver.Chrome(options=chrome_options)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             self.driver.maximize_window()
-            logger.info("Chrome WebDriver initialized successfully")
+            profile_kind = 'snapshot clone' if self.profile_clone else 'profile'
+            logger.info(f"Chrome WebDriver initialized successfully in {time.time() - started:.1f}s ({profile_kind})")
             
         except Exception as e:
             logger.error(f"Failed to initialize Chrome WebDriver: {e}")
@@ -137,6 +203,9 @@ class GitLabMRDocumentationGenerator:
         """
         Check if user is already authenticated with various services
         
+        All services are probed at once over HTTP with the browser's cookies;
+        only services the probe cannot decide are checked in the browser.
+        
         Returns:
             Dictionary with authentication status for each service
         """
@@ -149,86 +218,127 @@ class GitLabMRDocumentationGenerator:
         try:
             logger.info("Checking existing authentication status...")
             
-            # Check Gmail authentication
-            logger.info("Checking Gmail authentication...")
-            self.driver.get("https://accounts.google.com/")
-            time.sleep(3)
+            cookies = export_browser_cookies(self.driver)
+            probes = [google_account_probe(), gitlab_probe(self.gitlab_url), gemini_probe()]
+            results = run_probes(probes, cookies, deadline=AUTH_PROBE_DEADLINE,
+                                 on_result=self._log_probe_result)
             
-            try:
-                # Look for signs of being logged in
-                WebDriverWait(self.driver, 10).until(
-                    EC.any_of(
-                        EC.presence_of_element_located((By.XPATH, "//div[@data-gb-custom-button-id='account_switcher']")),
-                        EC.presence_of_element_located((By.XPATH, "//img[contains(@alt, 'profile')]")),
-                        EC.presence_of_element_located((By.XPATH, "//div[@aria-label='Google Account']")),
-                        EC.url_contains("myaccount.google.com")
-                    )
-                )
-                auth_status['gmail'] = True
-                self.authenticated_gmail = True
-                logger.info("✅ Gmail: Already authenticated")
-            except:
-                logger.info("❌ Gmail: Not authenticated")
-            
-            # Check GitLab authentication
-            logger.info("Checking GitLab authentication...")
-            self.driver.execute_script("window.open('');")
-            self.driver.switch_to.window(self.driver.window_handles[1])
-            self.driver.get(f"{self.gitlab_url}/dashboard")
-            time.sleep(3)
-            
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.any_of(
-                        EC.presence_of_element_located((By.XPATH, "//div[@data-testid='user-menu']")),
-                        EC.presence_of_element_located((By.XPATH, "//img[contains(@class, 'header-user-avatar')]")),
-                        EC.presence_of_element_located((By.XPATH, "//a[contains(@aria-label, 'user menu')]"))
-                    )
-                )
-                auth_status['gitlab'] = True
-                self.authenticated_gitlab = True
-                logger.info("✅ GitLab: Already authenticated")
-            except:
-                logger.info("❌ GitLab: Not authenticated")
+            self._prepare_tabs()
             
-            # Check Gemini authentication
-            logger.info("Checking Gemini authentication...")
-            self.driver.switch_to.window(self.driver.window_handles[0])
-            self.driver.get("https://gemini.google.com/")
-            time.sleep(5)
+            browser_checks = {
+                'gmail': self._browser_check_gmail,
+                'gitlab': self._browser_check_gitlab,
+                'gemini': self._browser_check_gemini
+            }
+            for service, result in results.items():
+                if result.authenticated is None:
+                    logger.info(f"Checking {service} authentication in the browser...")
+                    auth_status[service] = browser_checks[service]()
+                else:
+                    auth_status[service] = result.authenticated
             
-            try:
-                # Look for Gemini input area
-                input_area_xpaths = [
-                    "//div[@data-test-id='input-area']",
-                    "//div[@contenteditable='true']",
-                    "//textarea",
-                    "//div[@role='textbox']"
-                ]
-                
-                for xpath in input_area_xpaths:
-                    try:
-                        WebDriverWait(self.driver, 5).until(
-                            EC.presence_of_element_located((By.XPATH, xpath))
-                        )
-                        auth_status['gemini'] = True
-                        self.authenticated_gemini = True
-                        logger.info("✅ Gemini: Already authenticated")
-                        break
-                    except:
-                        continue
-                
-                if not auth_status['gemini']:
-                    logger.info("❌ Gemini: Not authenticated or needs setup")
-                    
-            except:
-                logger.info("❌ Gemini: Not authenticated")
+            self.authenticated_gmail = auth_status['gmail']
+            self.authenticated_gitlab = auth_status['gitlab']
+            self.authenticated_gemini = auth_status['gemini']
             
         except Exception as e:
             logger.error(f"Error checking authentication status: {e}")
         
         return auth_status
 
+    def _prepare_tabs(self):
+        """
+        Pick the main and GitLab tabs by handle
+
+        A browser of our own uses its first tab and a second one; on a daemon
+        every tab may belong to the daemon or another run, so both are opened
+        for this run (and closed again by detach_driver).
+        """
+        if self.main_handle and self.gitlab_handle:
+            return
+        if self.attached_to_daemon:
+            self.main_handle = self.main_handle or open_tab(self.driver)
+            self.gitlab_handle = self.gitlab_handle or open_tab(self.driver)
+            return
+        handles = self.driver.window_handles
+        self.main_handle = handles[0]
+        if len(handles) > 1:
+            self.gitlab_handle = handles[1]
+        else:
+            self.driver.switch_to.new_window('tab')
+            self.gitlab_handle = self.driver.current_window_handle
+
+    def _switch_to_main_tab(self):
+        self._prepare_tabs()
+        self.driver.switch_to.window(self.main_handle)
+
+    def _switch_to_gitlab_tab(self):
+        self._prepare_tabs()
+        self.driver.switch_to.window(self.gitlab_handle)
+
+    def _log_probe_result(self, result: ProbeResult):
+        """Report a probe result as soon as it arrives"""
+        if result.authenticated is None:
+            logger.info(f"❔ {result.name}: undetermined over HTTP ({result.detail}, {result.elapsed:.2f}s)")
+        elif result.authenticated:
+            logger.info(f"✅ {result.name}: Already authenticated ({result.elapsed:.2f}s)")
+        else:
+            logger.info(f"❌ {result.name}: Not authenticated ({result.detail})")
+
+    def _browser_check_gmail(self) -> bool:
+        """Check Google sign-in by loading the account page in the main tab"""
+        self._switch_to_main_tab()
+        self.driver.get("https://accounts.google.com/")
+        wait_until(self.driver, page_settled(), timeout=10, label='google account page')
+        
+        try:
+            # Look for signs of being logged in
+            WebDriverWait(self.driver, 10).until(
+                EC.any_of(
+                    EC.presence_of_element_located((By.XPATH, "//div[@data-gb-custom-button-id='account_switcher']")),
+                    EC.presence_of_element_located((By.XPATH, "//img[contains(@alt, 'profile')]")),
+                    EC.presence_of_element_located((By.XPATH, "//div[@aria-label='Google Account']")),
+                    EC.url_contains("myaccount.google.com")
+                )
+            )
+            logger.info("✅ Gmail: Already authenticated")
+            return True
+        except:
+            logger.info("❌ Gmail: Not authenticated")
+            return False
+
+    def _browser_check_gitlab(self) -> bool:
+        """Check GitLab sign-in by loading the dashboard in the GitLab tab"""
+        self._switch_to_gitlab_tab()
+        self.driver.get(f"{self.gitlab_url}/dashboard")
+        wait_until(self.driver, page_settled(), timeout=10, label='gitlab dashboard')
+        
+        try:
+            WebDriverWait(self.driver, 10).until(
+                EC.any_of(
+                    EC.presence_of_element_located((By.XPATH, "//div[@data-testid='user-menu']")),
+                    EC.presence_of_element_located((By.XPATH, "//img[contains(@class, 'header-user-avatar')]")),
+                    EC.presence_of_element_located((By.XPATH, "//a[contains(@aria-label, 'user menu')]"))
+                )
+            )
+            logger.info("✅ GitLab: Already authenticated")
+            return True
+        except:
+            logger.info("❌ GitLab: Not authenticated")
+            return False
+
+    def _browser_check_gemini(self) -> bool:
+        """Check Gemini access by waiting for its input area in the main tab"""
+        self._switch_to_main_tab()
+        self.driver.get("https://gemini.google.com/")
+        
+        if wait_until(self.driver, element_present(*GEMINI_INPUT_SELECTORS), timeout=15, label='gemini input'):
+            logger.info("✅ Gemini: Already authenticated")
+            return True
+        
+        logger.info("❌ Gemini: Not authenticated or needs setup")
+        return False
+
     def setup_missing_authentications(self, auth_status: Dict[str, bool]) -> bool:
         """
         Setup missing authentications based on current status
@@ -243,7 +353,7 @@ class GitLabMRDocumentationGenerator:
             # If Gmail is not authenticated, guide user to authenticate manually
             if not auth_status['gmail']:
                 logger.info("Gmail authentication required...")
-                self.driver.switch_to.window(self.driver.window_handles[0])
+                self._switch_to_main_tab()
                 self.driver.get("https://accounts.google.com/signin")
                 
                 print("\n" + "="*60)
@@ -264,7 +374,7 @@ class GitLabMRDocumentationGenerator:
             # If GitLab is not authenticated, guide user to authenticate manually
             if not auth_status['gitlab']:
                 logger.info("GitLab authentication required...")
-                self.driver.switch_to.window(self.driver.window_handles[1])
+                self._switch_to_gitlab_tab()
                 self.driver.get(f"{self.gitlab_url}/users/sign_in")
                 
                 print("\n" + "="*60)
@@ -302,7 +412,7 @@ class GitLabMRDocumentationGenerator:
         """Verify Gmail authentication"""
         try:
             self.driver.get("https://accounts.google.com/")
-            time.sleep(3)
+            wait_until(self.driver, page_settled(), timeout=10, label='google account page')
             
             WebDriverWait(self.driver, 10).until(
                 EC.any_of(
@@ -319,7 +429,7 @@ class GitLabMRDocumentationGenerator:
         """Verify GitLab authentication"""
         try:
             self.driver.get(f"{self.gitlab_url}/dashboard")
-            time.sleep(3)
+            wait_until(self.driver, page_settled(), timeout=10, label='gitlab dashboard')
             
             WebDriverWait(self.driver, 10).until(
                 EC.any_of(
@@ -335,9 +445,9 @@ class GitLabMRDocumentationGenerator:
     def setup_gemini_interface(self) -> bool:
         """Setup Gemini interface"""
         try:
-            self.driver.switch_to.window(self.driver.window_handles[0])
+            self._switch_to_main_tab()
             self.driver.get("https://gemini.google.com/")
-            time.sleep(5)
+            wait_until(self.driver, page_settled(), timeout=15, label='gemini page')
             
             # Handle any setup screens
             try:
@@ -352,8 +462,11 @@ class GitLabMRDocumentationGenerator:
                         button = WebDriverWait(self.driver, 5).until(
                             EC.element_to_be_clickable((By.XPATH, xpath))
                         )
+                        # The page before the click is already settled: wait for what the click brings up
+                        before = self.driver.current_url
                         button.click()
-                        time.sleep(3)
+                        wait_until(self.driver, any_of(url_changed(before), element_present(*GEMINI_INPUT_SELECTORS)),
+                                   timeout=10, label='gemini setup screen')
                         break
                     except:
                         continue
@@ -392,6 +505,10 @@ class GitLabMRDocumentationGenerator:
         """
         logger.info("Starting smart authentication process...")
         
+        if self.attached_to_daemon and self.check_warm_session():
+            logger.info("✅ Reusing warm browser daemon session")
+            return True
+        
         # Check existing authentication status
         auth_status = self.check_existing_authentications()
         
@@ -424,6 +541,27 @@ class GitLabMRDocumentationGenerator:
         logger.info("✅ All authentication steps completed successfully!")
         return True
 
+    def check_warm_session(self) -> bool:
+        """
+        Verify a daemon session without navigating: an open Gemini tab with an
+        input area plus a working API token means no login flow is needed
+        """
+        try:
+            if not switch_to_tab(self.driver, "gemini.google.com"):
+                return False
+            
+            inputs = self.driver.find_elements(By.XPATH, "//div[@contenteditable='true'] | //textarea | //div[@role='textbox']")
+            if not inputs:
+                return False
+            
+            self.gemini_handle = self.driver.current_window_handle
+            self.authenticated_gemini = True
+            return self.test_gitlab_api_access()
+            
+        except Exception as e:
+            logger.debug(f"Warm session check failed: {e}")
+            return False
+
     def test_gitlab_api_access(self) -> bool:
         """Test GitLab API access with the provided token"""
         try:
@@ -495,57 +633,54 @@ class GitLabMRDocumentationGenerator:
 
         return java_changes
 
-    def send_prompt_to_gemini_web(self, prompt: str) -> str:
-        """Send prompt to Gemini web interface and get response"""
+    def send_prompt_to_gemini_web(self, prompt: str, parser: Optional[IncrementalResponseParser] = None,
+                                  new_topic: bool = True) -> str:
+        """
+        Send prompt to Gemini web interface and get response
+
+        Args:
+            prompt: The prompt to send
+            parser: Optional sectioned-response parser; when given, the response is
+                complete as soon as the parser has seen every section or the end marker
+            new_topic: False for follow-ups that must stay in the current chat
+        """
         if not self.authenticated_gemini:
             logger.error("Gemini authentication required")
             return "Error: Gemini not authenticated"
 
         try:
             logger.info("Sending prompt to Gemini...")
-            self.driver.switch_to.window(self.driver.window_handles[0])
+            if self.gemini_handle:
+                self.driver.switch_to.window(self.gemini_handle)
+            else:
+                self._switch_to_main_tab()
 
             if "gemini.google.com" not in self.driver.current_url:
                 self.driver.get("https://gemini.google.com/")
-                time.sleep(3)
+                wait_until(self.driver, element_present(*GEMINI_INPUT_SELECTORS), timeout=10, label='gemini input')
 
-            # Find input area
-            input_element = None
+            # Rotate to a fresh chat if this one has grown too long
+            self.conversation.start_turn(allow_rotation=new_topic)
+
+            # Find input area (all candidates probed in one round trip)
             input_xpaths = [
                 "//div[@data-test-id='input-area']",
                 "//div[@contenteditable='true']",
                 "//textarea",
                 "//div[@role='textbox']"
             ]
-
-            for xpath in input_xpaths:
-                try:
-                    input_element = WebDriverWait(self.driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    break
-                except:
-                    continue
+            input_element = self.selectors.find('gemini-input', input_xpaths, timeout=10)
 
             if not input_element:
                 raise Exception("Could not find Gemini input area")
 
-            # Clear and enter prompt
+            # Clear and enter prompt in one round trip (chunked typing only as fallback)
             input_element.click()
-            time.sleep(1)
-            ActionChains(self.driver).key_down(Keys.CONTROL).send_keys('a').key_up(Keys.CONTROL).perform()
-            time.sleep(0.5)
-            input_element.send_keys(Keys.DELETE)
-            time.sleep(1)
+            PromptInjector(self.driver, chunk_size=1000).inject(input_element, prompt)
 
-            # Type prompt in chunks
-            chunk_size = 1000
-            for i in range(0, len(prompt), chunk_size):
-                chunk = prompt[i:i+chunk_size]
-                input_element.send_keys(chunk)
-                time.sleep(0.5)
-
-            time.sleep(2)
+            # Record the current turn count so the completion detector only watches the new answer
+            completion = GeminiCompletionDetector(self.driver)
+            completion.mark()
 
             # Submit prompt
             send_xpaths = [
@@ -554,61 +689,96 @@ class GitLabMRDocumentationGenerator:
                 "//button[contains(@title, 'Send')]"
             ]
 
-            for xpath in send_xpaths:
-                try:
-                    send_button = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, xpath))
-                    )
-                    send_button.click()
-                    break
-                except:
-                    continue
+            send_button = self.selectors.find('gemini-send', send_xpaths, timeout=5, enabled=True)
+            if send_button:
+                send_button.click()
             else:
                 input_element.send_keys(Keys.ENTER)
 
             logger.info("Prompt submitted, waiting for response...")
-            time.sleep(5)
-
-            # Wait for response (simplified)
             max_wait_time = 180
             start_time = time.time()
-            
+
+            # Event-driven wait: returns as soon as the model turn stops changing
+            response_text = ""
+            result = completion.wait(timeout=max_wait_time)
+            if result.completed:
+                response_text = self.extract_gemini_response()
+                if parser:
+                    parser.feed(response_text)
+                    if parser.sections:
+                        return response_text
+                elif response_text and len(response_text) > 100:
+                    return response_text
+
+            # Observer could not confirm completion; poll for the remaining time
             while time.time() - start_time < max_wait_time:
                 try:
                     response_text = self.extract_gemini_response()
-                    if response_text and len(response_text) > 100:
+                    if parser:
+                        parser.feed(response_text)
+                        if parser.is_finished:
+                            return response_text
+                    elif response_text and len(response_text) > 100:
                         return response_text
                     time.sleep(3)
                 except:
                     time.sleep(3)
 
+            if parser and parser.sections:
+                logger.warning(f"Response timeout, missing sections: {', '.join(parser.missing())}")
+                return response_text
+
             return "Response timeout or not found"
 
         except Exception as e:
             logger.error(f"Error sending prompt to Gemini: {e}")
             return f"Error getting response from Gemini: {str(e)}"
+        finally:
+            self.conversation.finish_turn()
+
+    def send_sectioned_prompt(self, prompt: str, protocol: SectionedResponseProtocol,
+                              max_followups: int = 1) -> str:
+        """
+        Send a prompt using the sectioned response protocol
+
+        Sections missing from the first answer are re-requested on their own
+        instead of regenerating the whole document.
+        """
+        parser = protocol.parser()
+        response = self.send_prompt_to_gemini_web(f"{prompt}\n\n{protocol.instructions()}", parser=parser)
+
+        if not parser.sections:
+            # Gemini ignored the protocol; keep whatever text came back
+            return response
+
+        for _ in range(max_followups):
+            missing = parser.missing()
+            if not missing:
+                break
+            logger.info(f"Re-requesting missing sections: {', '.join(missing)}")
+            followup_parser = IncrementalResponseParser(missing)
+            self.send_prompt_to_gemini_web(protocol.followup_prompt(missing), parser=followup_parser, new_topic=False)
+            parser.merge(followup_parser)
+
+        return protocol.render_markdown(parser.sections)
 
     def extract_gemini_response(self) -> str:
         """Extract response from Gemini web interface"""
         try:
-            response_xpaths = [
-                "//div[@data-test-id='response']",
-                "//div[contains(@class, 'response-content')]",
-                "//div[contains(@class, 'message-content')]"
-            ]
-
-            for xpath in response_xpaths:
-                try:
-                    elements = self.driver.find_elements(By.XPATH, xpath)
-                    if elements:
-                        response_text = elements[-1].text.strip()
-                        if response_text and len(response_text) > 50:
-                            return response_text
-                except:
-                    continue
+            # Only the turn newer than the one recorded at submission is read, in one round trip
+            turn = self.conversation.latest()
+            if turn and len(turn.text) > 50:
+                return turn.text
 
             # Fallback: get page text
             page_text = self.driver.find_element(By.TAG_NAME, "body").text
+
+            # Sectioned responses mark exactly where the answer starts
+            start = locate_response_start(page_text)
+            if start >= 0:
+                return page_text[start:]
+
             lines = page_text.split('\n')
             
             # Look for meaningful response content
@@ -656,11 +826,9 @@ Status: {'New file' if change['new_file'] else 'Modified file'}
 2. **Technical Details**: Key modifications per file
 3. **Impact Analysis**: System impact and considerations
 4. **Risk Assessment**: Potential risks
-5. **Testing Recommendations**: Testing suggestions
+5. **Testing Recommendations**: Testing suggestions"""
 
-Format with clear markdown sections."""
-
-        return self.send_prompt_to_gemini_web(prompt)
+        return self.send_sectioned_prompt(prompt, SectionedResponseProtocol(DOCUMENTATION_SECTIONS))
 
     def generate_mr_documentation(self, project_id: str, mr_iid: str) -> Dict:
         """Generate complete documentation for a merge request"""
@@ -676,6 +844,12 @@ Format with clear markdown sections."""
         if not changes_data:
             return {"error": "Failed to get merge request changes"}
 
+        # Strip diff noise from every file before the Java changes are picked for the prompt
+        if self.noise_filter:
+            filtered, noise_stats = self.noise_filter.filter_changes(changes_data.get('changes', []))
+            logger.info(f"Diff noise filter: {noise_stats.describe()}")
+            changes_data = dict(changes_data, changes=filtered)
+
         # Extract Java changes
         java_changes = self.extract_java_changes(changes_data)
         if not java_changes:
@@ -734,9 +908,21 @@ Format with clear markdown sections."""
     def cleanup(self):
         """Clean up resources"""
         try:
+            if hasattr(self, 'selectors'):
+                self.selectors.save()
+            if hasattr(self, 'conversation'):
+                self.conversation.log_summary()
+            log_trace_summary()
             if hasattr(self, 'driver') and self.driver:
-                self.driver.quit()
-                logger.info("WebDriver closed successfully")
+                if self.attached_to_daemon:
+                    # Leave the daemon browser running for the next invocation
+                    detach_driver(self.driver)
+                    logger.info("Detached from browser daemon")
+                else:
+                    self.driver.quit()
+                    logger.info("WebDriver closed successfully")
+            if self.profile_clone:
+                remove_clone(self.profile_clone)
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
 
@@ -818,6 +1004,9 @@ Examples:
 
   # Force new profile (don't use existing)
   python gitlab_mr_existing_profile.py --no-existing-profile
+
+  # Start from a minimal snapshot of the profile (works while desktop Chrome is open)
+  python gitlab_mr_existing_profile.py --profile-snapshot
         """
     )
 
@@ -857,6 +1046,24 @@ Examples:
         help='Don\'t use existing Chrome profile, create new one'
     )
 
+    parser.add_argument(
+        '--profile-snapshot',
+        action='store_true',
+        help='Start Chrome from a minimal tmpfs snapshot of the existing profile (cookies and login state only)'
+    )
+
+    parser.add_argument(
+        '--no-noise-filter',
+        action='store_true',
+        help='Send diffs to Gemini as they are (no lockfile, generated, whitespace, import or license filtering)'
+    )
+
+    parser.add_argument(
+        '--keep-whitespace-hunks',
+        action='store_true',
+        help='Keep hunks that only change whitespace'
+    )
+
     parser.add_argument(
         '--output-file',
         required=False,
@@ -887,7 +1094,10 @@ Examples:
             gitlab_url=gitlab_url,
             private_token=private_token,
             use_existing_profile=not args.no_existing_profile,
-            profile_path=args.profile_path
+            profile_path=args.profile_path,
+            profile_snapshot=args.profile_snapshot,
+            noise_filter=NOISE_FILTER_ENABLED and not args.no_noise_filter,
+            noise_filter_config=NoiseFilterConfig(drop_whitespace_hunks=not args.keep_whitespace_hunks)
         )
 
         if args.project_id and args.mr_iid:
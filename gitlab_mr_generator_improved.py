@@ -10,9 +10,23 @@ from selenium.webdriver.common.action_chains import ActionChains
 from datetime import datetime
 import time
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
 import logging
 
+from diff_noise_filter import DiffNoiseFilter
+from analysis_backends import AnalysisRequest, GeminiWebBackend, ExtractiveSummaryBackend, run_backends
+from gemini_completion import GeminiCompletionDetector
+from prompt_injection import PromptInjector
+from selector_resolver import SelectorResolver
+from dom_extraction import TurnExtractor
+from gemini_conversation import ConversationManager
+from cdp_resource_policy import ResourcePolicyManager, LEAN_POLICY
+from readiness import wait_until, page_settled, log_trace_summary
+from cookie_bridge import CookieBridge
+from login_detection import LoginDetector
+from auth_state_cache import AuthStateCache, AuthState, token_fingerprint
+from checkpoint_journal import CheckpointJournal, DOCUMENTED, FAILED
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,6 +54,22 @@ OUTPUT_FILENAME = None  # Set to None for auto-generated filename, or specify li
 SKIP_BROWSER_VERIFICATION = False  # Set to True to skip browser verification and rely on API only
 CUSTOM_LOGIN_SELECTORS = []  # Add custom selectors for your Verizon GitLab login page if needed
 VERIFICATION_TIMEOUT = 30  # Timeout for verification checks
+AUTH_STATE_TTL = 4 * 3600  # Seconds a successful verification is reused on later starts (0 to always verify)
+
+# Diff pre-processing
+NOISE_FILTER_ENABLED = True  # Drop/summarise lockfile, generated, whitespace, import and license-header noise
+
+# Checkpointing
+CHECKPOINT_JOURNAL = "mr_documentation.journal.jsonl"  # Journal of finished MRs, written as the run goes (None to disable)
+RESUME_FROM_JOURNAL = False  # Set to True to continue an interrupted run: MRs documented before are not processed again
+
+# Gemini Configuration
+GEMINI_QUIET_PERIOD = 0.8  # Seconds without changes before a Gemini answer counts as complete
+GEMINI_MAX_TURNS_PER_CHAT = 8  # Start a fresh Gemini chat after this many answers...
+GEMINI_MAX_DOM_KB = 2048  # ...or once the chat page DOM grows past this size
+
+# Analysis Configuration
+ANALYSIS_MODE = "gemini"  # "gemini" (local summary as fallback) or "quick" (local extractive summary only, no browser AI)
 
 # ========================================
 # END CONFIGURATION SECTION
@@ -65,17 +95,44 @@ class GitLabMRDocumentationGenerator:
         # Initialize session tracking
         self.api_access_working = False
         self.browser_session_available = False
+        self.gemini_ready = False
+        self.gitlab_user = {}
+        self.token_scopes = []
         self.skip_browser = SKIP_BROWSER_VERIFICATION
+        self.noise_filter = DiffNoiseFilter() if NOISE_FILTER_ENABLED else None
+        self.quick_mode = ANALYSIS_MODE == "quick"
+        self.local_summarizer = ExtractiveSummaryBackend()
+        self.analysis_backends = [] if self.quick_mode else [
+            GeminiWebBackend(
+                lambda request: self.analyze_code_changes_with_gemini(request.changes, request.mr_info),
+                is_ready=lambda: hasattr(self, 'driver') and len(self.driver.window_handles) > 1
+            )
+        ]
 
         # Setup Chrome driver
         self.setup_chrome_driver()
-
-        # Verify GitLab authentication
-        self.verify_gitlab_authentication()
+        self.selectors = SelectorResolver(self.driver)
+        self.turns = TurnExtractor(self.driver)
+        self.conversation = ConversationManager(self.driver, self.turns, GEMINI_MAX_TURNS_PER_CHAT, GEMINI_MAX_DOM_KB)
+        self.resources = ResourcePolicyManager(self.driver)
+        self.cookie_bridge = CookieBridge(self.driver, self.gitlab_url)
+        self.login_detector = LoginDetector(self.cookie_bridge)
+
+        # Verify GitLab authentication, unless a recent verification for this token is cached
+        self.auth_cache = AuthStateCache(ttl=AUTH_STATE_TTL)
+        self.auth_rechecked = False
+        cached_state = self.auth_cache.load(self.gitlab_url, self.private_token) if AUTH_STATE_TTL else None
+        if cached_state:
+            self.restore_auth_state(cached_state)
+        else:
+            self.verify_gitlab_authentication()
 
         # Initialize Gemini web interface only if browser verification passed
-        if not self.skip_browser:
-            self.setup_gemini_web_interface()
+        if not self.skip_browser and not self.quick_mode:
+            self.setup_gemini_web_interface(known_ready=bool(cached_state and cached_state.gemini_ready))
+
+        if not cached_state:
+            self.save_auth_state()
 
     def verify_gitlab_authentication(self):
         """Enhanced GitLab authentication verification for private instances"""
@@ -91,6 +148,8 @@ class GitLabMRDocumentationGenerator:
                 user_info = response.json()
                 logger.info(f"✓ GitLab API access verified for user: {user_info.get('name', 'Unknown')} ({user_info.get('username', 'Unknown')})")
                 self.api_access_working = True
+                self.gitlab_user = user_info
+                self.token_scopes = self.get_token_scopes()
 
                 # Test project access with first MR to ensure permissions
                 if MERGE_REQUESTS:
@@ -145,6 +204,74 @@ class GitLabMRDocumentationGenerator:
         except Exception as e:
             logger.warning(f"Could not test project access: {e}")
 
+    def get_token_scopes(self) -> List[str]:
+        """Scopes of the private token (GitLab 15.5+; empty if unavailable)"""
+        try:
+            url = f"{self.gitlab_url}/api/v4/personal_access_tokens/self"
+            response = requests.get(url, headers=self.headers, timeout=30, verify=getattr(self, 'ssl_verify', True))
+            if response.status_code == 200:
+                return response.json().get('scopes', [])
+        except Exception as e:
+            logger.debug(f"Could not read token scopes: {e}")
+        return []
+
+    def restore_auth_state(self, state: AuthState):
+        """Adopt a cached verification instead of repeating the start-up checks"""
+        logger.info(f"✓ Using cached authentication for {state.username or 'browser session'} "
+                    f"(verified {state.age() / 60:.0f} min ago)")
+        self.api_access_working = state.api_access
+        self.browser_session_available = state.browser_session and not self.skip_browser
+        self.gitlab_user = {'username': state.username, 'name': state.name}
+        self.token_scopes = state.scopes
+        if not state.ssl_verify:
+            import urllib3
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            self.ssl_verify = False
+
+    def save_auth_state(self):
+        """Cache the verification outcome for later starts"""
+        if not AUTH_STATE_TTL or not (self.api_access_working or self.browser_session_available):
+            return
+
+        cookie_expires_at = None
+        if self.browser_session_available:
+            self.cookie_bridge.refresh()
+            cookie_expires_at = self.cookie_bridge.expires_at
+
+        self.auth_cache.save(AuthState(
+            gitlab_url=self.gitlab_url,
+            token_fingerprint=token_fingerprint(self.private_token),
+            username=self.gitlab_user.get('username', ''),
+            name=self.gitlab_user.get('name', ''),
+            scopes=self.token_scopes,
+            api_access=self.api_access_working,
+            browser_session=self.browser_session_available,
+            ssl_verify=getattr(self, 'ssl_verify', True),
+            cookie_expires_at=cookie_expires_at,
+            gemini_ready=self.gemini_ready
+        ))
+
+    def recheck_authentication(self, reason: str) -> bool:
+        """
+        Verify again after GitLab rejected a real request (at most once per run)
+
+        Returns:
+            True if verification ran and the caller may retry
+        """
+        if self.auth_rechecked:
+            return False
+        self.auth_rechecked = True
+
+        logger.warning(f"GitLab rejected a request ({reason}); verifying authentication again")
+        self.auth_cache.invalidate(reason)
+        try:
+            self.verify_gitlab_authentication()
+        except Exception as e:
+            logger.error(f"Re-verification failed: {e}")
+            return False
+        self.save_auth_state()
+        return True
+
     def handle_ssl_error(self):
         """Handle SSL certificate issues common in corporate environments"""
         logger.info("Attempting to continue with SSL verification disabled...")
@@ -162,6 +289,7 @@ class GitLabMRDocumentationGenerator:
                 user_info = response.json()
                 logger.info(f"✓ GitLab API access verified (SSL disabled): {user_info.get('name', 'Unknown')}")
                 self.api_access_working = True
+                self.gitlab_user = user_info
                 
                 # Update all future requests to disable SSL verification
                 self.ssl_verify = False
@@ -189,6 +317,13 @@ class GitLabMRDocumentationGenerator:
         """Enhanced browser session verification for private GitLab instances"""
         try:
             logger.info("Verifying browser session with GitLab...")
+            
+            # A signed-in session is recognised from its cookies without loading a page
+            if self.login_detector.check(verify=getattr(self, 'ssl_verify', True)).signed_in:
+                logger.info("✓ Browser session verified successfully")
+                self.browser_session_available = True
+                return
+            
             self.driver.get(self.gitlab_url)
             
             # Wait for page to load
@@ -196,7 +331,7 @@ class GitLabMRDocumentationGenerator:
                 lambda driver: driver.execute_script("return document.readyState") == "complete"
             )
             
-            time.sleep(3)  # Additional wait for dynamic content
+            wait_until(self.driver, page_settled(), timeout=5, label='gitlab dynamic content')
             
             # Check current URL for redirects (common in corporate SSO)
             current_url = self.driver.current_url
@@ -223,6 +358,14 @@ class GitLabMRDocumentationGenerator:
 
     def _detect_login_page(self) -> bool:
         """Enhanced login page detection for various GitLab configurations"""
+        # The session cookies answer this in milliseconds; the page is only inspected if that is ambiguous
+        signed_in = self.login_detector.check(verify=getattr(self, 'ssl_verify', True)).signed_in
+        if signed_in is not None:
+            return not signed_in
+        return self._detect_login_page_dom()
+
+    def _detect_login_page_dom(self) -> bool:
+        """Login page detection from the loaded page's elements and text"""
         try:
             # Standard GitLab login selectors
             standard_selectors = [
@@ -276,6 +419,13 @@ class GitLabMRDocumentationGenerator:
 
     def _verify_authenticated_session(self) -> bool:
         """Enhanced authentication verification"""
+        signed_in = self.login_detector.check(verify=getattr(self, 'ssl_verify', True)).signed_in
+        if signed_in is not None:
+            return signed_in
+        return self._verify_authenticated_session_dom()
+
+    def _verify_authenticated_session_dom(self) -> bool:
+        """Authentication verification from the loaded page's elements and text"""
         try:
             # Look for authenticated user indicators
             auth_indicators = [
@@ -343,7 +493,7 @@ class GitLabMRDocumentationGenerator:
                 WebDriverWait(self.driver, VERIFICATION_TIMEOUT).until(
                     lambda driver: driver.execute_script("return document.readyState") == "complete"
                 )
-                time.sleep(3)
+                wait_until(self.driver, page_settled(), timeout=5, label='gitlab sign-in refresh')
                 
                 # Check if still on login page
                 if self._detect_login_page():
@@ -451,21 +601,32 @@ class GitLabMRDocumentationGenerator:
         try:
             mr_url = f"{self.gitlab_url}/{project_id}/-/merge_requests/{mr_iid}"
             
-            # Switch to GitLab tab
+            # Ask over HTTP with the browser's cookies first; the browser is only driven
+            # when that session is not signed in or the answer is inconclusive
+            if self.check_mr_via_cookie_bridge(project_id, mr_iid, mr_url, result) is not None:
+                return result['browser_accessible']
+            
+            # Switch to GitLab tab; it only loads HTML and scripts (no images, fonts, avatars, analytics)
             self.driver.switch_to.window(self.driver.window_handles[0])
-            self.driver.get(mr_url)
+            self.resources.navigate(mr_url, LEAN_POLICY)
             
             # Wait for page load
             WebDriverWait(self.driver, VERIFICATION_TIMEOUT).until(
                 lambda driver: driver.execute_script("return document.readyState") == "complete"
             )
-            time.sleep(3)
 
             # Check for access denied or not found
             error_indicators = [
                 ".access-denied", ".not-found", ".error-message", 
                 ".permission-denied", ".page-404", ".error-content"
             ]
+            mr_indicators = [
+                ".merge-request", ".mr-widget", ".mr-state-widget", 
+                ".issuable-meta", ".merge-request-details", ".mr-tabs"
+            ]
+            
+            # Returns as soon as GitLab has rendered either the MR or an error page
+            self.selectors.find('gitlab-mr-page', mr_indicators + error_indicators, timeout=3)
             
             for selector in error_indicators:
                 if self.driver.find_elements(By.CSS_SELECTOR, selector):
@@ -482,11 +643,6 @@ class GitLabMRDocumentationGenerator:
                     return False
 
             # Look for MR content
-            mr_indicators = [
-                ".merge-request", ".mr-widget", ".mr-state-widget", 
-                ".issuable-meta", ".merge-request-details", ".mr-tabs"
-            ]
-            
             for selector in mr_indicators:
                 if self.driver.find_elements(By.CSS_SELECTOR, selector):
                     result['browser_accessible'] = True
@@ -507,6 +663,39 @@ class GitLabMRDocumentationGenerator:
             logger.warning(f"Error checking browser access: {e}")
             return False
 
+    def check_mr_via_cookie_bridge(self, project_id: str, mr_iid: str, mr_url: str, result: Dict) -> Optional[bool]:
+        """Check MR access over HTTP with the browser session; None if undecided"""
+        response = self.cookie_bridge.get(f"{mr_url}.json", headers={'Accept': 'application/json'},
+                                          verify=getattr(self, 'ssl_verify', True))
+        if response is None:
+            if self.cookie_bridge.signed_in is False:
+                # GitLab redirected to sign-in: the browser path below re-verifies the session
+                self.recheck_authentication('browser session signed out')
+            return None
+
+        if response.status_code == 404:
+            result['error'] = "Access denied or MR not found via browser session"
+            return False
+
+        if response.status_code == 200:
+            try:
+                data = response.json()
+            except ValueError:
+                return None
+            if isinstance(data, dict) and data.get('iid'):
+                result['browser_accessible'] = True
+                if not result['mr_info']:
+                    result['mr_info'] = {
+                        'title': data.get('title', 'Unknown Title'),
+                        'web_url': mr_url,
+                        'iid': mr_iid,
+                        'source': 'browser'
+                    }
+                logger.info(f"✓ Browser session access successful for MR {project_id}/{mr_iid} (HTTP)")
+                return True
+
+        return None
+
     def extract_mr_info_from_browser(self, project_id: str, mr_iid: str, result: Dict):
         """Extract MR information from browser when API is not available"""
         try:
@@ -587,6 +776,8 @@ class GitLabMRDocumentationGenerator:
 
             if response.status_code == 200:
                 return response.json()
+            elif response.status_code == 401 and self.recheck_authentication('401 from merge request API'):
+                return self.get_merge_request_info(project_id, mr_iid)
             elif response.status_code == 404:
                 logger.error(f"MR {project_id}/{mr_iid} not found")
                 return None
@@ -612,32 +803,33 @@ class GitLabMRDocumentationGenerator:
             
         return None
 
-    def setup_gemini_web_interface(self):
+    def setup_gemini_web_interface(self, known_ready: bool = False):
         """Setup Gemini web interface with better error handling"""
         try:
             logger.info("Opening Gemini web interface...")
             self.driver.execute_script("window.open('https://gemini.google.com/', '_blank');")
 
+            if known_ready:
+                # Readiness was verified on a recent start; the prompt step waits for the input itself
+                self.gemini_ready = True
+                return
+
             # Switch to the new Gemini tab
             self.driver.switch_to.window(self.driver.window_handles[-1])
 
-            # Wait for page to load
-            time.sleep(5)
-
-            # Check if we need to sign in
-            try:
-                # Look for the text input area with longer timeout
-                WebDriverWait(self.driver, 20).until(
-                    lambda driver: driver.find_element(By.CSS_SELECTOR, "[data-test-id='input-area']") or
-                                   driver.find_element(By.CSS_SELECTOR, "div[contenteditable='true']") or
-                                   driver.find_element(By.TAG_NAME, "textarea")
-                )
+            # Check if we need to sign in: the input area appears once the page is usable
+            input_element = self.selectors.find(
+                'gemini-input',
+                ["[data-test-id='input-area']", "div[contenteditable='true']", "textarea"],
+                timeout=25
+            )
+            if input_element:
                 logger.info("✓ Gemini interface is ready")
-
-            except Exception as e:
+            else:
                 logger.warning("Gemini interface might require manual sign-in.")
                 logger.info("Please sign in to Gemini manually in the browser window.")
                 input("Press Enter after signing in to Gemini...")
+            self.gemini_ready = True
 
             # Switch back to GitLab tab
             self.driver.switch_to.window(self.driver.window_handles[0])
@@ -659,29 +851,30 @@ class GitLabMRDocumentationGenerator:
             
             # Get changes if API is available
             java_changes = []
+            commits = []
             if self.api_access_working:
                 changes_data = self.get_merge_request_changes(project_id, mr_iid)
                 if changes_data:
+                    # Filter every file first: generated Java sources are only recognisable among all changes
+                    changes_data = dict(changes_data, changes=self.filter_diff_noise(changes_data.get('changes', [])))
                     java_changes = self.extract_java_changes(changes_data)
+                commits = self.get_merge_request_commits(project_id, mr_iid)
             
             # Generate documentation using Gemini or fallback
-            if hasattr(self, 'driver') and len(self.driver.window_handles) > 1:
-                try:
-                    documentation = self.analyze_code_changes_with_gemini(java_changes, mr_info)
-                    if documentation and not documentation.startswith("Error"):
-                        return documentation
-                except Exception as e:
-                    logger.warning(f"Gemini analysis failed: {e}")
+            request = AnalysisRequest.from_mr_info(mr_info, java_changes, commits)
+            documentation = run_backends(self.analysis_backends, request)
+            if documentation:
+                return documentation
             
             # Fallback documentation generation
-            return self.generate_fallback_documentation(mr_info, java_changes)
+            return self.generate_fallback_documentation(mr_info, java_changes, commits)
             
         except Exception as e:
             logger.error(f"Error generating documentation for MR {project_id}/{mr_iid}: {e}")
             return f"Error generating documentation: {str(e)}"
 
-    def generate_fallback_documentation(self, mr_info: Dict, java_changes: List[Dict]) -> str:
-        """Generate basic documentation when Gemini is not available"""
+    def generate_fallback_documentation(self, mr_info: Dict, java_changes: List[Dict], commits: List[Dict] = None) -> str:
+        """Generate documentation with the local extractive summariser when Gemini is not available"""
         doc = f"""# Merge Request Documentation
 
 ## Summary
@@ -709,11 +902,16 @@ class GitLabMRDocumentationGenerator:
         else:
             doc += "No Java file changes detected or changes could not be retrieved.\n"
 
-        doc += """
+        analysis = self.local_summarizer.analyze(AnalysisRequest.from_mr_info(mr_info, java_changes, commits))
+        if analysis:
+            doc += f"\n{analysis}\n"
+
+        reason = "Quick mode is enabled" if self.quick_mode else "Gemini AI analysis was not available for this merge request"
+        doc += f"""
 ## Notes
-- This documentation was generated automatically
+- This documentation was generated automatically from commit messages, the MR description and the diff structure
 - For detailed code analysis, manual review is recommended
-- Gemini AI analysis was not available for this merge request
+- {reason}
 """
         
         return doc
@@ -727,6 +925,8 @@ class GitLabMRDocumentationGenerator:
 
             if response.status_code == 200:
                 return response.json()
+            elif response.status_code == 401 and self.recheck_authentication('401 from changes API'):
+                return self.get_merge_request_changes(project_id, mr_iid)
             else:
                 logger.error(f"Failed to get MR changes: {response.status_code}")
                 return None
@@ -735,6 +935,25 @@ class GitLabMRDocumentationGenerator:
             logger.error(f"Error getting MR changes: {e}")
             return None
 
+    def get_merge_request_commits(self, project_id: str, mr_iid: str) -> List[Dict]:
+        """Get merge request commits (used by the local summariser)"""
+        try:
+            url = f"{self.gitlab_url}/api/v4/projects/{project_id}/merge_requests/{mr_iid}/commits"
+            verify_ssl = getattr(self, 'ssl_verify', True)
+            response = requests.get(url, headers=self.headers, timeout=30, verify=verify_ssl)
+
+            if response.status_code == 200:
+                return response.json()
+            elif response.status_code == 401 and self.recheck_authentication('401 from commits API'):
+                return self.get_merge_request_commits(project_id, mr_iid)
+            else:
+                logger.warning(f"Failed to get MR commits: {response.status_code}")
+                return []
+
+        except Exception as e:
+            logger.warning(f"Error getting MR commits: {e}")
+            return []
+
     def extract_java_changes(self, changes_data: Dict) -> List[Dict]:
         """Extract Java file changes from the changes data"""
         java_changes = []
@@ -754,14 +973,24 @@ class GitLabMRDocumentationGenerator:
 
         return java_changes
 
+    def filter_diff_noise(self, changes: List[Dict]) -> List[Dict]:
+        """Strip noisy hunks from the diffs before they are used in a prompt"""
+        if not self.noise_filter or not changes:
+            return changes
+
+        filtered, stats = self.noise_filter.filter_changes(changes)
+        logger.info(f"Diff noise filter: {stats.describe()}")
+        return filtered
+
     def analyze_code_changes_with_gemini(self, java_changes: List[Dict], mr_info: Dict) -> str:
         """Analyze code changes using Gemini AI"""
         try:
             if not java_changes:
-                return self.generate_fallback_documentation(mr_info, java_changes)
+                return ""
 
-            # Switch to Gemini tab
+            # Switch to Gemini tab; long chats are rotated before the prompt is entered
             self.driver.switch_to.window(self.driver.window_handles[-1])
+            self.conversation.start_turn(f"MR !{mr_info.get('iid', '?')}")
 
             # Prepare the prompt for Gemini
             prompt = self.create_gemini_prompt(java_changes, mr_info)
@@ -775,16 +1004,11 @@ class GitLabMRDocumentationGenerator:
                 ".input-area"
             ]
 
-            input_element = None
-            for selector in input_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    input_element = elements[0]
-                    break
+            input_element = self.selectors.find('gemini-input', input_selectors, timeout=10)
 
             if not input_element:
                 logger.warning("Could not find Gemini input area")
-                return self.generate_fallback_documentation(mr_info, java_changes)
+                return ""
 
             # Clear any existing text and input the prompt
             input_element.clear()
@@ -793,16 +1017,19 @@ class GitLabMRDocumentationGenerator:
             # Type the prompt in chunks to avoid issues with long text
             self.type_text_in_chunks(input_element, prompt)
 
-            # Send the message
+            # Send the message; the detector must see the turn count from before submission
+            completion = GeminiCompletionDetector(self.driver, quiet_period=GEMINI_QUIET_PERIOD)
+            completion.mark()
             self.send_gemini_message()
 
             # Wait for and get the response
-            response = self.get_gemini_response()
+            response = self.get_gemini_response(completion=completion)
+            self.conversation.finish_turn()
 
             # Switch back to GitLab tab
             self.driver.switch_to.window(self.driver.window_handles[0])
 
-            return response if response else self.generate_fallback_documentation(mr_info, java_changes)
+            return response or ""
 
         except Exception as e:
             logger.error(f"Error analyzing with Gemini: {e}")
@@ -811,7 +1038,7 @@ class GitLabMRDocumentationGenerator:
                 self.driver.switch_to.window(self.driver.window_handles[0])
             except:
                 pass
-            return self.generate_fallback_documentation(mr_info, java_changes)
+            return ""
 
     def create_gemini_prompt(self, java_changes: List[Dict], mr_info: Dict) -> str:
         """Create a comprehensive prompt for Gemini analysis"""
@@ -857,11 +1084,8 @@ Format the response in clean Markdown with proper headings and bullet points.
         return prompt
 
     def type_text_in_chunks(self, element, text: str, chunk_size: int = 500):
-        """Type text in chunks to avoid overwhelming the input"""
-        for i in range(0, len(text), chunk_size):
-            chunk = text[i:i + chunk_size]
-            element.send_keys(chunk)
-            time.sleep(0.5)  # Small delay between chunks
+        """Enter text in one round trip; chunked typing is only the last resort"""
+        PromptInjector(self.driver, chunk_size=chunk_size).inject(element, text)
 
     def send_gemini_message(self):
         """Send the message in Gemini"""
@@ -874,11 +1098,10 @@ Format the response in clean Markdown with proper headings and bullet points.
                 "button[aria-label='Send']"
             ]
 
-            for selector in send_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    elements[0].click()
-                    return
+            send_button = self.selectors.find('gemini-send', send_selectors, timeout=5, enabled=True)
+            if send_button:
+                send_button.click()
+                return
 
             # Fallback: try Enter key
             actions = ActionChains(self.driver)
@@ -889,35 +1112,30 @@ Format the response in clean Markdown with proper headings and bullet points.
             # Try simple Enter as last resort
             ActionChains(self.driver).send_keys(Keys.RETURN).perform()
 
-    def get_gemini_response(self, timeout: int = 120) -> str:
-        """Wait for and extract Gemini's response"""
+    def get_gemini_response(self, timeout: int = 120, completion: GeminiCompletionDetector = None) -> str:
+        """Wait for and extract Gemini's response to the current conversation turn"""
         try:
             logger.info("Waiting for Gemini response...")
-
-            # Wait for response to appear
             start_time = time.time()
-            while time.time() - start_time < timeout:
-                # Look for response elements
-                response_selectors = [
-                    "[data-test-id='response']",
-                    ".response-content",
-                    ".message-content",
-                    ".chat-message",
-                    "[role='presentation']"
-                ]
-
-                for selector in response_selectors:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        # Get the last (most recent) response
-                        response_element = elements[-1]
-                        response_text = response_element.text.strip()
-
-                        # Check if response is complete (not just loading)
-                        if len(response_text) > 100 and not response_text.endswith("..."):
-                            logger.info("✓ Gemini response received")
-                            return response_text
 
+            # Event-driven wait first; polling below only continues if it could not confirm completion
+            confirmed = bool(completion) and completion.wait(timeout=timeout).completed
+            deadline = start_time if confirmed else start_time + timeout
+
+            # Wait for response to appear
+            while True:
+                # Latest turn text in a single scripted call
+                turn = self.conversation.latest()
+                if turn:
+                    response_text = turn.text
+
+                    # Check if response is complete (not just loading)
+                    if len(response_text) > 100 and (confirmed or not response_text.endswith("...")):
+                        logger.info("✓ Gemini response received")
+                        return response_text
+
+                if time.time() >= deadline:
+                    break
                 time.sleep(2)  # Check every 2 seconds
 
             logger.warning("Timeout waiting for Gemini response")
@@ -944,36 +1162,59 @@ Format the response in clean Markdown with proper headings and bullet points.
         successful_mrs = 0
         failed_mrs = 0
 
-        for i, mr in enumerate(MERGE_REQUESTS, 1):
-            project_id = mr['project_id']
-            mr_iid = mr['mr_iid']
+        # Each finished MR is journaled at once, so an interrupted run loses nothing it already documented
+        journal = CheckpointJournal(CHECKPOINT_JOURNAL, resume=RESUME_FROM_JOURNAL) if CHECKPOINT_JOURNAL else None
 
-            logger.info(f"Processing MR {i}/{len(MERGE_REQUESTS)}: {project_id}/{mr_iid}")
+        try:
+            for i, mr in enumerate(MERGE_REQUESTS, 1):
+                project_id = mr['project_id']
+                mr_iid = mr['mr_iid']
+                key = f"{project_id}!{mr_iid}"
+
+                saved = journal.load_artefact(key, DOCUMENTED) if journal else None
+                if saved:
+                    logger.info(f"MR {i}/{len(MERGE_REQUESTS)}: {project_id}/{mr_iid} already documented (journal)")
+                    all_documentation.append(saved['doc'])
+                    all_documentation.append("\n---\n")
+                    successful_mrs += 1
+                    continue
 
-            try:
-                doc = self.generate_documentation_for_mr(project_id, mr_iid)
+                logger.info(f"Processing MR {i}/{len(MERGE_REQUESTS)}: {project_id}/{mr_iid}")
 
-                if doc.startswith("Error"):
-                    logger.error(f"Failed to process MR {project_id}/{mr_iid}: {doc}")
-                    all_documentation.append(f"## MR {project_id}/{mr_iid} - FAILED")
-                    all_documentation.append(f"**Error:** {doc}")
-                    failed_mrs += 1
-                else:
-                    all_documentation.append(doc)
-                    successful_mrs += 1
-                    logger.info(f"✓ Successfully processed MR {project_id}/{mr_iid}")
+                try:
+                    doc = self.generate_documentation_for_mr(project_id, mr_iid)
+
+                    if doc.startswith("Error"):
+                        logger.error(f"Failed to process MR {project_id}/{mr_iid}: {doc}")
+                        all_documentation.append(f"## MR {project_id}/{mr_iid} - FAILED")
+                        all_documentation.append(f"**Error:** {doc}")
+                        failed_mrs += 1
+                        if journal:
+                            journal.record(key, FAILED, reason=doc)
+                    else:
+                        all_documentation.append(doc)
+                        successful_mrs += 1
+                        logger.info(f"✓ Successfully processed MR {project_id}/{mr_iid}")
+                        if journal:
+                            path = journal.save_artefact(key, DOCUMENTED, {'doc': doc})
+                            journal.record(key, DOCUMENTED, path=str(path))
 
-                all_documentation.append("\n---\n")
+                    all_documentation.append("\n---\n")
 
-                # Small delay between MRs to avoid rate limiting
-                time.sleep(2)
+                    # Small delay between MRs to avoid rate limiting
+                    time.sleep(2)
 
-            except Exception as e:
-                logger.error(f"Unexpected error processing MR {project_id}/{mr_iid}: {e}")
-                all_documentation.append(f"## MR {project_id}/{mr_iid} - ERROR")
-                all_documentation.append(f"**Unexpected Error:** {str(e)}")
-                all_documentation.append("\n---\n")
-                failed_mrs += 1
+                except Exception as e:
+                    logger.error(f"Unexpected error processing MR {project_id}/{mr_iid}: {e}")
+                    all_documentation.append(f"## MR {project_id}/{mr_iid} - ERROR")
+                    all_documentation.append(f"**Unexpected Error:** {str(e)}")
+                    all_documentation.append("\n---\n")
+                    failed_mrs += 1
+                    if journal:
+                        journal.record(key, FAILED, reason=str(e))
+        finally:
+            if journal:
+                journal.close()
 
         # Add summary
         summary = f"""
@@ -1009,6 +1250,15 @@ Format the response in clean Markdown with proper headings and bullet points.
     def cleanup(self):
         """Clean up resources"""
         try:
+            if hasattr(self, 'selectors'):
+                self.selectors.save()
+            if hasattr(self, 'resources'):
+                self.resources.log_summary()
+            if hasattr(self, 'conversation'):
+                self.conversation.log_summary()
+            if hasattr(self, 'cookie_bridge'):
+                self.cookie_bridge.close()
+            log_trace_summary()
             if hasattr(self, 'driver'):
                 self.driver.quit()
             logger.info("✓ Resources cleaned up")
@@ -171,8 +171,9 @@ logger.warning("⚠️  Could not locate Gemini input area reliably")
                 logger.warning("Gemini interface not ready, using fallback analysis")
                 return self.generate_fallback_analysis(mr_data, changes)
 
-            # Switch to Gemini tab
+            # Switch to Gemini tab; long chats are rotated before the prompt is entered
             self.driver.switch_to.window(self.driver.window_handles[-1])
+            self.conversation.start_turn(f"MR !{mr_data.get('iid', '?')}")
             
             # Prepare enhanced prompt
             prompt = self.create_enhanced_analysis_prompt(mr_data, changes)
@@ -185,12 +186,7 @@ logger.warning("⚠️  Could not locate Gemini input area reliably")
                 ".ProseMirror"
             ]
             
-            input_element = None
-            for selector in input_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    input_element = elements[0]
-                    break
+            input_element = self.selectors.find('gemini-input', input_selectors, timeout=10)
             
             if not input_element:
                 logger.warning("Could not find Gemini input element")
@@ -198,20 +194,30 @@ logger.warning("⚠️  Could not locate Gemini input area reliably")
             
             # Clear any existing content and send prompt
             input_element.click()
-            time.sleep(1)
             
-            # Use JavaScript to set content for better reliability
-            self.driver.execute_script("arguments[0].innerHTML = arguments[1];", input_element, prompt)
-            time.sleep(2)
+            # Editor-aware insertion fires the input events that innerHTML skipped
+            PromptInjector(self.driver).inject(input_element, prompt)
             
-            # Send the message
+            # Send the message; responses are only read from turns after this one
             input_element.send_keys(Keys.RETURN)
             
-            # Wait for response
+            # Wait for response; the sectioned protocol tells us when it is complete
             logger.info("Waiting for Gemini response...")
-            time.sleep(10)
+            protocol = SectionedResponseProtocol(ANALYSIS_SECTIONS)
+            parser = self.wait_for_sectioned_response(protocol.parser())
+            
+            if parser.sections:
+                missing = parser.missing()
+                if missing:
+                    logger.info(f"Re-requesting missing sections: {', '.join(missing)}")
+                    followup = IncrementalResponseParser(missing)
+                    if self.submit_gemini_prompt(protocol.followup_prompt(missing)):
+                        parser.merge(self.wait_for_sectioned_response(followup))
+                
+                logger.info(f"✅ Received {len(parser.sections)}/{len(ANALYSIS_SECTIONS)} analysis sections from Gemini")
+                return protocol.render_markdown(parser.sections)
             
-            # Try to extract the response
+            # Gemini ignored the protocol; fall back to plain extraction
             response = self.extract_gemini_response()
             
             if response and len(response.strip()) > 100:
@@ -225,6 +231,35 @@ logger.warning("⚠️  Could not locate Gemini input area reliably")
             logger.error(f"Error with Gemini analysis: {e}")
             return self.generate_fallback_analysis(mr_data, changes)
 
+    def submit_gemini_prompt(self, prompt: str) -> bool:
+        """Type a follow-up prompt into the current Gemini conversation and send it"""
+        elements = self.driver.find_elements(By.CSS_SELECTOR, "div[contenteditable='true'], [role='textbox']")
+        if not elements:
+            logger.warning("Could not find Gemini input element for follow-up")
+            return False
+        
+        elements[0].click()
+        PromptInjector(self.driver).inject(elements[0], prompt)
+        # Follow-ups refer to the previous answer, so they never rotate the chat
+        self.conversation.start_turn('follow-up', allow_rotation=False)
+        elements[0].send_keys(Keys.RETURN)
+        return True
+
+    def wait_for_sectioned_response(self, parser: IncrementalResponseParser,
+                                    timeout: int = GEMINI_RESPONSE_TIMEOUT) -> IncrementalResponseParser:
+        """Poll the latest response until every section or the end marker has arrived"""
+        start_time = time.time()
+        
+        while time.time() - start_time < timeout:
+            parser.feed(self.extract_gemini_response(wait=False))
+            if parser.is_finished:
+                break
+            time.sleep(2)
+        else:
+            logger.warning(f"Timed out waiting for sections: {', '.join(parser.missing())}")
+        
+        return parser
+
     def create_enhanced_analysis_prompt(self, mr_data: Dict, changes: List[Dict]) -> str:
         """Create an enhanced prompt for Gemini analysis"""
         
@@ -255,6 +290,8 @@ Please analyze this GitLab Merge Request and provide comprehensive technical doc
 8. **Code Quality**: Overall code quality assessment
 
 Please provide detailed, professional documentation suitable for technical stakeholders.
+
+{SectionedResponseProtocol(ANALYSIS_SECTIONS).instructions()}
 """
         
         return prompt.strip()
@@ -288,32 +325,26 @@ Please provide detailed, professional documentation suitable for technical stake
         
         return "\n".join(summary_parts) if summary_parts else "No categorized changes found"
 
-    def extract_gemini_response(self) -> str:
+    def extract_gemini_response(self, wait: bool = True) -> str:
         """Extract response from Gemini interface"""
         try:
             # Wait a bit more for content to load
-            time.sleep(5)
-            
-            # Try multiple selectors for response content
-            response_selectors = [
-                ".response-container",
-                ".message-content",
-                "[data-test-id='response']",
-                ".chat-message",
-                ".model-response"
-            ]
+            if wait:
+                wait_until(self.driver, network_idle(), timeout=5, label='gemini response settle')
             
-            for selector in response_selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    # Get the last (most recent) response
-                    response_text = elements[-1].text.strip()
-                    if len(response_text) > 50:  # Reasonable response length
-                        return response_text
+            # Latest turn after the submitted prompt, fetched in one scripted call
+            turn = self.conversation.latest()
+            if turn and len(turn.text) > 50:  # Reasonable response length
+                return turn.text
             
             # Fallback: get all text from body and try to extract response
             page_text = self.driver.find_element(By.TAG_NAME, "body").text
             
+            # Sectioned responses mark exactly where the answer starts
+            start = locate_response_start(page_text)
+            if start >= 0:
+                return page_text[start:]
+            
             # Look for response patterns (this is quite basic)
             lines = page_text.split('\n')
             response_lines = []
@@ -339,9 +370,10 @@ Please provide detailed, professional documentation suitable for technical stake
             return ""
 
     def generate_fallback_analysis(self, mr_data: Dict, changes: List[Dict]) -> str:
-        """Generate fallback analysis when Gemini is not available"""
+        """Generate fallback analysis with the local extractive summariser when Gemini is not available"""
         
         change_summary = self.summarize_changes(changes)
+        summary = self.local_summarizer.analyze(AnalysisRequest.from_mr_info(mr_data, changes))
         
         # Count changes by type
         total_files = len(changes)
@@ -357,10 +389,8 @@ Please provide detailed, professional documentation suitable for technical stake
         analysis = f"""
 # Technical Analysis: {mr_data.get('title', 'Merge Request')}
 
-## Executive Summary
-This merge request contains {total_files} file changes affecting multiple components of the application.
-
 ## Change Overview
+- **Files Changed**: {total_files}
 - **Files Added**: {added_files}
 - **Files Modified**: {modified_files}
 - **Files Deleted**: {deleted_files}
@@ -369,6 +399,8 @@ This merge request contains {total_files} file changes affecting multiple compon
 ## File Changes by Category
 {change_summary}
 
+{summary}
+
 ## Technical Impact
 Based on the file changes, this merge request appears to involve:
 """
@@ -385,21 +417,10 @@ Based on the file changes, this merge request appears to involve:
         if 'test' in categories:
             analysis += "\n- **Test Changes**: Test suite modifications"
         
-        analysis += f"""
-
-## Deployment Considerations
-- Review all configuration changes before deployment
-- Ensure proper testing of modified components
-- Consider database migration requirements if applicable
-
-## Recommended Testing
-- Unit tests for modified business logic
-- Integration tests for API changes
-- UI testing for frontend modifications
-- End-to-end testing for critical user workflows
+        analysis += """
 
 ---
-*Analysis generated automatically. Please review code changes for complete understanding.*
+*Analysis generated automatically from the MR description and the diff structure. Please review code changes for complete understanding.*
 """
         
         return analysis.strip()
@@ -528,6 +549,14 @@ This document contains detailed analysis of {len(merge_requests)} merge request(
     def cleanup(self):
         """Clean up resources"""
         try:
+            if hasattr(self, 'selectors'):
+                self.selectors.save()
+            if hasattr(self, 'resources'):
+                self.resources.log_summary()
+            if hasattr(self, 'conversation'):
+                self.conversation.finish_turn()
+                self.conversation.log_summary()
+            log_trace_summary()
             if hasattr(self, 'driver'):
                 self.driver.quit()
                 logger.info("Browser driver closed")
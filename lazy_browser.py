@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Lazy Browser Startup
+Wraps WebDriver creation so Chrome only starts the first time a
+browser-only step touches the driver. Token-only runs (GitLab API plus
+local documentation) never pay for a browser launch. Startup cost is
+measured and logged for both cases, so the saving is visible per run
+"""
+
+import time
+import logging
+import threading
+from typing import Callable, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserUnavailableError(RuntimeError):
+    """The browser could not be started"""
+
+
+class LazyBrowser:
+    """
+    Stand-in for a WebDriver that launches the real one on first use
+
+    Attribute access (driver.get, driver.execute_script, ...) starts the
+    browser and is forwarded to it. Truthiness reports whether a browser is
+    running, so "if self.driver:" guards in cleanup code never start one.
+    """
+
+    def __init__(self, factory: Callable[[], Any], name: str = 'Chrome'):
+        """
+        Args:
+            factory: Creates and returns the WebDriver (None or an exception means failure)
+            name: Used in log messages
+        """
+        self._factory = factory
+        self._name = name
+        self._driver = None
+        self._lock = threading.Lock()
+        self.failed = False
+        self.startup_time: Optional[float] = None
+        self.started_for = ''
+        self.created_at = time.time()
+
+    @property
+    def started(self) -> bool:
+        return self._driver is not None
+
+    @property
+    def instance(self):
+        """The real WebDriver (starts it if needed)"""
+        return self.start()
+
+    def start(self, reason: str = 'first use'):
+        """
+        Start the browser if it is not running yet
+
+        Raises:
+            BrowserUnavailableError: if the factory failed (now or on an earlier attempt)
+        """
+        if self._driver is not None:
+            return self._driver
+
+        with self._lock:
+            if self._driver is not None:
+                return self._driver
+            if self.failed:
+                raise BrowserUnavailableError(f"{self._name} could not be started")
+
+            logger.info(f"🚀 Starting {self._name} ({reason})...")
+            started = time.time()
+            try:
+                driver = self._factory()
+            except Exception as e:
+                logger.error(f"Failed to start {self._name}: {e}")
+                driver = None
+
+            if driver is None:
+                self.failed = True
+                raise BrowserUnavailableError(f"{self._name} could not be started")
+
+            self.startup_time = time.time() - started
+            self.started_for = reason
+            self._driver = driver
+            logger.info(f"🚀 {self._name} ready in {self.startup_time:.1f}s")
+            return driver
+
+    def available(self, reason: str = 'first use') -> bool:
+        """Start the browser if needed; False if it cannot be started"""
+        try:
+            self.start(reason)
+            return True
+        except BrowserUnavailableError:
+            return False
+
+    def quit(self):
+        """Quit the browser if it was started"""
+        if self._driver is not None:
+            driver, self._driver = self._driver, None
+            driver.quit()
+
+    def log_summary(self):
+        """Log what the browser cost this run"""
+        if self.startup_time is not None:
+            logger.info(f"🧭 {self._name} startup: {self.startup_time:.1f}s (needed for {self.started_for})")
+        elif self.failed:
+            logger.info(f"🧭 {self._name} could not be started; the run continued without it")
+        else:
+            logger.info(f"🧭 {self._name} was never started (API-only run, no browser cost)")
+
+    def __bool__(self) -> bool:
+        return self._driver is not None
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes not defined on LazyBrowser itself; private and
+        # special names must not start a browser (copy/pickle probes, half-built instances)
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.start(), name)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+HTTP Login Detection
+Decides whether the browser is signed in to GitLab from the status and
+redirect of one lightweight authenticated request (/api/v4/user) sent with
+the browser's session cookies, instead of loading a page and trying dozens
+of selectors. A redirect to /users/sign_in, a redirect off the GitLab host
+(SSO gateway) or a 401 means signed out; 200 with a user means signed in.
+Anything else is ambiguous and left to the caller's DOM checks
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlparse
+
+from cookie_bridge import CookieBridge
+
+logger = logging.getLogger(__name__)
+
+PROBE_PATH = "/api/v4/user"
+RESULT_REUSE_SECONDS = 2.0   # Back-to-back checks (login page, then session) share one request
+
+
+@dataclass
+class LoginCheck:
+    """Outcome of one login check"""
+    signed_in: Optional[bool]   # None: ambiguous, inspect the page instead
+    reason: str
+    elapsed: float
+    username: str = ''
+    checked_at: float = 0.0
+
+
+class LoginDetector:
+    """Signed-in check for the browser's GitLab session over HTTP"""
+
+    def __init__(self, bridge: CookieBridge, probe_path: str = PROBE_PATH):
+        """
+        Args:
+            bridge: Cookie bridge holding the browser's GitLab cookies
+            probe_path: Endpoint that requires authentication and answers quickly
+        """
+        self.bridge = bridge
+        self.probe_path = probe_path
+        self.last: Optional[LoginCheck] = None
+
+    def check(self, verify: Optional[bool] = None, reuse: float = RESULT_REUSE_SECONDS) -> LoginCheck:
+        """
+        Ask GitLab whether the browser session is signed in
+
+        Args:
+            verify: Verify TLS certificates (defaults to the bridge's setting)
+            reuse: Return the previous result if it is at most this many seconds old
+        """
+        if self.last and time.time() - self.last.checked_at <= reuse:
+            return self.last
+
+        started = time.time()
+        kwargs = {} if verify is None else {'verify': verify}
+        response = self.bridge.get(self.probe_path, headers={'Accept': 'application/json'}, **kwargs)
+
+        username = ''
+        if response is None:
+            if self.bridge.signed_in is False:
+                signed_in, reason = False, "sign-in redirect or 401"
+            else:
+                signed_in, reason = None, "request failed"
+        elif response.status_code == 200:
+            try:
+                username = response.json().get('username', '')
+            except (ValueError, AttributeError):
+                pass
+            signed_in, reason = (True, "200 from user endpoint") if username else (None, "200 without user")
+        elif response.is_redirect:
+            target = urlparse(response.headers.get('Location', ''))
+            if target.hostname and target.hostname != self.bridge.host:
+                signed_in, reason = False, f"redirect to {target.hostname}"
+            else:
+                signed_in, reason = None, f"redirect to {target.path or '?'}"
+        else:
+            signed_in, reason = None, f"HTTP {response.status_code}"
+
+        self.last = LoginCheck(signed_in, reason, time.time() - started, username, time.time())
+        state = {True: 'signed in', False: 'signed out', None: 'undetermined'}[signed_in]
+        logger.info(f"GitLab session check over HTTP: {state} ({reason}, {self.last.elapsed * 1000:.0f} ms)")
+        return self.last
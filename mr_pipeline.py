@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Multi-Stage MR Pipeline
+Runs merge requests through a chain of stages (fetch, analyse, Gemini,
+write), each with its own worker threads, connected by bounded queues. API
+requests, CPU analysis, the slow browser step and disk writes overlap
+instead of running strictly one after another, while a full queue blocks
+the stage feeding it, so memory stays bounded however long the MR list is.
+Every stage reports its throughput, how busy its workers were and how long
+it was held back by the next stage
+"""
+
+import time
+import queue
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import List, Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE_PER_WORKER = 2    # Default queue capacity in front of a stage, per worker of that stage
+SHUTDOWN_TIMEOUT = 10.0      # Seconds an interrupted run waits for workers to finish their current item
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """
+    One step of the pipeline
+
+    work is called as work(worker, item) with the index of the calling worker
+    (so a stage can pin per-worker resources such as a browser session) and
+    returns the item for the next stage, or None to drop it.
+    """
+    name: str
+    work: Callable[[int, Any], Any]
+    workers: int = 1
+    queue_size: Optional[int] = None          # Capacity of the queue in front of the stage
+
+
+@dataclass
+class StageStats:
+    """Activity of one stage"""
+    name: str
+    workers: int
+    queue_size: int
+    processed: int = 0
+    dropped: int = 0
+    failed: int = 0
+    busy_time: float = 0.0                    # Seconds spent in work(), summed over workers
+    blocked_time: float = 0.0                 # Seconds spent waiting for room in the next queue
+    max_queue: int = 0                        # Highest number of items waiting in front of the stage
+
+    def occupancy(self, elapsed: float) -> float:
+        """Fraction of the run the stage's workers spent working"""
+        return self.busy_time / (self.workers * elapsed) if elapsed > 0 else 0.0
+
+
+@dataclass
+class PipelineStats:
+    """Activity of one pipeline run"""
+    elapsed: float = 0.0
+    stages: List[StageStats] = field(default_factory=list)
+
+    def log(self):
+        logger.info(f"📊 Pipeline finished in {self.elapsed:.1f}s")
+        logger.info(f"   {'stage':<10} {'workers':>7} {'done':>5} {'failed':>6} {'items/s':>8} "
+                    f"{'busy':>5} {'queue':>7} {'blocked':>8}")
+        for stage in self.stages:
+            rate = stage.processed / self.elapsed if self.elapsed > 0 else 0.0
+            logger.info(f"   {stage.name:<10} {stage.workers:>7} {stage.processed:>5} {stage.failed:>6} "
+                        f"{rate:>8.2f} {stage.occupancy(self.elapsed):>5.0%} "
+                        f"{stage.max_queue:>3}/{stage.queue_size:<3} {stage.blocked_time:>7.1f}s")
+
+
+class Pipeline:
+    """Stages connected by bounded queues, each served by its own worker threads"""
+
+    def __init__(self, stages: List[Stage], on_error: Optional[Callable[[str, Any, Exception], None]] = None):
+        """
+        Args:
+            stages: Stages in processing order
+            on_error: Called as on_error(stage_name, item, exception) when work() raises;
+                      the item is dropped afterwards
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.on_error = on_error
+        self.stats = PipelineStats()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run(self, items: Iterable[Any]) -> PipelineStats:
+        """Push items through all stages and return once the last stage has finished"""
+        started = time.time()
+        queues = []
+        self.stats = PipelineStats()
+        for stage in self.stages:
+            size = stage.queue_size or max(1, stage.workers) * QUEUE_SIZE_PER_WORKER
+            queues.append(queue.Queue(maxsize=size))
+            self.stats.stages.append(StageStats(stage.name, max(1, stage.workers), size))
+        queues.append(None)   # Output of the last stage is not collected
+
+        remaining = [s.workers for s in self.stats.stages]
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for worker in range(self.stats.stages[index].workers):
+                thread = threading.Thread(target=self._worker, args=(index, worker, queues, remaining),
+                                          name=f"pipeline-{stage.name}-{worker}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        logger.info("Pipeline: " + " → ".join(f"{s.name} ×{s.workers}" for s in self.stats.stages))
+        try:
+            for item in items:
+                self._put(queues[0], item, None)
+            for _ in range(self.stats.stages[0].workers):
+                queues[0].put(_DONE)
+            for thread in threads:
+                # Short joins keep the main thread responsive to Ctrl+C
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            # Workers drain their queues without working so nothing stays blocked on a full queue
+            self._stop.set()
+            self._shutdown(queues[0], threads)
+            raise
+        finally:
+            self.stats.elapsed = time.time() - started
+
+        return self.stats
+
+    def _shutdown(self, source: queue.Queue, threads: List[threading.Thread]):
+        """Let the workers of an interrupted run exit, so the caller's cleanup does not race them"""
+        deadline = time.time() + SHUTDOWN_TIMEOUT
+        # The first stage may still wait for input; later stages are released by the usual _DONE chain
+        try:
+            for _ in range(self.stats.stages[0].workers):
+                source.put(_DONE, timeout=max(0.0, deadline - time.time()))
+        except queue.Full:
+            pass
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.time()))
+
+        busy = [thread.name for thread in threads if thread.is_alive()]
+        if busy:
+            logger.warning(f"Pipeline interrupted; {len(busy)} workers still busy after "
+                           f"{SHUTDOWN_TIMEOUT:.0f}s: {', '.join(busy)}")
+
+    def _put(self, target: queue.Queue, item: Any, stats: Optional[StageStats]):
+        started = time.time()
+        target.put(item)
+        if stats is not None:
+            waited = time.time() - started
+            with self._lock:
+                stats.blocked_time += waited
+
+    def _worker(self, index: int, worker: int, queues: List[Optional[queue.Queue]], remaining: List[int]):
+        stage = self.stages[index]
+        stats = self.stats.stages[index]
+        source, target = queues[index], queues[index + 1]
+
+        while True:
+            item = source.get()
+            if item is _DONE:
+                break
+            with self._lock:
+                stats.max_queue = max(stats.max_queue, source.qsize() + 1)
+            if self._stop.is_set():
+                continue
+
+            started = time.time()
+            try:
+                result = stage.work(worker, item)
+                outcome = 'processed' if result is not None else 'dropped'
+            except Exception as e:
+                result, outcome = None, 'failed'
+                logger.error(f"Pipeline stage '{stage.name}' failed: {e}")
+                if self.on_error:
+                    try:
+                        self.on_error(stage.name, item, e)
+                    except Exception as callback_error:
+                        logger.debug(f"Pipeline error callback failed: {callback_error}")
+
+            with self._lock:
+                stats.busy_time += time.time() - started
+                setattr(stats, outcome, getattr(stats, outcome) + 1)
+
+            if result is not None and target is not None:
+                self._put(target, result, stats)
+
+        # The last worker out of a stage tells the next stage that no more items will come
+        with self._lock:
+            remaining[index] -= 1
+            last = remaining[index] == 0
+        if last and target is not None:
+            for _ in range(self.stats.stages[index + 1].workers):
+                target.put(_DONE)
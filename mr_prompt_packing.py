@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Multi-MR Prompt Packing
+Packs several small merge requests into a single Gemini prompt with strict
+per-MR delimiters, and splits the response back into separate documents
+"""
+
+import re
+import logging
+from typing import List, Dict, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+# Packing limits
+DEFAULT_MAX_PACK_SIZE = 4          # MRs per packed prompt
+DEFAULT_MAX_PACK_CHARS = 12000     # Upper bound for the combined prompt
+SMALL_MR_MAX_FILES = 2             # MRs above these limits are never packed
+SMALL_MR_MAX_LINES = 300
+MIN_SECTION_LENGTH = 100           # Same threshold the single-MR flow uses
+
+# Delimiters use plain characters so they survive Gemini's markdown rendering
+INPUT_BEGIN = "%%MR-INPUT {mr_id} BEGIN%%"
+INPUT_END = "%%MR-INPUT {mr_id} END%%"
+DOC_BEGIN = "%%MR-DOC {mr_id} BEGIN%%"
+DOC_END = "%%MR-DOC {mr_id} END%%"
+
+_SECTION_PATTERN = re.compile(
+    r'%%MR-DOC\s+(?P<id>[\w.-]+)\s+BEGIN%%(?P<body>.*?)%%MR-DOC\s+(?P=id)\s+END%%',
+    re.DOTALL
+)
+
+
+def is_small_mr(files_changed: int, lines_changed: int,
+                max_files: int = SMALL_MR_MAX_FILES, max_lines: int = SMALL_MR_MAX_LINES) -> bool:
+    """Check whether an MR is small enough to share a prompt with others"""
+    return files_changed <= max_files and lines_changed <= max_lines
+
+
+def plan_packs(entries: List[Dict[str, Any]], max_pack_size: int = DEFAULT_MAX_PACK_SIZE,
+               max_pack_chars: int = DEFAULT_MAX_PACK_CHARS) -> List[List[Dict[str, Any]]]:
+    """
+    Group entries into packs while keeping their original order
+
+    Args:
+        entries: Dicts with at least 'id', 'prompt', 'files' and 'lines' keys
+        max_pack_size: Maximum number of MRs per pack
+        max_pack_chars: Maximum combined prompt length per pack
+
+    Returns:
+        List of packs; large MRs always end up in a pack of their own
+    """
+    packs = []
+    current = []
+    current_chars = 0
+
+    for entry in entries:
+        prompt_chars = len(entry['prompt'])
+
+        if not is_small_mr(entry['files'], entry['lines']) or prompt_chars > max_pack_chars:
+            if current:
+                packs.append(current)
+                current, current_chars = [], 0
+            packs.append([entry])
+            continue
+
+        if current and (len(current) >= max_pack_size or current_chars + prompt_chars > max_pack_chars):
+            packs.append(current)
+            current, current_chars = [], 0
+
+        current.append(entry)
+        current_chars += prompt_chars
+
+    if current:
+        packs.append(current)
+
+    return packs
+
+
+def build_packed_prompt(items: List[Tuple[str, str]]) -> str:
+    """
+    Combine several per-MR prompts into a single prompt
+
+    Args:
+        items: (mr_id, prompt) pairs; IDs must be unique and whitespace-free
+
+    Returns:
+        Prompt instructing Gemini to answer each MR inside its own delimiters
+    """
+    ids = [mr_id for mr_id, _ in items]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"Duplicate MR ids in pack: {ids}")
+
+    parts = [
+        f"You will receive {len(items)} independent merge requests. Document each one separately.",
+        "Rules:",
+        f"- Start the documentation for each merge request with the line {DOC_BEGIN.format(mr_id='<id>')}",
+        f"- End it with the line {DOC_END.format(mr_id='<id>')}",
+        "- Use the exact id given with each merge request and never combine merge requests",
+        f"- Answer all {len(items)} merge requests in the order given: {', '.join(ids)}",
+        ""
+    ]
+
+    for mr_id, prompt in items:
+        parts.append(INPUT_BEGIN.format(mr_id=mr_id))
+        parts.append(prompt.strip())
+        parts.append(INPUT_END.format(mr_id=mr_id))
+        parts.append("")
+
+    return '\n'.join(parts)
+
+
+def split_packed_response(response_text: str, expected_ids: List[str],
+                          min_length: int = MIN_SECTION_LENGTH) -> Dict[str, str]:
+    """
+    Split a packed Gemini response back into per-MR documents
+
+    Only sections that are properly closed, belong to an expected MR and meet
+    the minimum length are returned; anything else counts as missing so the
+    caller can retry that MR on its own.
+
+    Args:
+        response_text: Raw response text
+        expected_ids: IDs that were sent in the pack
+        min_length: Minimum length of a valid section
+
+    Returns:
+        Dictionary mapping MR id to its documentation
+    """
+    sections = {}
+    expected = set(expected_ids)
+
+    for match in _SECTION_PATTERN.finditer(response_text or ''):
+        mr_id = match.group('id')
+        body = match.group('body').strip()
+
+        if mr_id not in expected:
+            logger.warning(f"Ignoring section for unexpected MR id: {mr_id}")
+            continue
+        if mr_id in sections:
+            logger.warning(f"Duplicate section for MR {mr_id}, keeping the first one")
+            continue
+        if len(body) < min_length:
+            logger.warning(f"Section for MR {mr_id} is too short ({len(body)} chars)")
+            continue
+
+        sections[mr_id] = body
+
+    return sections
+
+
+def missing_ids(sections: Dict[str, str], expected_ids: List[str]) -> List[str]:
+    """Return expected MR ids without a valid section, in original order"""
+    return [mr_id for mr_id in expected_ids if mr_id not in sections]
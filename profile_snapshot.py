@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Chrome Profile Snapshots
+Copies only what the GitLab, Google and Gemini sessions need out of a full
+Chrome profile (the cookies of those hosts, local storage, the matching
+IndexedDB origins, preferences and the key that decrypts cookies) into a
+small template directory. Saved passwords, autofill data and the cookies of
+every other site stay behind. Each browser session then starts from its own clone of the
+template on tmpfs: startup no longer opens gigabytes of cache and history,
+it works while desktop Chrome holds the original profile, and parallel
+sessions never share a user-data-dir. The snapshot records the profile it
+was taken from and is re-taken when asked for a different one; clones left
+behind by runs that died are swept away at startup
+
+Usage:
+    python profile_snapshot.py create [--source DIR] [--profile Default] [--gitlab-url URL]
+    python profile_snapshot.py info
+    python profile_snapshot.py benchmark [--source DIR]   # compare Chrome startup with and without
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import logging
+import argparse
+import tempfile
+import itertools
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = Path(os.path.expanduser('~/.cache/gitlab_mr_docs/profile_snapshot'))
+SNAPSHOT_MAX_AGE = 6 * 3600     # Seconds before a snapshot is re-taken from the source profile
+CLONE_PREFIX = 'gitlab_mr_profile_'
+SNAPSHOT_META = '.snapshot.json'   # Source, profile and cookie hosts the snapshot was taken with
+
+# Relative to the user-data-dir; 'Local State' holds the cookie encryption key on Windows
+TOP_LEVEL_FILES = ['Local State']
+
+# Relative to the profile directory
+PROFILE_FILES = [
+    'Cookies', 'Network/Cookies',
+    'Preferences', 'Secure Preferences'
+]
+PROFILE_DIRS = ['Local Storage']
+INDEXED_DB_DIR = 'IndexedDB'
+DEFAULT_ORIGINS = ('gitlab', 'google.com')
+DEFAULT_COOKIE_HOSTS = ('google.com', 'gemini.google.com')   # Plus the GitLab host, see cookie_hosts()
+
+_clone_counter = itertools.count(1)
+
+
+@dataclass
+class SnapshotInfo:
+    """Result of taking a snapshot"""
+    path: Path
+    files: int
+    size_bytes: int
+    elapsed: float
+    skipped: List[str]
+
+
+def cookie_hosts(gitlab_url: Optional[str] = None) -> Tuple[str, ...]:
+    """Hosts whose cookies a snapshot keeps: Google, Gemini and the GitLab instance"""
+    host = urlparse(gitlab_url).hostname if gitlab_url else None
+    return DEFAULT_COOKIE_HOSTS + (host,) if host else DEFAULT_COOKIE_HOSTS
+
+
+def tmpfs_root() -> Path:
+    """Directory for session clones: /dev/shm when usable, the system temp dir otherwise"""
+    shm = Path('/dev/shm')
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm
+    return Path(tempfile.gettempdir())
+
+
+def _copy_database(source: Path, target: Path) -> None:
+    """Consistent copy of an SQLite file that Chrome may have open"""
+    try:
+        src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+        try:
+            dst = sqlite3.connect(str(target))
+            with dst:
+                src.backup(dst)
+            dst.close()
+        finally:
+            src.close()
+    except sqlite3.Error:
+        # Not a database, or locked exclusively (Windows): a raw copy is the best we can do
+        shutil.copy2(source, target)
+
+
+def _copy_file(source: Path, target: Path, skipped: List[str]) -> int:
+    if not source.is_file():
+        return 0
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if source.name == 'Cookies':
+            _copy_database(source, target)
+        else:
+            shutil.copy2(source, target)
+        return 1
+    except OSError as e:
+        skipped.append(f"{source.name}: {e}")
+        return 0
+
+
+def _prune_cookies(database: Path, hosts: Tuple[str, ...]) -> int:
+    """Delete the cookies of every host that is not one of hosts or below it; returns how many"""
+    def keep(host_key):
+        host = (host_key or '').lstrip('.')
+        return any(host == h or host.endswith('.' + h) for h in hosts)
+
+    conn = sqlite3.connect(str(database))
+    try:
+        conn.create_function('keep_host', 1, keep, deterministic=True)
+        with conn:
+            removed = conn.execute("DELETE FROM cookies WHERE NOT keep_host(host_key)").rowcount
+        # Deleted rows would otherwise stay readable in the file's free pages
+        conn.execute("VACUUM")
+        return removed
+    finally:
+        conn.close()
+
+
+def _copy_dir(source: Path, target: Path, skipped: List[str]) -> int:
+    copied = 0
+    for path in source.rglob('*'):
+        if path.is_file() and path.name != 'LOCK':
+            copied += _copy_file(path, target / path.relative_to(source), skipped)
+    return copied
+
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+
+
+def create_snapshot(source: str, profile: str = 'Default', snapshot_dir: Path = DEFAULT_SNAPSHOT_DIR,
+                    origins: Tuple[str, ...] = DEFAULT_ORIGINS,
+                    hosts: Tuple[str, ...] = DEFAULT_COOKIE_HOSTS) -> SnapshotInfo:
+    """
+    Copy the session state of source into snapshot_dir (replacing an older snapshot)
+
+    Args:
+        source: Chrome user-data-dir to copy from (may be in use by desktop Chrome)
+        profile: Profile directory inside source
+        snapshot_dir: Template directory to create
+        origins: Substrings of the IndexedDB origins to keep
+        hosts: Hosts whose cookies are kept (subdomains included); see cookie_hosts()
+    """
+    started = time.time()
+    source_dir = Path(source)
+    profile_dir = source_dir / profile
+    if not profile_dir.is_dir():
+        raise FileNotFoundError(f"Chrome profile not found: {profile_dir}")
+
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix='.snapshot_', dir=snapshot_dir.parent))
+    skipped: List[str] = []
+    files = 0
+
+    try:
+        for name in TOP_LEVEL_FILES:
+            files += _copy_file(source_dir / name, staging / name, skipped)
+        # Snapshots always use the default profile directory so clones need no --profile-directory
+        for name in PROFILE_FILES:
+            target = staging / 'Default' / name
+            copied = _copy_file(profile_dir / name, target, skipped)
+            if copied and target.name == 'Cookies':
+                try:
+                    removed = _prune_cookies(target, hosts)
+                    logger.debug(f"Dropped {removed} cookies of other sites from {name}")
+                except sqlite3.Error as e:
+                    # Never leave the cookies of every site in the clone
+                    target.unlink()
+                    skipped.append(f"{name}: could not filter cookies ({e})")
+                    copied = 0
+            files += copied
+        for name in PROFILE_DIRS:
+            if (profile_dir / name).is_dir():
+                files += _copy_dir(profile_dir / name, staging / 'Default' / name, skipped)
+
+        indexed_db = profile_dir / INDEXED_DB_DIR
+        if indexed_db.is_dir():
+            for origin_dir in indexed_db.iterdir():
+                if origin_dir.is_dir() and any(origin in origin_dir.name for origin in origins):
+                    files += _copy_dir(origin_dir, staging / 'Default' / INDEXED_DB_DIR / origin_dir.name, skipped)
+
+        meta = {'source': str(source_dir.resolve()), 'profile': profile, 'hosts': list(hosts),
+                'created': time.time()}
+        (staging / SNAPSHOT_META).write_text(json.dumps(meta), encoding='utf-8')
+
+        # Swap in the new snapshot in one step so clones never see a half-written template
+        if snapshot_dir.exists():
+            retired = snapshot_dir.with_name(f"{snapshot_dir.name}.old.{os.getpid()}")
+            os.replace(snapshot_dir, retired)
+            shutil.rmtree(retired, ignore_errors=True)
+        os.replace(staging, snapshot_dir)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    info = SnapshotInfo(snapshot_dir, files, _dir_size(snapshot_dir), time.time() - started, skipped)
+    logger.info(f"📸 Profile snapshot: {files} files, {info.size_bytes / 1024 / 1024:.1f} MB "
+                f"from {profile_dir} in {info.elapsed:.1f}s")
+    for item in skipped:
+        logger.warning(f"   not copied: {item}")
+    return info
+
+
+def snapshot_age(snapshot_dir: Path = DEFAULT_SNAPSHOT_DIR) -> Optional[float]:
+    """Seconds since the snapshot was taken, or None if there is none"""
+    try:
+        return time.time() - Path(snapshot_dir).stat().st_mtime
+    except OSError:
+        return None
+
+
+def snapshot_meta(snapshot_dir: Path = DEFAULT_SNAPSHOT_DIR) -> Optional[Dict]:
+    """What the snapshot was taken from, or None if unknown (missing or older format)"""
+    try:
+        return json.loads((Path(snapshot_dir) / SNAPSHOT_META).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_snapshot(source: str, profile: str = 'Default', snapshot_dir: Path = DEFAULT_SNAPSHOT_DIR,
+                    max_age: float = SNAPSHOT_MAX_AGE, hosts: Tuple[str, ...] = DEFAULT_COOKIE_HOSTS) -> Path:
+    """Snapshot directory, re-taken from source if missing, older than max_age or taken from another profile"""
+    age = snapshot_age(snapshot_dir)
+    meta = snapshot_meta(snapshot_dir)
+    wanted = {'source': str(Path(source).resolve()), 'profile': profile, 'hosts': list(hosts)}
+    mismatch = meta is not None and any(meta.get(key) != value for key, value in wanted.items())
+    if age is None or age > max_age or meta is None or mismatch:
+        if mismatch:
+            logger.info(f"📸 Profile snapshot was taken from {meta.get('source')} ({meta.get('profile')}), "
+                        f"re-taking it from {wanted['source']} ({profile})")
+        create_snapshot(source, profile, snapshot_dir, hosts=hosts)
+    else:
+        logger.info(f"📸 Using profile snapshot taken {age / 60:.0f} min ago")
+    return Path(snapshot_dir)
+
+
+def clone_snapshot(snapshot_dir: Path = DEFAULT_SNAPSHOT_DIR, root: Optional[Path] = None) -> Path:
+    """
+    Private user-data-dir for one browser session, cloned from the snapshot
+
+    tmpfs has no reflinks, but the template is only a few MB, so a plain
+    copy into memory takes milliseconds and every session gets its own
+    directory without touching the template.
+    """
+    root = Path(root) if root else tmpfs_root()
+    target = root / f"{CLONE_PREFIX}{os.getpid()}_{next(_clone_counter)}"
+    started = time.time()
+    shutil.rmtree(target, ignore_errors=True)
+    shutil.copytree(snapshot_dir, target, ignore=shutil.ignore_patterns(SNAPSHOT_META))
+    logger.debug(f"Cloned profile snapshot to {target} in {(time.time() - started) * 1000:.0f} ms")
+    return target
+
+
+def remove_clone(path: Path) -> None:
+    """Delete a session clone"""
+    if path and Path(path).name.startswith(CLONE_PREFIX):
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _process_alive(pid: int) -> bool:
+    if os.name == 'nt':
+        # os.kill() terminates the process on Windows; keep those clones, the temp dir is cleaned anyway
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def sweep_stale_clones(root: Optional[Path] = None) -> int:
+    """Delete session clones whose process is gone (crash, kill -9); returns how many"""
+    root = Path(root) if root else tmpfs_root()
+    removed = 0
+    for path in root.glob(f"{CLONE_PREFIX}*"):
+        try:
+            pid = int(path.name[len(CLONE_PREFIX):].split('_')[0])
+        except ValueError:
+            continue
+        if pid != os.getpid() and path.is_dir() and not _process_alive(pid):
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    if removed:
+        logger.info(f"🧹 Removed {removed} profile clones left behind by earlier runs")
+    return removed
+
+
+def _time_chrome_startup(user_data_dir: Path) -> float:
+    """Seconds until a Chrome session on user_data_dir is ready for commands"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument(f'--user-data-dir={user_data_dir}')
+
+    started = time.time()
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.execute_script("return 1")
+        return time.time() - started
+    finally:
+        driver.quit()
+
+
+def main():
+    """Command line interface for profile snapshots"""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    parser = argparse.ArgumentParser(description='Minimal Chrome profile snapshots for fast session startup')
+    parser.add_argument('command', choices=['create', 'info', 'benchmark'])
+    parser.add_argument('--source', help='Chrome user-data-dir to snapshot (default: ~/.config/google-chrome)')
+    parser.add_argument('--profile', default='Default', help='Profile directory inside the source')
+    parser.add_argument('--gitlab-url', help='GitLab instance whose cookies are kept besides Google and Gemini')
+    args = parser.parse_args()
+
+    source = args.source or os.path.expanduser('~/.config/google-chrome')
+    hosts = cookie_hosts(args.gitlab_url)
+
+    if args.command == 'create':
+        create_snapshot(source, args.profile, hosts=hosts)
+    elif args.command == 'info':
+        age = snapshot_age()
+        if age is None:
+            print(f"No profile snapshot in {DEFAULT_SNAPSHOT_DIR}")
+            return
+        meta = snapshot_meta() or {}
+        print(f"{DEFAULT_SNAPSHOT_DIR}: {_dir_size(DEFAULT_SNAPSHOT_DIR) / 1024 / 1024:.1f} MB, "
+              f"taken {age / 60:.0f} min ago from {meta.get('source', 'unknown')} ({meta.get('profile', '?')})")
+    else:
+        # The full profile must not be in use by desktop Chrome for this comparison
+        snapshot = ensure_snapshot(source, args.profile, hosts=hosts)
+        clone = clone_snapshot(snapshot)
+        try:
+            full = _time_chrome_startup(Path(source))
+            snap = _time_chrome_startup(clone)
+        except Exception as e:
+            print(f"Benchmark failed: {e}")
+            sys.exit(1)
+        finally:
+            remove_clone(clone)
+        print(f"Full profile:     {full:.2f}s")
+        print(f"Snapshot clone:   {snap:.2f}s ({full / snap if snap else 0:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
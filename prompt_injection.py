@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Prompt Injection Engine
+Inserts a whole prompt into the Gemini editor in one round trip using
+editor-aware methods (execCommand('insertText'), a synthetic paste event,
+CDP Input.insertText), verifies the editor content before submitting and
+falls back to chunked send_keys typing only when nothing else worked
+"""
+
+import re
+import time
+import logging
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_CHUNK_DELAY = 0.5
+# Editors turn newlines into paragraphs, so lengths are compared without whitespace
+LENGTH_TOLERANCE = 0.02
+
+_CONTENT_LENGTH_SCRIPT = """
+const el = arguments[0];
+const text = ('value' in el && (el.tagName === 'TEXTAREA' || el.tagName === 'INPUT')) ? el.value : (el.innerText || '');
+return text.replace(/\\s/g, '').length;
+"""
+
+_CLEAR_SCRIPT = """
+const el = arguments[0];
+el.focus();
+if (el.tagName === 'TEXTAREA' || el.tagName === 'INPUT') {
+    const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set;
+    setter.call(el, '');
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+} else {
+    const range = document.createRange();
+    range.selectNodeContents(el);
+    const selection = window.getSelection();
+    selection.removeAllRanges();
+    selection.addRange(range);
+    document.execCommand('delete', false);
+}
+"""
+
+_INSERT_TEXT_SCRIPT = """
+const [el, text] = arguments;
+el.focus();
+if (el.tagName === 'TEXTAREA' || el.tagName === 'INPUT') {
+    el.select();
+    if (!document.execCommand('insertText', false, text) || el.value !== text) {
+        // Native setter keeps framework-controlled inputs in sync
+        const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set;
+        setter.call(el, text);
+        el.dispatchEvent(new InputEvent('input', {bubbles: true, inputType: 'insertText', data: text}));
+    }
+    return true;
+}
+return document.execCommand('insertText', false, text);
+"""
+
+_PASTE_SCRIPT = """
+const [el, text] = arguments;
+el.focus();
+const data = new DataTransfer();
+data.setData('text/plain', text);
+const event = new ClipboardEvent('paste', {clipboardData: data, bubbles: true, cancelable: true});
+el.dispatchEvent(event);
+return event.defaultPrevented;
+"""
+
+
+@dataclass
+class InjectionResult:
+    """How a prompt was entered and whether the editor holds all of it"""
+    method: str
+    verified: bool
+    elapsed: float
+    expected_length: int
+    actual_length: int
+
+
+class PromptInjector:
+    """Enters long prompts into browser editors without per-key typing"""
+
+    def __init__(self, driver, chunk_size: int = DEFAULT_CHUNK_SIZE, chunk_delay: float = DEFAULT_CHUNK_DELAY):
+        self.driver = driver
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+
+    def inject(self, element, text: str) -> InjectionResult:
+        """
+        Replace the editor content with text
+
+        Methods are tried fastest first; each attempt starts from a cleared
+        editor and is accepted only if the editor content matches the prompt.
+        """
+        start_time = time.time()
+        expected = len(re.sub(r'\s', '', text))
+        actual = 0
+
+        for method, insert in (('insert-text', self._insert_text), ('paste', self._paste),
+                               ('cdp-insert-text', self._cdp_insert_text)):
+            try:
+                self._clear(element)
+                insert(element, text)
+                actual = self.content_length(element)
+            except Exception as e:
+                logger.debug(f"Prompt injection via {method} failed: {e}")
+                continue
+
+            if self._matches(expected, actual):
+                return self._result(method, True, start_time, expected, actual)
+            logger.debug(f"Prompt injection via {method} left {actual}/{expected} characters")
+
+        logger.warning("One-shot prompt injection failed, falling back to chunked typing")
+        try:
+            self._clear(element)
+        except Exception:
+            pass
+        self._type_in_chunks(element, text)
+        actual = self.content_length(element)
+        return self._result('chunked-typing', self._matches(expected, actual), start_time, expected, actual)
+
+    def content_length(self, element) -> int:
+        """Number of non-whitespace characters currently in the editor"""
+        return int(self.driver.execute_script(_CONTENT_LENGTH_SCRIPT, element) or 0)
+
+    def _clear(self, element):
+        self.driver.execute_script(_CLEAR_SCRIPT, element)
+
+    def _insert_text(self, element, text: str):
+        self.driver.execute_script(_INSERT_TEXT_SCRIPT, element, text)
+
+    def _paste(self, element, text: str):
+        self.driver.execute_script(_PASTE_SCRIPT, element, text)
+
+    def _cdp_insert_text(self, element, text: str):
+        if not hasattr(self.driver, 'execute_cdp_cmd'):
+            raise RuntimeError("Driver does not support CDP commands")
+        self.driver.execute_script("arguments[0].focus();", element)
+        self.driver.execute_cdp_cmd('Input.insertText', {'text': text})
+
+    def _type_in_chunks(self, element, text: str):
+        for i in range(0, len(text), self.chunk_size):
+            element.send_keys(text[i:i + self.chunk_size])
+            time.sleep(self.chunk_delay)
+
+    @staticmethod
+    def _matches(expected: int, actual: int) -> bool:
+        return abs(actual - expected) <= max(1, expected * LENGTH_TOLERANCE)
+
+    @staticmethod
+    def _result(method: str, verified: bool, start_time: float, expected: int, actual: int) -> InjectionResult:
+        result = InjectionResult(method, verified, time.time() - start_time, expected, actual)
+        level = logging.INFO if verified else logging.WARNING
+        logger.log(level, f"Prompt entered via {method} in {result.elapsed:.2f}s "
+                          f"({actual}/{expected} characters{'' if verified else ', NOT verified'})")
+        return result
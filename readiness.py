@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Browser Readiness Predicates
+Small predicates (document.readyState, network idle, element present,
+URL matches) and a wait_until() that polls them instead of sleeping for a
+fixed time. Every wait is recorded in a process-wide trace, so the time
+actually spent waiting can be reported per label at the end of a run
+"""
+
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Dict, Optional, Pattern, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10.0
+POLL_INTERVAL = 0.1
+NETWORK_IDLE_TIME = 0.5     # Seconds without new requests that count as idle
+
+GEMINI_INPUT_SELECTORS = (
+    "[data-test-id='input-area']",
+    "div[contenteditable='true']",
+    "[role='textbox']",
+    "textarea"
+)
+
+Predicate = Callable[[object], bool]
+
+
+@dataclass
+class WaitRecord:
+    """One wait_until() call"""
+    label: str
+    condition: str
+    elapsed: float
+    satisfied: bool
+    timeout: float
+
+
+_trace: List[WaitRecord] = []
+_trace_lock = threading.Lock()
+
+
+def _named(name: str, check: Callable[[object], bool]) -> Predicate:
+    check.__name__ = name
+    return check
+
+
+def document_ready(state: str = 'complete') -> Predicate:
+    """document.readyState has reached state ('interactive' also accepts 'complete')"""
+    accepted = ('interactive', 'complete') if state == 'interactive' else (state,)
+
+    def check(driver) -> bool:
+        return driver.execute_script("return document.readyState") in accepted
+
+    return _named(f"document {state}", check)
+
+
+def element_present(*selectors: str) -> Predicate:
+    """Any of the CSS selectors matches an element"""
+    combined = ", ".join(selectors)
+
+    def check(driver) -> bool:
+        return bool(driver.execute_script("return document.querySelector(arguments[0]) !== null", combined))
+
+    return _named(f"element {combined}", check)
+
+
+def url_matches(pattern: Union[str, Pattern]) -> Predicate:
+    """Current URL contains the substring or matches the compiled regex"""
+    def check(driver) -> bool:
+        url = driver.current_url
+        return bool(pattern.search(url)) if hasattr(pattern, 'search') else pattern in url
+
+    return _named(f"url {getattr(pattern, 'pattern', pattern)}", check)
+
+
+def url_changed(from_url: str) -> Predicate:
+    """The browser has navigated away from from_url"""
+    return _named("url changed", lambda driver: driver.current_url != from_url)
+
+
+def network_idle(idle_time: float = NETWORK_IDLE_TIME) -> Predicate:
+    """
+    No new network requests for idle_time seconds
+
+    Uses the page's Resource Timing entries: CDP network events are not
+    exposed through Selenium's request/response API, but every finished
+    request adds an entry, so a stable count means the network has settled.
+    """
+    state = {'count': -1, 'since': time.time()}
+
+    def check(driver) -> bool:
+        count = driver.execute_script(
+            "return document.readyState === 'complete' ? performance.getEntriesByType('resource').length : -1"
+        )
+        now = time.time()
+        if count < 0 or count != state['count']:
+            state['count'], state['since'] = count, now
+            return False
+        return now - state['since'] >= idle_time
+
+    return _named("network idle", check)
+
+
+def tab_opened(initial_count: int) -> Predicate:
+    """More browser tabs are open than initial_count"""
+    return _named("tab opened", lambda driver: len(driver.window_handles) > initial_count)
+
+
+def page_settled(idle_time: float = NETWORK_IDLE_TIME) -> Predicate:
+    """Document loaded and no new requests for idle_time seconds (covers post-load redirects and XHR)"""
+    return all_of(document_ready(), network_idle(idle_time))
+
+
+def any_of(*predicates: Predicate) -> Predicate:
+    """At least one predicate holds"""
+    return _named(" or ".join(p.__name__ for p in predicates),
+                  lambda driver: any(p(driver) for p in predicates))
+
+
+def all_of(*predicates: Predicate) -> Predicate:
+    """Every predicate holds"""
+    return _named(" and ".join(p.__name__ for p in predicates),
+                  lambda driver: all(p(driver) for p in predicates))
+
+
+def wait_until(driver, predicate: Predicate, timeout: float = DEFAULT_TIMEOUT,
+               label: Optional[str] = None, poll_interval: float = POLL_INTERVAL) -> bool:
+    """
+    Poll predicate until it holds or timeout expires
+
+    Exceptions raised by the predicate (e.g. during navigation) count as
+    "not yet". The wait is added to the timing trace either way.
+
+    Returns:
+        True if the predicate held before the timeout
+    """
+    condition = getattr(predicate, '__name__', 'condition')
+    started = time.time()
+    satisfied = False
+
+    while True:
+        try:
+            if predicate(driver):
+                satisfied = True
+                break
+        except Exception as e:
+            logger.debug(f"Readiness check '{condition}' raised: {e}")
+        if time.time() - started >= timeout:
+            break
+        time.sleep(poll_interval)
+
+    record = WaitRecord(label or condition, condition, time.time() - started, satisfied, timeout)
+    with _trace_lock:
+        _trace.append(record)
+
+    if satisfied:
+        logger.debug(f"⏱️ {record.label}: ready after {record.elapsed:.2f}s")
+    else:
+        logger.debug(f"⏱️ {record.label}: not ready after {timeout}s ({condition})")
+    return satisfied
+
+
+def wait_trace() -> List[WaitRecord]:
+    """Copy of all recorded waits"""
+    with _trace_lock:
+        return list(_trace)
+
+
+def trace_summary() -> Dict[str, Dict[str, float]]:
+    """Per-label count, total and maximum wait time, and number of timeouts"""
+    summary: Dict[str, Dict[str, float]] = {}
+    for record in wait_trace():
+        entry = summary.setdefault(record.label, {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+        entry['count'] += 1
+        entry['total'] += record.elapsed
+        entry['max'] = max(entry['max'], record.elapsed)
+        entry['timeouts'] += 0 if record.satisfied else 1
+    return summary
+
+
+def log_trace_summary() -> None:
+    """Log how long each kind of wait actually took"""
+    summary = trace_summary()
+    if not summary:
+        return
+    total = sum(entry['total'] for entry in summary.values())
+    logger.info(f"⏱️ Readiness waits: {total:.1f}s in total")
+    for label, entry in sorted(summary.items(), key=lambda item: -item[1]['total']):
+        timeouts = f", {entry['timeouts']} timed out" if entry['timeouts'] else ""
+        logger.info(f"   {label}: {entry['count']}x, {entry['total']:.2f}s total, "
+                    f"{entry['max']:.2f}s max{timeouts}")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Streaming Response Capture
+Mirrors a Gemini response into the MR's output file while it is being
+generated, so a timeout or crash keeps whatever text already arrived. The
+file only grows (new text is appended) and can be followed with tail -f;
+a JSON sidecar (<file>.status) tells consumers whether the document is
+still streaming, complete or partial
+
+Usage:
+    python response_streaming.py [DIR]     # show the state of streamed documents
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+STREAMING = 'streaming'
+COMPLETE = 'complete'
+PARTIAL = 'partial'
+
+DEFAULT_FLUSH_INTERVAL = 1.0   # Seconds between writes while text keeps growing
+STATUS_SUFFIX = '.status'
+
+
+def status_path(path: Path) -> Path:
+    """Sidecar status file of a streamed document"""
+    path = Path(path)
+    return path.with_name(path.name + STATUS_SUFFIX)
+
+
+def read_status(path: Path) -> Optional[Dict[str, Any]]:
+    """Status of a streamed document, or None if it was not streamed"""
+    try:
+        with open(status_path(path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class StreamingResponseWriter:
+    """Writes a growing response to disk incrementally"""
+
+    def __init__(self, path: Path, budget: Optional[float] = None,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """
+        Args:
+            path: Output file of the MR documentation
+            budget: Seconds after which generation is abandoned and the partial text kept
+            flush_interval: Minimum seconds between intermediate writes
+        """
+        self.path = Path(path)
+        self.budget = budget
+        self.flush_interval = flush_interval
+        self.state = STREAMING
+        self.reason = ''
+        self.started_at = time.time()
+        self._written = ''
+        self._last_flush = 0.0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text('', encoding='utf-8')
+        self._write_status()
+
+    @property
+    def expired(self) -> bool:
+        """True once the time budget is used up"""
+        return self.budget is not None and time.time() - self.started_at >= self.budget
+
+    @property
+    def chars(self) -> int:
+        return len(self._written)
+
+    def update(self, text: str, force: bool = False) -> None:
+        """Record the response text seen so far"""
+        if not text or text == self._written:
+            return
+        if not force and time.time() - self._last_flush < self.flush_interval:
+            return
+
+        try:
+            if text.startswith(self._written):
+                # Append only the new tail so readers following the file see a continuous stream
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(text[len(self._written):])
+                    f.flush()
+            else:
+                # Earlier text was re-rendered (e.g. markdown reflowed); rewrite the file
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+            self._written = text
+            self._last_flush = time.time()
+            self._write_status()
+        except OSError as e:
+            logger.warning(f"Could not stream response to {self.path}: {e}")
+
+    def finish(self, text: Optional[str], complete: bool, reason: str = '') -> str:
+        """
+        Write the final response text and mark the document complete or partial
+
+        Returns:
+            The resulting state
+        """
+        if text:
+            self.update(text, force=True)
+        self.state = COMPLETE if complete else PARTIAL
+        self.reason = reason or ('completed' if complete else 'incomplete')
+        self._write_status()
+
+        if complete:
+            logger.info(f"Streamed {self.chars} chars to {self.path}")
+        else:
+            logger.warning(f"Kept partial response ({self.chars} chars, {self.reason}) in {self.path}")
+        return self.state
+
+    def _write_status(self):
+        status = {
+            'state': self.state,
+            'reason': self.reason,
+            'chars': self.chars,
+            'budget': self.budget,
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(),
+            'updated_at': datetime.now().isoformat()
+        }
+        target = status_path(self.path)
+        tmp_path = target.with_name(target.name + '.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(status, f, indent=2)
+            os.replace(tmp_path, target)
+        except OSError as e:
+            logger.debug(f"Could not write stream status for {self.path}: {e}")
+
+
+def main():
+    """List streamed documents in a directory with their state"""
+    directory = Path(sys.argv[1] if len(sys.argv) > 1 else 'documentation')
+    sidecars = sorted(directory.glob(f'*{STATUS_SUFFIX}'))
+    if not sidecars:
+        print(f"No streamed documents in {directory}")
+        return
+
+    for sidecar in sidecars:
+        document = sidecar.with_name(sidecar.name[:-len(STATUS_SUFFIX)])
+        status = read_status(document) or {}
+        reason = f" ({status['reason']})" if status.get('reason') else ''
+        print(f"{status.get('state', 'unknown'):<10} {status.get('chars', 0):>7} chars  "
+              f"{status.get('updated_at', '')}  {document.name}{reason}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Adaptive Selector Resolver
+Probes every CSS/XPath candidate for a UI element in a single execute_script
+call, remembers the selector that matched (per site and UI build) so it is
+tried first next time, and keeps per-selector hit/latency statistics so dead
+selectors can be pruned
+
+Usage:
+    python selector_resolver.py            # print selector statistics
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import List, Dict, Optional, Any
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(os.path.expanduser('~/.cache/gitlab_mr_docs/selectors.json'))
+POLL_INTERVAL = 0.2          # Seconds between probes while waiting for an element
+DEAD_SELECTOR_PROBES = 20    # Probes without a single hit before a selector is reported as dead
+
+_PROBE_SCRIPT = """
+const [candidates, pick, requireVisible, requireEnabled, minText] = arguments;
+const usable = el => {
+    if (requireVisible && !(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) return false;
+    if (requireEnabled && (el.disabled || el.getAttribute('aria-disabled') === 'true')) return false;
+    return true;
+};
+const timings = [];
+for (let i = 0; i < candidates.length; i++) {
+    const started = performance.now();
+    let nodes = [];
+    try {
+        const sel = candidates[i];
+        if (sel.startsWith('/') || sel.startsWith('(')) {
+            const snapshot = document.evaluate(sel, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (let j = 0; j < snapshot.snapshotLength; j++) nodes.push(snapshot.snapshotItem(j));
+        } else {
+            nodes = Array.from(document.querySelectorAll(sel));
+        }
+    } catch (e) {
+        nodes = [];
+    }
+    nodes = nodes.filter(usable);
+    timings.push(performance.now() - started);
+    if (nodes.length) {
+        const el = pick === 'last' ? nodes[nodes.length - 1] : nodes[0];
+        // Too little text (e.g. a placeholder still loading): fall through to the next candidate
+        if (minText && (el.innerText || el.textContent || '').trim().length <= minText) continue;
+        return [i, el, timings];
+    }
+}
+return [-1, null, timings];
+"""
+
+_UI_VERSION_SCRIPT = """
+return Array.from(document.scripts).map(s => s.src).filter(Boolean).slice(0, 5).join('|');
+"""
+
+
+class SelectorResolver:
+    """Finds UI elements from a list of candidate selectors with one round trip per probe"""
+
+    _file_lock = threading.Lock()
+
+    def __init__(self, driver, cache_path: Path = DEFAULT_CACHE_PATH):
+        self.driver = driver
+        self.cache_path = Path(cache_path)
+        self.cache = self._load()
+        self._ui_versions: Dict[str, str] = {}
+        # Changes since the last save, merged into the file so parallel sessions keep each other's
+        self._pending_selectors: Dict[tuple, str] = {}             # (site, ui version, role) -> selector
+        self._pending_stats: Dict[tuple, Dict[str, float]] = {}    # (site, role, selector) -> counter deltas
+
+    def find(self, role: str, candidates: List[str], timeout: float = 10, pick: str = 'first',
+             visible: bool = True, enabled: bool = False, min_text_length: int = 0):
+        """
+        Return the first element matched by any candidate, or None
+
+        Args:
+            role: Stable name of the element (e.g. 'gemini-input'); keys the cache
+            candidates: CSS selectors or XPath expressions (starting with '/' or '(')
+            timeout: Seconds to keep probing while nothing matches
+            pick: 'first' or 'last' matching element (e.g. the latest response)
+            visible: Ignore hidden elements
+            enabled: Ignore disabled elements (for buttons)
+            min_text_length: Skip a candidate whose picked element has no more text than this
+        """
+        site = self._site()
+        remembered = self._remembered(site, role)
+        ordered = ([remembered] if remembered in candidates else []) + [c for c in candidates if c != remembered]
+
+        start_time = time.time()
+        while True:
+            try:
+                index, element, timings = self.driver.execute_script(
+                    _PROBE_SCRIPT, ordered, pick, visible, enabled, min_text_length)
+            except Exception as e:
+                logger.debug(f"Selector probe for {role} failed: {e}")
+                index, element, timings = -1, None, []
+
+            if index >= 0:
+                self._record(site, role, ordered, index, timings)
+                winner = ordered[index]
+                if winner != remembered:
+                    logger.info(f"Selector for {role} on {site}: {winner}")
+                    self._remember(site, role, winner)
+                return element
+
+            if time.time() - start_time >= timeout:
+                self._record(site, role, ordered, index, timings)
+                logger.warning(f"No selector matched {role} on {site} within {timeout}s")
+                return None
+            time.sleep(POLL_INTERVAL)
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Per-site, per-role selector statistics with average latency in ms"""
+        report = {}
+        for site, entry in self.cache.items():
+            for role, selectors in entry.get('stats', {}).items():
+                for selector, counters in selectors.items():
+                    probes = counters.get('probes', 0)
+                    report.setdefault(site, {}).setdefault(role, {})[selector] = {
+                        'hits': counters.get('hits', 0),
+                        'probes': probes,
+                        'avg_ms': round(counters.get('total_ms', 0.0) / probes, 3) if probes else 0.0,
+                        'dead': probes >= DEAD_SELECTOR_PROBES and not counters.get('hits', 0)
+                    }
+        return report
+
+    def save(self) -> None:
+        """
+        Persist remembered selectors and statistics
+
+        The file is re-read and this resolver's changes since the last save are
+        merged into it, so resolvers of other sessions do not lose theirs.
+        """
+        with self._file_lock:
+            merged = self._load()
+            for (site, version, role), selector in self._pending_selectors.items():
+                merged.setdefault(site, {}).setdefault('versions', {}).setdefault(version, {})[role] = selector
+            for (site, role, selector), delta in self._pending_stats.items():
+                counters = merged.setdefault(site, {}).setdefault('stats', {}).setdefault(role, {}).setdefault(
+                    selector, {'hits': 0, 'probes': 0, 'total_ms': 0.0})
+                for name, value in delta.items():
+                    counters[name] = round(counters.get(name, 0) + value, 3)
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.cache_path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(merged, f, indent=2)
+                os.replace(tmp_path, self.cache_path)
+            except OSError as e:
+                logger.warning(f"Could not save selector cache: {e}")
+                return
+            self.cache = merged
+            self._pending_selectors.clear()
+            self._pending_stats.clear()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _site(self) -> str:
+        try:
+            return urlparse(self.driver.current_url).netloc or 'unknown'
+        except Exception:
+            return 'unknown'
+
+    def _ui_version(self, site: str) -> str:
+        """Fingerprint of the page's script bundles; changes when the UI is redeployed"""
+        if site not in self._ui_versions:
+            try:
+                scripts = self.driver.execute_script(_UI_VERSION_SCRIPT) or ''
+            except Exception:
+                scripts = ''
+            self._ui_versions[site] = hashlib.sha1(scripts.encode('utf-8')).hexdigest()[:12] if scripts else 'default'
+        return self._ui_versions[site]
+
+    def _remembered(self, site: str, role: str) -> Optional[str]:
+        versions = self.cache.get(site, {}).get('versions', {})
+        return versions.get(self._ui_version(site), {}).get(role)
+
+    def _remember(self, site: str, role: str, selector: str):
+        version = self._ui_version(site)
+        self.cache.setdefault(site, {}).setdefault('versions', {}).setdefault(version, {})[role] = selector
+        self._pending_selectors[(site, version, role)] = selector
+        self.save()
+
+    def _record(self, site: str, role: str, ordered: List[str], index: int, timings: List[float]):
+        role_stats = self.cache.setdefault(site, {}).setdefault('stats', {}).setdefault(role, {})
+        for position, elapsed in enumerate(timings):
+            counters = role_stats.setdefault(ordered[position], {'hits': 0, 'probes': 0, 'total_ms': 0.0})
+            delta = self._pending_stats.setdefault((site, role, ordered[position]),
+                                                   {'hits': 0, 'probes': 0, 'total_ms': 0.0})
+            hit = 1 if position == index else 0
+            counters['probes'] += 1
+            counters['total_ms'] = round(counters['total_ms'] + float(elapsed), 3)
+            counters['hits'] += hit
+            delta['probes'] += 1
+            delta['total_ms'] += float(elapsed)
+            delta['hits'] += hit
+
+
+def main():
+    """Print selector statistics and flag dead selectors"""
+    resolver = SelectorResolver(driver=None)
+    report = resolver.stats()
+    if not report:
+        print(f"No selector statistics in {resolver.cache_path}")
+        return
+
+    for site, roles in report.items():
+        print(f"\n{site}")
+        for role, selectors in roles.items():
+            print(f"  {role}")
+            for selector, counters in sorted(selectors.items(), key=lambda item: -item[1]['hits']):
+                flag = '  [dead]' if counters['dead'] else ''
+                print(f"    {counters['hits']:>5}/{counters['probes']:<5} {counters['avg_ms']:>7.3f} ms  {selector}{flag}")
+
+
+if __name__ == "__main__":
+    main()
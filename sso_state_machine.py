@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Declarative SSO Login State Machine
+Identity providers are described as data: the URLs they live on and the
+login states they show (each recognised by the elements visible on the
+page, with the fields to fill and the button that submits it). One engine
+observes the page, performs whatever state is showing and waits for the
+page to move on - driven by readiness events instead of sleeps - until the
+browser leaves the provider. Every step is timed. Supporting another IdP
+means adding an SSOProvider entry, not another handler method
+"""
+
+import re
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from readiness import wait_until, page_settled, POLL_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+STEP_TIMEOUT = 15.0      # Seconds to wait for the next state after a submit
+MANUAL_TIMEOUT = 180.0   # Seconds allowed for steps the user completes (MFA prompts)
+MAX_STEPS = 10
+MAX_REPEATS = 2          # Times the same state may reappear before the login counts as stuck
+
+# Host and path words of identity-provider pages the providers below do not model; the query
+# string is never looked at, since it routinely names the page the login returns to
+IDP_URL_HINTS = ('sso', 'saml', 'adfs', 'oauth', 'federation', 'ping')
+IDP_HOSTS = ('auth0.com', 'onelogin.com', 'pingidentity.com', 'pingone.com')
+
+EMAIL = 'email'
+PASSWORD = 'password'
+
+
+@dataclass(frozen=True)
+class LoginState:
+    """One screen of a provider's login flow"""
+    name: str
+    detect: Tuple[str, ...]                                # CSS; the state is showing when any matches a visible element
+    fill: Tuple[Tuple[Tuple[str, ...], str], ...] = ()     # (field selectors, credential key)
+    submit: Tuple[str, ...] = ()                           # CSS of the button; Enter in the last field otherwise
+    keep_prefilled: bool = False                           # Leave fields alone that already hold a value
+    manual: bool = False                                   # The user completes this state (MFA, number matching)
+
+
+@dataclass(frozen=True)
+class SSOProvider:
+    """An identity provider: where it lives and the states its login shows, most specific first"""
+    name: str
+    url_patterns: Tuple[str, ...]                          # Empty: matches any page (generic fallback)
+    states: Tuple[LoginState, ...]
+    errors: Tuple[str, ...] = ()                           # CSS of visible error messages
+
+
+MICROSOFT = SSOProvider(
+    name='microsoft',
+    url_patterns=('login.microsoftonline.com', 'login.live.com'),
+    states=(
+        LoginState('mfa', ("#idDiv_SAOTCAS_Title", "#idDiv_SAOTCC_Title", "#idRichContext_DisplaySign"), manual=True),
+        LoginState('stay signed in', ("#KmsiCheckboxField", "#KmsiDescription"), submit=("#idSIButton9",)),
+        LoginState('password', ("input[name='passwd']", "#i0118"),
+                   fill=((("input[name='passwd']", "#i0118"), PASSWORD),), submit=("#idSIButton9",)),
+        LoginState('email', ("input[name='loginfmt']", "#i0116"),
+                   fill=((("input[name='loginfmt']", "#i0116"), EMAIL),), submit=("#idSIButton9",),
+                   keep_prefilled=True),
+    ),
+    errors=("#usernameError", "#passwordError", "#idTD_Error")
+)
+
+OKTA = SSOProvider(
+    name='okta',
+    url_patterns=('okta.com', 'oktapreview.com'),
+    states=(
+        LoginState('mfa', ("[data-se='factor-push']", "[data-se='okta_verify-push']",
+                           "input[name='credentials.passcode'][autocomplete='one-time-code']"), manual=True),
+        LoginState('password', ("input[name='credentials.passcode']",),
+                   fill=((("input[name='credentials.passcode']",), PASSWORD),),
+                   submit=("input[type='submit']", "button[type='submit']")),
+        LoginState('credentials', ("#okta-signin-username", "input[name='identifier']", "input[name='username']"),
+                   fill=((("#okta-signin-username", "input[name='identifier']", "input[name='username']"), EMAIL),
+                         (("#okta-signin-password", "input[name='password']"), PASSWORD)),
+                   submit=("#okta-signin-submit", "input[type='submit']", "button[type='submit']")),
+    ),
+    errors=(".o-form-error-container [role='alert']", ".okta-form-infobox-error")
+)
+
+GOOGLE = SSOProvider(
+    name='google',
+    url_patterns=('accounts.google.com',),
+    states=(
+        LoginState('password', ("input[name='Passwd']", "#password input[type='password']"),
+                   fill=((("input[name='Passwd']", "#password input[type='password']"), PASSWORD),),
+                   submit=("#passwordNext button", "#passwordNext")),
+        LoginState('email', ("#identifierId",),
+                   fill=((("#identifierId",), EMAIL),), submit=("#identifierNext button", "#identifierNext"),
+                   keep_prefilled=True),
+    ),
+    errors=("[aria-live='assertive'] [jsname='B34EJ']",)
+)
+
+GENERIC = SSOProvider(
+    name='generic',
+    url_patterns=(),
+    states=(
+        LoginState('credentials', ("input[type='password']",),
+                   fill=((("input[type='email']", "input[name='username']", "input[name='email']",
+                           "input[type='text']"), EMAIL),
+                         (("input[type='password']",), PASSWORD)),
+                   submit=("button[type='submit']", "input[type='submit']"), keep_prefilled=True),
+        LoginState('username', ("input[type='email']", "input[name='username']", "input[name='email']"),
+                   fill=((("input[type='email']", "input[name='username']", "input[name='email']"), EMAIL),),
+                   submit=("button[type='submit']", "input[type='submit']"), keep_prefilled=True),
+    )
+)
+
+PROVIDERS = [MICROSOFT, OKTA, GOOGLE, GENERIC]
+
+def url_matches(url: str, pattern: str) -> bool:
+    """
+    Whether url is on pattern's host (or a subdomain of it) and below its path
+
+    pattern is a host with an optional path prefix, e.g. 'okta.com' or
+    'accounts.google.com/manageaccount'; the query string is ignored.
+    """
+    host, _, path = pattern.lower().partition('/')
+    parsed = urlparse(url.lower())
+    hostname = parsed.hostname or ''
+    if hostname != host and not hostname.endswith('.' + host):
+        return False
+    return not path or parsed.path.lstrip('/').startswith(path)
+
+
+def _url_words(url: str) -> List[str]:
+    parsed = urlparse(url.lower())
+    return [word for word in re.split(r'[^a-z0-9]+', f"{parsed.hostname or ''}/{parsed.path}") if word]
+
+
+_OBSERVE_SCRIPT = """
+const [urlPatterns, errors, states] = arguments;
+const visible = el => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+const any = selectors => selectors.some(sel => {
+    try { return Array.from(document.querySelectorAll(sel)).some(visible); } catch (e) { return false; }
+});
+const host = location.hostname.toLowerCase();
+const path = location.pathname.toLowerCase().replace(/^[/]+/, '');
+const onPattern = p => {
+    const [h, ...rest] = p.split('/');
+    return (host === h || host.endsWith('.' + h)) && path.startsWith(rest.join('/'));
+};
+if (urlPatterns.length && !urlPatterns.some(onPattern)) return ['left', location.href];
+for (const sel of errors) {
+    let el = null;
+    try { el = Array.from(document.querySelectorAll(sel)).find(e => visible(e) && e.innerText.trim()); } catch (e) {}
+    if (el) return ['error', el.innerText.trim().slice(0, 200)];
+}
+for (const [name, selectors] of states) {
+    if (any(selectors)) return ['state', name];
+}
+return null;
+"""
+
+_FIND_SCRIPT = """
+for (const sel of arguments[0]) {
+    let el = null;
+    try {
+        el = Array.from(document.querySelectorAll(sel)).find(
+            e => (e.offsetWidth || e.offsetHeight || e.getClientRects().length) && !e.disabled);
+    } catch (e) {}
+    if (el) return el;
+}
+return null;
+"""
+
+
+@dataclass
+class StepTiming:
+    """One state handled by the machine"""
+    state: str
+    elapsed: float
+    outcome: str
+
+
+@dataclass
+class LoginResult:
+    success: bool
+    provider: str
+    reason: str
+    elapsed: float = 0.0
+    steps: List[StepTiming] = field(default_factory=list)
+    needs_user: bool = False    # Stopped on a provider page it does not model (e.g. a 2-step challenge)
+
+
+class SSOLoginMachine:
+    """Drives a provider's login states until the browser leaves the provider"""
+
+    def __init__(self, driver, credentials: Dict[str, str], providers: Optional[List[SSOProvider]] = None,
+                 step_timeout: float = STEP_TIMEOUT, manual_timeout: float = MANUAL_TIMEOUT,
+                 destinations: Tuple[str, ...] = ()):
+        """
+        Args:
+            driver: Selenium WebDriver on the provider's login page
+            credentials: Values for the credential keys used by states (EMAIL, PASSWORD)
+            providers: Providers to recognise, most specific first (defaults to PROVIDERS)
+            destinations: Hosts, optionally with a path prefix (e.g. the GitLab host), that mean
+                          the login is complete; see url_matches()
+            step_timeout: Seconds to wait for the page to move on after a submit
+            manual_timeout: Seconds to wait for a manual state to be completed
+        """
+        self.driver = driver
+        self.credentials = credentials
+        self.providers = providers or PROVIDERS
+        self.step_timeout = step_timeout
+        self.manual_timeout = manual_timeout
+        self.destinations = tuple(d.lower() for d in destinations)
+
+    def identify(self, url: Optional[str] = None) -> Optional[SSOProvider]:
+        """Provider whose URL patterns match url or the current page (the generic provider matches any)"""
+        url = url or self.driver.current_url
+        for provider in self.providers:
+            if not provider.url_patterns or any(url_matches(url, pattern) for pattern in provider.url_patterns):
+                return provider
+        return None
+
+    def reached_destination(self, url: str) -> bool:
+        return any(url_matches(url, destination) for destination in self.destinations)
+
+    def is_provider_page(self, url: str) -> bool:
+        """Whether url belongs to a modelled provider or looks like an unmodelled identity provider"""
+        if any(url_matches(url, pattern) for provider in self.providers for pattern in provider.url_patterns):
+            return True
+        if any(url_matches(url, host) for host in IDP_HOSTS):
+            return True
+        # 'saml2', 'oauth2', 'ssologin', 'pingfederate' count as well
+        return any(word.startswith(hint) for word in _url_words(url) for hint in IDP_URL_HINTS)
+
+    def _handover(self, url: str, current: SSOProvider) -> Optional[SSOProvider]:
+        """Provider that took over the login at url, or None"""
+        if not self.is_provider_page(url):
+            return None
+        provider = self.identify(url)
+        return provider if provider is not current else None
+
+    def observe(self, provider: SSOProvider) -> Optional[Tuple[str, str]]:
+        """
+        What the page currently shows: ('state', name), ('error', message),
+        ('left', url) once the browser has left the provider, or None
+        """
+        states = [[state.name, list(state.detect)] for state in provider.states]
+        try:
+            event = self.driver.execute_script(_OBSERVE_SCRIPT, list(provider.url_patterns),
+                                               list(provider.errors), states)
+        except Exception as e:
+            logger.debug(f"SSO page observation failed: {e}")
+            return None
+        return tuple(event) if event else None
+
+    def run(self, provider: Optional[SSOProvider] = None) -> LoginResult:
+        """
+        Log in through provider (identified from the URL if not given)
+
+        The login succeeds only on a destination page, or on a page outside
+        every identity provider after at least one step was performed. When a
+        provider hands the browser to another one (Google to the corporate
+        IdP), the machine continues with that provider.
+        """
+        started = time.time()
+        provider = provider or self.identify()
+        if provider is None:
+            return LoginResult(False, '', 'no matching provider')
+
+        logger.info(f"🔐 SSO login via {provider.name}")
+        result = LoginResult(False, provider.name, '')
+        seen: Dict[str, int] = {}
+
+        for _ in range(MAX_STEPS):
+            step_started = time.time()
+            url = self._current_url()
+            if self.reached_destination(url):
+                result.success, result.reason = True, f'reached {urlparse(url).hostname}'
+                break
+
+            event = self._next_event(provider, self.step_timeout, f'sso {provider.name}', settle=bool(result.steps))
+
+            if event is None or event[0] == 'left':
+                url = event[1] if event else self._current_url()
+                if self.reached_destination(url):
+                    result.success, result.reason = True, f'reached {urlparse(url).hostname}'
+                    break
+                handover = self._handover(url, provider)
+                if handover is not None:
+                    logger.info(f"   {provider.name} handed the login over to {handover.name}")
+                    provider, result.provider, seen = handover, handover.name, {}
+                    continue
+                if result.steps and not self.is_provider_page(url):
+                    result.success, result.reason = True, f'left {provider.name} for {urlparse(url).hostname}'
+                elif result.steps:
+                    # Still on the provider, showing a screen none of its states describe
+                    result.needs_user, result.reason = True, 'unrecognised login page'
+                else:
+                    result.reason = 'no login state recognised'
+                break
+
+            kind, value = event
+            if kind == 'error':
+                result.reason = f'provider error: {value}'
+                break
+
+            state = next(state for state in provider.states if state.name == value)
+            seen[state.name] = seen.get(state.name, 0) + 1
+            if seen[state.name] > MAX_REPEATS:
+                result.reason = f"stuck in '{state.name}'"
+                break
+
+            outcome = self._perform(provider, state)
+            result.steps.append(StepTiming(state.name, time.time() - step_started, outcome))
+            logger.info(f"   {provider.name} · {state.name}: {outcome} in {time.time() - step_started:.2f}s")
+        else:
+            result.reason = 'too many steps'
+
+        result.elapsed = time.time() - started
+        level = logging.INFO if result.success else logging.WARNING
+        logger.log(level, f"🔐 SSO login via {result.provider} {'finished' if result.success else 'failed'} "
+                          f"in {result.elapsed:.1f}s ({result.reason}, {len(result.steps)} steps)")
+        return result
+
+    def _current_url(self) -> str:
+        try:
+            return self.driver.current_url
+        except Exception:
+            return ''
+
+    def _next_event(self, provider: SSOProvider, timeout: float, label: str,
+                    unless: Optional[Tuple[str, str]] = None, settle: bool = False) -> Optional[Tuple[str, str]]:
+        """
+        Wait until the page shows something other than unless
+
+        With unless, the state disappearing counts as a change. With settle, a
+        page that finished loading without any recognisable state ends the wait
+        (the login has moved past the provider's screens).
+        """
+        observed = {'event': None}
+        settled = page_settled() if settle else None
+
+        def changed(driver) -> bool:
+            event = observed['event'] = self.observe(provider)
+            if event is not None:
+                return event != unless
+            if unless is not None:
+                return True
+            return settled is not None and settled(driver)
+
+        wait_until(self.driver, changed, timeout=timeout, label=label, poll_interval=POLL_INTERVAL)
+        return observed['event']
+
+    def _perform(self, provider: SSOProvider, state: LoginState) -> str:
+        """Fill and submit state, then wait until the page has moved on"""
+        current = ('state', state.name)
+
+        if state.manual:
+            logger.warning(f"Complete the {provider.name} '{state.name}' step in the browser...")
+            event = self._next_event(provider, self.manual_timeout, f'sso {provider.name} {state.name}', unless=current)
+            return 'completed by user' if event != current else 'manual step timed out'
+
+        last_field = None
+        for selectors, key in state.fill:
+            element = self.driver.execute_script(_FIND_SCRIPT, list(selectors))
+            if element is None:
+                continue
+            if state.keep_prefilled and element.get_attribute('value'):
+                last_field = element
+                continue
+            element.clear()
+            element.send_keys(self.credentials.get(key) or '')
+            last_field = element
+
+        button = self.driver.execute_script(_FIND_SCRIPT, list(state.submit)) if state.submit else None
+        if button is not None:
+            button.click()
+        elif last_field is not None:
+            last_field.send_keys('\n')
+        else:
+            return 'nothing to submit'
+
+        event = self._next_event(provider, self.step_timeout, f'sso {provider.name} {state.name}', unless=current)
+        return 'submitted' if event != current else 'submitted, page did not change'
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Startup Time Budget
+Measures how long the CLI entry points take to start (interpreter plus
+imports, measured on a --help run) and which top-level imports account for
+it, using Python's -X importtime. Heavy optional dependencies (pandas,
+selenium, BeautifulSoup) must stay out of the startup path; the check fails
+when one is imported at startup or the median startup time exceeds the budget
+
+Usage:
+    python startup_benchmark.py                       # check the default entry points
+    python startup_benchmark.py --runs 5 --budget-ms 400
+    python startup_benchmark.py "gitlab_mr_doc_generator (2).py" --top 15
+"""
+
+import re
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Tuple, Iterable
+
+DEFAULT_ENTRY_POINTS = ["gitlab_mr_doc_generator (1).py", "gitlab_mr_doc_generator (2).py"]
+DEFAULT_BUDGET_MS = 500
+DEFAULT_RUNS = 3
+HEAVY_MODULES = ('pandas', 'numpy', 'selenium', 'bs4')
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+@dataclass
+class StartupRun:
+    """One measured start of an entry point"""
+    wall_ms: float
+    imports: Dict[str, float] = field(default_factory=dict)   # Top-level module -> cumulative ms
+    returncode: int = 0
+    modules: List[str] = field(default_factory=list)          # Every module imported, nested ones included
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Cumulative import time in ms of each top-level import in -X importtime output"""
+    imports = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        # Nested imports are indented by two spaces per level below the import that triggered them
+        _, cumulative, indent, module = match.groups()
+        if len(indent) <= 1:
+            imports[module] = int(cumulative) / 1000
+    return imports
+
+
+def imported_modules(stderr: str) -> List[str]:
+    """Every module in -X importtime output, however deeply nested its import was"""
+    return [match.group(4) for match in map(_IMPORTTIME_LINE.match, stderr.splitlines()) if match]
+
+
+def measure(script: Path) -> StartupRun:
+    """Start script with --help and record wall time and top-level import costs"""
+    started = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime', str(script), '--help'],
+                             capture_output=True, text=True, cwd=script.parent)
+    wall_ms = (time.perf_counter() - started) * 1000
+    return StartupRun(wall_ms, parse_importtime(process.stderr), process.returncode,
+                      imported_modules(process.stderr))
+
+
+def heavy_imports(imports: Iterable[str]) -> List[str]:
+    """Heavy optional dependencies among the imported modules (pass all of them, not just the top level)"""
+    return sorted({name.split('.')[0] for name in imports if name.split('.')[0] in HEAVY_MODULES})
+
+
+def check_entry_point(script: Path, runs: int, budget_ms: float, top: int) -> Tuple[bool, float]:
+    """Measure script runs times, print a report and return (within budget, median ms)"""
+    results = [measure(script) for _ in range(runs)]
+    median_ms = statistics.median(r.wall_ms for r in results)
+    # Import costs of the fastest run are the least disturbed by the OS cache and other load
+    fastest = min(results, key=lambda r: r.wall_ms)
+
+    print(f"\n{script.name}")
+    print(f"   startup: median {median_ms:.0f} ms over {runs} runs "
+          f"(min {fastest.wall_ms:.0f} ms, budget {budget_ms:.0f} ms)")
+    if fastest.returncode != 0:
+        print(f"   ⚠️  --help exited with status {fastest.returncode} (missing dependency?)")
+
+    for module, ms in sorted(fastest.imports.items(), key=lambda item: -item[1])[:top]:
+        print(f"   {ms:8.1f} ms  {module}")
+
+    # A helper module importing pandas at load time shows up nested, not at the top level
+    heavy = heavy_imports(fastest.modules)
+    ok = median_ms <= budget_ms and not heavy and fastest.returncode == 0
+    if heavy:
+        print(f"   ❌ imported at startup: {', '.join(heavy)} (import them where they are used)")
+    if median_ms > budget_ms:
+        print(f"   ❌ over budget by {median_ms - budget_ms:.0f} ms")
+    elif ok:
+        print("   ✅ within budget")
+    return ok, median_ms
+
+
+def main():
+    """Command line interface for the startup budget check"""
+    parser = argparse.ArgumentParser(description='Check the startup time of the CLI entry points')
+    parser.add_argument('scripts', nargs='*', help='Entry points to check (default: the MR documentation generators)')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='Starts per entry point (median is reported)')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help='Maximum median startup time')
+    parser.add_argument('--top', type=int, default=10, help='Slowest top-level imports to list')
+    args = parser.parse_args()
+
+    here = Path(__file__).resolve().parent
+    scripts = [Path(s).resolve() for s in args.scripts] or [here / name for name in DEFAULT_ENTRY_POINTS]
+
+    failed = []
+    for script in scripts:
+        if not script.is_file():
+            print(f"\n{script}: not found")
+            failed.append(script.name)
+            continue
+        ok, _ = check_entry_point(script, max(1, args.runs), args.budget_ms, args.top)
+        if not ok:
+            failed.append(script.name)
+
+    if failed:
+        print(f"\nStartup budget exceeded: {', '.join(failed)}")
+        sys.exit(1)
+    print("\nAll entry points start within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,14 @@
-# WebDriver Troubleshooting Guide for Corporate Environments
-
-## Common Issues and Solutions
-
-### 1. ChromeDriver Installation and Path Issues
-```bash
-# Install ChromeDriver using package manager (recommended)
-pip install webdriver-manager
-
-# Or download manually from:
-# https://chromedriver.chromium.org/downloads
-```
-
-### 2. Corporate Proxy/Firewall Issues
-```python
-# Add proxy settings to Chrome options
-chrome_options.add_argument('--proxy-server=http://your-proxy:port')
-chrome_options.add_argument('--proxy-bypass-list=localhost,127.0.0.1')
-```
-
-### 3. Corporate Security Policies
-```python
-# Disable security features that might be blocked
-chrome_options.add_argument('--disable-web-security')
-chrome_options.add_argument('--disable-features=VizDisplayCompositor')
-chrome_options.add_argument('--disable-extensions')
-```
+#!/usr/bin/env python3
+"""
+Fixed GitLab MR Documentation Generator
+GitLab MR documentation generator with the WebDriver fixes for corporate
+environments (see WEBDRIVER_TROUBLESHOOTING.md): ChromeDriver resolution
+through webdriver-manager, proxy and policy-friendly Chrome options and a
+browser that only starts when a step needs it
 
-## Fixed GitLab MR Documentation Generator
+Usage:
+    python webdriver_fix.py    # edit GITLAB_URL, GITLAB_TOKEN and the test MR in main() first
+"""
 
 import requests
 import json
@@ -46,6 +28,9 @@ import sys
 from typing import List, Dict, Optional
 import logging
 
+from cdp_resource_policy import ResourcePolicyManager, LEAN_POLICY, FULL_POLICY
+from lazy_browser import LazyBrowser
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -63,16 +48,20 @@ class GitLabMRDocumentationGenerator:
         self.gitlab_url = gitlab_url.rstrip('/')
         self.private_token = private_token
         self.headers = {'PRIVATE-TOKEN': private_token}
-        self.driver = None
         self.use_headless = use_headless
         
-        # Setup Chrome driver with error handling
-        if not self.setup_chrome_driver():
-            logger.error("Failed to setup Chrome driver. Exiting...")
-            sys.exit(1)
+        # Chrome only starts when a browser step first needs it; API-only runs never launch it
+        started = time.time()
+        self.driver = LazyBrowser(self.setup_chrome_driver)
+        logger.info(f"Generator initialized in {time.time() - started:.2f}s (browser starts on demand)")
     
-    def setup_chrome_driver(self) -> bool:
-        """Setup Chrome WebDriver with improved options for corporate environments"""
+    def setup_chrome_driver(self):
+        """
+        Setup Chrome WebDriver with improved options for corporate environments
+        
+        Returns:
+            The WebDriver, or None if Chrome could not be started
+        """
         try:
             chrome_options = Options()
             
@@ -86,8 +75,7 @@ class GitLabMRDocumentationGenerator:
             chrome_options.add_argument('--disable-gpu')
             chrome_options.add_argument('--disable-extensions')
             chrome_options.add_argument('--disable-plugins')
-            chrome_options.add_argument('--disable-images')  # Faster loading
-            chrome_options.add_argument('--disable-javascript')  # For faster loading (remove if JS needed)
+            # Images/fonts are blocked per tab through CDP instead of browser-wide flags, which broke Gemini
             
             # Bypass corporate security features
             chrome_options.add_argument('--disable-web-security')
@@ -120,7 +108,7 @@ class GitLabMRDocumentationGenerator:
             # Try to use ChromeDriverManager for automatic driver management
             try:
                 service = Service(ChromeDriverManager().install())
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
+                driver = webdriver.Chrome(service=service, options=chrome_options)
                 logger.info("Chrome driver initialized successfully with ChromeDriverManager")
             except Exception as e:
                 logger.warning(f"ChromeDriverManager failed: {e}")
@@ -128,31 +116,27 @@ class GitLabMRDocumentationGenerator:
                 
                 # Fallback to system ChromeDriver
                 try:
-                    self.driver = webdriver.Chrome(options=chrome_options)
+                    driver = webdriver.Chrome(options=chrome_options)
                     logger.info("Chrome driver initialized successfully with system ChromeDriver")
                 except Exception as e2:
                     logger.error(f"System ChromeDriver also failed: {e2}")
-                    return False
+                    return None
+            
+            # GitLab pages load lean; Gemini navigations switch the tab back to the full policy
+            self.resources = ResourcePolicyManager(driver)
+            self.resources.apply(LEAN_POLICY)
             
             # Set script timeout
-            self.driver.set_script_timeout(60)
-            self.driver.set_page_load_timeout(60)
+            driver.set_script_timeout(60)
+            driver.set_page_load_timeout(60)
             
             # Prevent webdriver detection
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
-            # Test the driver
-            try:
-                self.driver.get("https://www.google.com")
-                logger.info("Chrome driver test successful")
-                return True
-            except Exception as e:
-                logger.error(f"Chrome driver test failed: {e}")
-                return False
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            return driver
                 
         except Exception as e:
             logger.error(f"Error setting up Chrome driver: {e}")
-            return False
+            return None
     
     def test_gitlab_connection(self) -> bool:
         """Test GitLab API connection"""
@@ -175,8 +159,11 @@ class GitLabMRDocumentationGenerator:
     def setup_gemini_web_interface(self) -> bool:
         """Setup Gemini web interface with better error handling"""
         try:
+            if not self.driver.available('Gemini web interface'):
+                return False
+            
             logger.info("Opening Gemini web interface...")
-            self.driver.get("https://gemini.google.com/")
+            self.resources.navigate("https://gemini.google.com/", FULL_POLICY)
             
             # Wait for page to load
             WebDriverWait(self.driver, 30).until(
@@ -304,11 +291,12 @@ Total Java files modified: {len(java_changes)}
             status = "New" if change['new_file'] else "Modified" if not change['deleted_file'] else "Deleted"
             if change['renamed_file']:
                 status += " (Renamed)"
+            lines_changed = len(change['diff'].split('\n')) if change['diff'] else 0
                 
             doc += f"""
 ### {i}. {change['file_path']}
 - **Status**: {status}
-- **Lines Changed**: {len(change['diff'].split('\n')) if change['diff'] else 0}
+- **Lines Changed**: {lines_changed}
 
 """
         
@@ -364,8 +352,10 @@ Total Java files modified: {len(java_changes)}
     
     def cleanup(self):
         """Cleanup resources"""
+        self.driver.log_summary()
         if self.driver:
             try:
+                self.resources.log_summary()
                 self.driver.quit()
                 logger.info("Chrome driver closed successfully")
             except Exception as e: